@@ -1,8 +1,136 @@
-from django.contrib import admin
-from .models import WorkSpace, Booking
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-admin.site.register(WorkSpace)
-# admin.site.register(Booking)
+from .maintenance import set_workspace_status
+from .models import (
+    Floor, WorkSpace, Booking, ArchivedBooking, DailyWorkspaceUsage, Task
+)
+
+admin.site.register(Floor)
+
+
+# ============================================================================
+# CHANGELIST HELPERS
+# ============================================================================
+# The booking tables grow without bound, so their changelists avoid the
+# queries that scan them: exact COUNT(*) of the whole table, sidebar
+# filters listing every related row, and unjoined per-row lookups.
+# ============================================================================
+
+# Below this many rows an exact count is cheap and estimates are too rough
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts an unfiltered changelist from the planner's
+    row estimate on PostgreSQL instead of COUNT(*). Filtered lists, small
+    tables and other databases are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATED_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    Sidebar filter with a text box instead of a list of every value, for
+    fields with too many values to list.
+
+    Subclasses set title and parameter_name and implement queryset().
+    """
+    template = 'admin/booking/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        # Required to show the filter; the choices are typed in
+        return ((),)
+
+    def choices(self, changelist):
+        # One "All" choice carrying the other active filters, which the
+        # template keeps as hidden inputs
+        all_choice = next(super().choices(changelist))
+        all_choice['query_parts'] = [
+            (key, value)
+            for key, value in changelist.get_filters_params().items()
+            if key != self.parameter_name
+        ]
+        yield all_choice
+
+
+class UsernameFilter(InputFilter):
+    title = 'user'
+    parameter_name = 'username'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user__username=self.value().strip())
+        return queryset
+
+
+# ============================================================================
+# MODEL ADMINS
+# ============================================================================
+
+@admin.register(WorkSpace)
+class WorkSpaceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'floor', 'workspace_type', 'capacity', 'status')
+    list_filter = ('floor', 'workspace_type', 'status')
+    list_select_related = ('floor',)
+    # Also used by the booking form's workspace autocomplete
+    search_fields = ('name', 'location')
+    actions = ('mark_available', 'mark_maintenance', 'mark_unavailable')
+
+    def _set_status(self, request, queryset, status):
+        # One UPDATE for all selected workspaces, instead of a save() each
+        result = set_workspace_status(
+            queryset.values_list('pk', flat=True), status
+        )
+        message = f"{result['workspaces']} workspaces set to {status}."
+        if result['cancelled']:
+            message += (
+                f" {result['cancelled']} future bookings cancelled; their "
+                "users will be emailed."
+            )
+        self.message_user(request, message, messages.SUCCESS)
+
+    @admin.action(
+        description="Mark selected workspaces available",
+        permissions=['change'],
+    )
+    def mark_available(self, request, queryset):
+        self._set_status(request, queryset, 'available')
+
+    @admin.action(
+        description="Put selected workspaces under maintenance "
+                    "(cancels their future bookings)",
+        permissions=['change'],
+    )
+    def mark_maintenance(self, request, queryset):
+        self._set_status(request, queryset, 'maintenance')
+
+    @admin.action(
+        description="Mark selected workspaces unavailable "
+                    "(cancels their future bookings)",
+        permissions=['change'],
+    )
+    def mark_unavailable(self, request, queryset):
+        self._set_status(request, queryset, 'unavailable')
 
 
 @admin.register(Booking)
@@ -15,4 +143,87 @@ class BookingModelAdmin(admin.ModelAdmin):
         'end_time',
         'status',
     )
-    list_filter = ('user', 'booking_date', 'status')
+    list_filter = (UsernameFilter, 'status', 'workspace__floor')
+    list_select_related = ('user', 'workspace')
+    autocomplete_fields = ('user', 'workspace')
+    # Drill-down by year/month/day, backed by booking_date_idx
+    date_hierarchy = 'booking_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(DailyWorkspaceUsage)
+class DailyWorkspaceUsageAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the usage rollups; they are maintained from
+    bookings (see booking.usage and rebuild_usage_rollups)
+    """
+    list_display = ('date', 'workspace', 'booked_hours', 'booking_count')
+    list_select_related = ('workspace',)
+    date_hierarchy = 'date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    """
+    Read-only view of bookings moved out by archive_bookings
+    """
+    list_display = (
+        'user',
+        'workspace',
+        'booking_date',
+        'start_time',
+        'end_time',
+        'status',
+        'archived_at',
+    )
+    list_filter = (UsernameFilter, 'status')
+    list_select_related = ('user', 'workspace')
+    date_hierarchy = 'booking_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """
+    Queued, running and failed background tasks (see booking.tasks);
+    tasks that succeed are deleted
+    """
+    list_display = (
+        'name', 'queue', 'status', 'attempts', 'run_at', 'locked_by',
+    )
+    list_filter = ('status', 'queue')
+    readonly_fields = ('last_error', 'created_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('retry',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(
+        description="Retry selected tasks now",
+        permissions=['change'],
+    )
+    def retry(self, request, queryset):
+        retried = queryset.exclude(status=Task.RUNNING).update(
+            status=Task.QUEUED, attempts=0, run_at=timezone.now(),
+        )
+        self.message_user(
+            request, f"{retried} tasks queued again.", messages.SUCCESS
+        )
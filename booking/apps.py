@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        # Register model signal receivers
+        from . import signals  # noqa: F401
+
+        from django.db.backends.signals import connection_created
+        from config.db import apply_sqlite_pragmas
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='apply_sqlite_pragmas'
+        )
@@ -0,0 +1,231 @@
+from bisect import bisect_left
+from datetime import date as date_type, time as time_type
+
+from . import cache, holds as slot_holds
+from .models import WorkSpace, Booking, ACTIVE_BOOKING_STATUSES
+
+
+# ============================================================================
+# AVAILABILITY ENGINE
+# ============================================================================
+# Builds the per-workspace state shown on the interactive floor plan.
+# All active bookings for a date are loaded with a single query and indexed
+# per workspace, so the view and template only do dictionary lookups.
+# ============================================================================
+
+# Workspace states exposed to the floor plan
+FREE = 'free'
+RESERVED = 'reserved'
+MINE = 'mine'
+HELD = 'held'
+UNAVAILABLE = 'unavailable'
+
+
+class IntervalIndex:
+    """
+    Sorted booking intervals for a single workspace on a single date.
+
+    Intervals are kept ordered by start time together with a running
+    maximum of end times, so an overlap query only visits intervals that
+    can actually overlap the requested window.
+    """
+
+    def __init__(self, intervals):
+        """
+        Args:
+            intervals: iterable of (start_time, end_time, booking_id,
+                user_id) tuples
+        """
+        self.intervals = sorted(intervals, key=lambda i: (i[0], i[1]))
+        self.starts = [interval[0] for interval in self.intervals]
+        self.max_ends = []
+        running_end = None
+        for interval in self.intervals:
+            if running_end is None or interval[1] > running_end:
+                running_end = interval[1]
+            self.max_ends.append(running_end)
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def overlapping(self, start_time, end_time):
+        """
+        Return the intervals overlapping the window [start_time, end_time).
+
+        Overlap logic: (start1 < end2) AND (end1 > start2)
+        """
+        matches = []
+        # Only intervals starting before the window ends can overlap
+        index = bisect_left(self.starts, end_time) - 1
+        while index >= 0 and self.max_ends[index] > start_time:
+            interval = self.intervals[index]
+            if interval[1] > start_time:
+                matches.append(interval)
+            index -= 1
+        matches.reverse()
+        return matches
+
+
+def parse_date(value):
+    """
+    Accept a date or an ISO 'YYYY-MM-DD' string and return a date.
+
+    Raises:
+        ValueError: If the string is not a valid ISO date
+    """
+    if isinstance(value, date_type):
+        return value
+    return date_type.fromisoformat(value)
+
+
+def parse_time(value):
+    """
+    Accept a time or an 'HH:MM' / 'HH:MM:SS' string and return a time.
+
+    Raises:
+        ValueError: If the string is not a valid ISO time
+    """
+    if isinstance(value, time_type):
+        return value
+    return time_type.fromisoformat(value)
+
+
+def build_day_index(booking_date, floor_id=None):
+    """
+    Load all active bookings for a date with one query and index them.
+    Limited to the workspaces of one floor if floor_id is given.
+
+    Returns:
+        dict: {workspace_id: IntervalIndex}
+    """
+    rows = Booking.objects.filter(
+        booking_date=booking_date,
+        status__in=ACTIVE_BOOKING_STATUSES,
+    )
+    if floor_id is not None:
+        rows = rows.filter(workspace__floor_id=floor_id)
+    rows = rows.values_list(
+        'workspace_id', 'start_time', 'end_time', 'id', 'user_id',
+    )
+
+    intervals_by_workspace = {}
+    for workspace_id, start_time, end_time, booking_id, user_id in rows:
+        intervals_by_workspace.setdefault(workspace_id, []).append(
+            (start_time, end_time, booking_id, user_id)
+        )
+
+    return {
+        workspace_id: IntervalIndex(intervals)
+        for workspace_id, intervals in intervals_by_workspace.items()
+    }
+
+
+def window_snapshot(booking_date, start_time, end_time, floor_id=None):
+    """
+    Return the user-independent occupancy of every workspace (of one floor
+    if floor_id is given) for a window, served from the availability cache
+    when possible.
+
+    Returns:
+        dict: {workspace_id: (workspace_status, ((booking_id, user_id), ...))}
+    """
+    booking_date = parse_date(booking_date)
+    start_time = parse_time(start_time)
+    end_time = parse_time(end_time)
+
+    return cache.get_or_build(
+        booking_date, start_time, end_time,
+        lambda: build_window_snapshot(
+            booking_date, start_time, end_time, floor_id
+        ),
+        floor_id=floor_id,
+    )
+
+
+def build_window_snapshot(booking_date, start_time, end_time, floor_id=None):
+    """
+    Build the snapshot returned by window_snapshot() from the database.
+    """
+    day_index = build_day_index(booking_date, floor_id)
+    workspaces = WorkSpace.objects.all()
+    if floor_id is not None:
+        workspaces = workspaces.filter(floor_id=floor_id)
+    snapshot = {}
+    for workspace_id, status in workspaces.values_list('id', 'status'):
+        index = day_index.get(workspace_id)
+        occupants = ()
+        if index is not None:
+            occupants = tuple(
+                (booking_id, user_id)
+                for _, _, booking_id, user_id
+                in index.overlapping(start_time, end_time)
+            )
+        snapshot[workspace_id] = (status, occupants)
+    return snapshot
+
+
+def resolve_states(snapshot, user=None):
+    """
+    Project a window snapshot onto a single user.
+
+    Returns:
+        dict: {workspace_id: {'state': str, 'booking_id': int or None}}
+    """
+    user_id = user.pk if user is not None else None
+    states = {}
+    for workspace_id, (status, occupants) in snapshot.items():
+        state = FREE
+        booking_id = None
+        if occupants:
+            state = RESERVED
+            for occupant_booking_id, occupant_user_id in occupants:
+                if user_id is not None and occupant_user_id == user_id:
+                    state = MINE
+                    booking_id = occupant_booking_id
+                    break
+        elif status != 'available':
+            state = UNAVAILABLE
+        states[workspace_id] = {'state': state, 'booking_id': booking_id}
+    return states
+
+
+def apply_holds(states, holds, user=None):
+    """
+    Mark free workspaces held by other users as held. Holds change far
+    more often than bookings, so they are overlaid on the cached snapshot
+    per request rather than cached with it.
+
+    Args:
+        holds: (workspace_id, user_id, hold_id) tuples as returned by
+            holds.active_holds()
+    """
+    user_id = user.pk if user is not None else None
+    for workspace_id, holder_id, _ in holds:
+        slot = states.get(workspace_id)
+        if slot and slot['state'] == FREE and holder_id != user_id:
+            slot['state'] = HELD
+    return states
+
+
+def availability_map(
+    booking_date, start_time, end_time, user=None, floor_id=None,
+    holds=None,
+):
+    """
+    Return the floor plan state of every workspace (of one floor if
+    floor_id is given) for a time window. Active slot holds are loaded
+    unless the caller already has them.
+
+    Example:
+        {3: {'state': 'mine', 'booking_id': 12},
+         4: {'state': 'held', 'booking_id': None}}
+    """
+    booking_date = parse_date(booking_date)
+    start_time = parse_time(start_time)
+    end_time = parse_time(end_time)
+    snapshot = window_snapshot(booking_date, start_time, end_time, floor_id)
+    if holds is None:
+        holds = slot_holds.active_holds(
+            booking_date, start_time, end_time, floor_id
+        )
+    return apply_holds(resolve_states(snapshot, user), holds, user)
@@ -0,0 +1,207 @@
+import os
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+
+
+# ============================================================================
+# AVAILABILITY CACHE
+# ============================================================================
+# Caches floor plan availability snapshots keyed by (date, time window,
+# floor), and the workspace geometry of each floor.
+# Uses Django's cache framework, so any configured backend (local-memory,
+# file, ...) works without outside services.
+#
+# Invalidation is version based: every key embeds a global generation and
+# a per-date version. Booking writes bump the version of their date and
+# workspace changes bump the generation, which orphans the old entries
+# until they expire.
+#
+# The versions live in the cache itself, so invalidation only reaches the
+# processes that share the backend. When more than one process serves
+# requests or writes bookings (several gunicorn workers, the run_tasks
+# worker, cron commands), configure a shared backend (see CACHES in
+# settings); check_shared_cache() warns otherwise. Every entry also
+# expires after AVAILABILITY_CACHE_TIMEOUT, which bounds how stale a
+# process-local cache can get.
+# ============================================================================
+
+# Backends whose entries are only visible to the process that wrote them
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+KEY_PREFIX = 'availability'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+STATS_EVENTS = ('hits', 'misses', 'invalidations')
+
+
+def _cache():
+    return caches[getattr(settings, 'AVAILABILITY_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 60)
+
+
+def _date_version_key(booking_date):
+    return f'{KEY_PREFIX}:date:{booking_date}'
+
+
+def _stats_key(event):
+    return f'{KEY_PREFIX}:stats:{event}'
+
+
+def _seed():
+    # Versions (re)start from the clock rather than 0, so a version key
+    # evicted by the backend never repeats a value handed out earlier
+    return time.time_ns() // 1000
+
+
+def _incr(key, initial=0):
+    cache = _cache()
+    # add() is a no-op if the key exists, so incr() never misses
+    cache.add(key, initial, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, initial + 1, None)
+        return initial + 1
+
+
+def window_version(booking_date):
+    """
+    Return the (generation, date_version) pair the cache keys embed.
+
+    Also used as the validator for conditional requests, since it changes
+    whenever the availability of any window on the date may have changed.
+    """
+    cache = _cache()
+    keys = [GENERATION_KEY, _date_version_key(booking_date)]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, _seed(), None)
+        versions.update(cache.get_many(missing))
+    return tuple(versions.get(key, 0) for key in keys)
+
+
+def generation():
+    """
+    Return the global generation, bumped by invalidate_all().
+    """
+    cache = _cache()
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, _seed(), None)
+        value = cache.get(GENERATION_KEY, 0)
+    return value
+
+
+def window_key(booking_date, start_time, end_time, floor_id=None):
+    generation, date_version = window_version(booking_date)
+    return (
+        f'{KEY_PREFIX}:{generation}:{date_version}:'
+        f'{booking_date}:{start_time}:{end_time}:{floor_id or "all"}'
+    )
+
+
+def get_or_build(booking_date, start_time, end_time, builder, floor_id=None):
+    """
+    Return the cached snapshot for a window, building it on a miss.
+
+    Args:
+        builder: callable returning the snapshot to cache
+        floor_id: floor the snapshot is limited to (None for all floors)
+    """
+    cache = _cache()
+    key = window_key(booking_date, start_time, end_time, floor_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        _incr(_stats_key('misses'))
+        snapshot = builder()
+        cache.set(key, snapshot, _timeout())
+    else:
+        _incr(_stats_key('hits'))
+    return snapshot
+
+
+def get_or_build_geometry(floor_id, builder):
+    """
+    Return the cached floor plan geometry of a floor, building it on a
+    miss. Entries live until the next workspace change (invalidate_all)
+    or until they expire, whichever comes first.
+    """
+    cache = _cache()
+    key = f'{KEY_PREFIX}:{generation()}:geometry:{floor_id or "all"}'
+    geometry = cache.get(key)
+    if geometry is None:
+        _incr(_stats_key('misses'))
+        geometry = builder()
+        cache.set(key, geometry, _timeout())
+    else:
+        _incr(_stats_key('hits'))
+    return geometry
+
+
+def invalidate_date(booking_date):
+    """
+    Drop all cached windows for a single date.
+    """
+    _incr(_date_version_key(booking_date), initial=_seed())
+    _incr(_stats_key('invalidations'))
+
+
+def invalidate_all():
+    """
+    Drop all cached windows for every date.
+    """
+    _incr(GENERATION_KEY, initial=_seed())
+    _incr(_stats_key('invalidations'))
+
+
+def stats():
+    """
+    Return the hit/miss/invalidation counters and the hit ratio.
+    """
+    keys = {_stats_key(event): event for event in STATS_EVENTS}
+    values = _cache().get_many(list(keys))
+    counters = {event: values.get(key, 0) for key, event in keys.items()}
+    lookups = counters['hits'] + counters['misses']
+    counters['hit_ratio'] = (
+        round(counters['hits'] / lookups, 4) if lookups else None
+    )
+    counters['timeout'] = _timeout()
+    return counters
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Warn when several web workers (WEB_CONCURRENCY, read by gunicorn)
+    would each keep their own availability cache, so invalidations made
+    by one never reach the others.
+    """
+    alias = getattr(settings, 'AVAILABILITY_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    try:
+        workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    except ValueError:
+        workers = 1
+    if backend not in PROCESS_LOCAL_BACKENDS or workers <= 1:
+        return []
+    return [checks.Warning(
+        f"The availability cache ({alias!r}) is local to each process but "
+        f"WEB_CONCURRENCY runs {workers} workers: a booking made through "
+        "one worker is only seen by the others once their cached entries "
+        "expire (AVAILABILITY_CACHE_TIMEOUT).",
+        hint=(
+            "Use a cache shared by all processes, e.g. set CACHE_DIR or "
+            "point AVAILABILITY_CACHE_ALIAS at a Redis or Memcached cache."
+        ),
+        id='booking.W001',
+    )]
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# ============================================================================
+# BOOKING EVENTS
+# ============================================================================
+# Fan-out of booking create/update/cancel deltas to floor plan clients
+# streaming a given date (see views.availability_stream).
+#
+# The default broker is in-process and needs no outside services; it only
+# reaches clients connected to the same worker process. A different broker
+# (e.g. backed by Redis pub/sub) can be plugged in with the
+# BOOKING_EVENTS_BROKER setting, as long as it offers the same
+# publish() / broadcast() / subscribe() interface.
+# ============================================================================
+
+# Event types sent to clients
+CREATED = 'created'
+UPDATED = 'updated'
+CANCELLED = 'cancelled'
+HELD = 'held'
+RELEASED = 'released'
+RESYNC = 'resync'
+
+
+class Subscription:
+    """
+    A single client's queue of events for one channel.
+
+    Created and consumed on the event loop serving the client; events may
+    be pushed from any thread.
+    """
+
+    def __init__(self, broker, channel, maxsize=100):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            # Slow client: drop the backlog and ask it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {'type': RESYNC}
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """
+        Wait for the next event; returns None if the timeout expires.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Delivers events to subscriptions held by the current process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.push(event)
+
+    def broadcast(self, event):
+        with self._lock:
+            subscriptions = [
+                subscription
+                for channel_subscriptions in self._subscriptions.values()
+                for subscription in channel_subscriptions
+            ]
+        for subscription in subscriptions:
+            subscription.push(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Return the process-wide broker configured by BOOKING_EVENTS_BROKER.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_path = getattr(
+                    settings,
+                    'BOOKING_EVENTS_BROKER',
+                    'booking.events.InProcessBroker',
+                )
+                _broker = import_string(broker_path)()
+    return _broker
+
+
+def booking_event(event_type, booking, booking_date=None):
+    """
+    Build the delta sent to clients for a booking change.
+    """
+    booking_date = booking_date or booking.booking_date
+    return {
+        'type': event_type,
+        'workspace_id': booking.workspace_id,
+        'date': booking_date.isoformat(),
+        'start_time': booking.start_time.strftime('%H:%M'),
+        'end_time': booking.end_time.strftime('%H:%M'),
+    }
+
+
+def publish_booking(event_type, booking, booking_date=None):
+    """
+    Publish a booking delta on the channel of its date.
+    """
+    event = booking_event(event_type, booking, booking_date)
+    get_broker().publish(event['date'], event)
+
+
+def publish_resync(booking_date=None):
+    """
+    Tell the clients connected for a date, or every connected client, to
+    refetch their availability.
+    """
+    if booking_date is None:
+        get_broker().broadcast({'type': RESYNC})
+    else:
+        get_broker().publish(booking_date.isoformat(), {'type': RESYNC})
@@ -0,0 +1,95 @@
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from . import cache
+from .availability import FREE, HELD, MINE
+from .models import WorkSpace
+
+
+# ============================================================================
+# FLOOR PLAN RENDERER
+# ============================================================================
+# Renders the workspace shapes of the interactive floor plan.
+#
+# The SVG markup only depends on workspace fields, so it is built once per
+# floor and cached (see cache.get_or_build_geometry; any workspace change
+# invalidates it). Each workspace is stored as the markup before and after
+# its state, and a request only joins those pieces with the state classes
+# and booking id from the availability map.
+# ============================================================================
+
+# Workspace fields the markup is built from
+GEOMETRY_FIELDS = (
+    'id',
+    'name',
+    'svg_x_coord',
+    'svg_y_coord',
+    'svg_width',
+    'svg_height',
+)
+
+
+def build_geometry(floor_id=None):
+    """
+    Build the state-independent markup of every workspace on a floor (or
+    on all floors).
+
+    Returns:
+        tuple: ((workspace_id, head, tail), ...) where the state classes
+        go between head and tail
+    """
+    workspaces = WorkSpace.objects.all()
+    if floor_id is not None:
+        workspaces = workspaces.filter(floor_id=floor_id)
+
+    geometry = []
+    for pk, name, x, y, width, height in workspaces.values_list(
+        *GEOMETRY_FIELDS
+    ):
+        head = (
+            f'<g class="workspace-group" data-workspace-id="{pk}">'
+            f'<rect class="workspace'
+        )
+        tail = (
+            f' x="{x}" y="{y}" width="{width}" height="{height}"'
+            f' fill="#D9D9D9" id="Table 1" data-workspace-id="{pk}" />'
+            f'<text class="label" x="{x}" y="{y}" text-anchor="middle"'
+            f' alignment-baseline="middle" fill="#222">{escape(name)}</text>'
+            f'</g>'
+        )
+        geometry.append((pk, head, tail))
+    return tuple(geometry)
+
+
+def floor_geometry(floor_id=None):
+    return cache.get_or_build_geometry(
+        floor_id, lambda: build_geometry(floor_id)
+    )
+
+
+def render_floor(availability, floor_id=None):
+    """
+    Render the workspace shapes of a floor with their current state.
+
+    Args:
+        availability: {workspace_id: {'state', 'booking_id'}} as returned
+            by availability.availability_map()
+
+    Returns:
+        SafeString: SVG markup for the workspace layer
+    """
+    parts = []
+    for pk, head, tail in floor_geometry(floor_id):
+        slot = availability.get(pk)
+        parts.append(head)
+        if slot and slot['state'] != FREE:
+            parts.append(' reserved')
+            if slot['state'] == MINE:
+                parts.append(' editable')
+            elif slot['state'] == HELD:
+                parts.append(' held')
+        parts.append('"')
+        if slot and slot['booking_id']:
+            parts.append(f' data-booking-id="{slot["booking_id"]}"')
+        parts.append(tail)
+    return mark_safe(''.join(parts))
@@ -1,5 +1,7 @@
 from django import forms
-from .models import Booking
+from .models import Booking, WorkSpace, Floor
+from .recurrence import expand_recurrence, MAX_OCCURRENCES
+from .maintenance import BOOKING_ACTION_CHOICES, CANCEL
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Field, Div
 from datetime import datetime, time
@@ -30,9 +32,17 @@ class BookingForm(forms.ModelForm):
         choices=business_hour_choices(),
         widget=forms.Select(attrs={'class': 'form-select'})
     )
+    # Version of the booking the user started editing (edits only)
+    version = forms.IntegerField(
+        widget=forms.HiddenInput(),
+        required=False,
+        min_value=1,
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['version'].initial = self.instance.version
         self.helper = FormHelper(self)
         self.helper.form_tag = False
         self.helper.layout = Layout(
@@ -86,6 +96,15 @@ class BookingForm(forms.ModelForm):
         except Exception:
             raise forms.ValidationError("Invalid end time format.")
 
+    def clean(self):
+        cleaned_data = super().clean()
+        version = cleaned_data.get('version')
+        if version and self.instance.pk:
+            # Save against the version that was edited, not the one just
+            # loaded, so changes made in between are detected
+            self.instance.version = version
+        return cleaned_data
+
 
 class CheckBookingsForm(forms.Form):
     """
@@ -102,6 +121,12 @@ class CheckBookingsForm(forms.Form):
         choices=business_hour_choices(),
         widget=forms.Select(attrs={'class': 'form-select'})
     )
+    floor = forms.ModelChoiceField(
+        queryset=Floor.objects.all(),
+        required=False,
+        empty_label="All floors",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -112,6 +137,157 @@ class CheckBookingsForm(forms.Form):
                 Field('date'),
                 Field('start_time'),
                 Field('end_time'),
+                Field('floor'),
                 css_class='d-flex gap-2 align-items-end'
             )
         )
+
+
+WEEKDAY_CHOICES = [
+    ('0', 'Monday'),
+    ('1', 'Tuesday'),
+    ('2', 'Wednesday'),
+    ('3', 'Thursday'),
+    ('4', 'Friday'),
+    ('5', 'Saturday'),
+    ('6', 'Sunday'),
+]
+
+
+class RecurringBookingForm(forms.Form):
+    """
+    Form for booking one workspace and time slot on many dates.
+
+    Either a weekly recurrence rule (start_date, end_date, weekdays,
+    interval) or an explicit comma-separated list of dates is accepted.
+    """
+    workspace = forms.ModelChoiceField(queryset=WorkSpace.objects.all())
+    start_time = forms.ChoiceField(choices=business_hour_choices())
+    end_time = forms.ChoiceField(choices=business_hour_choices())
+    start_date = forms.DateField(required=False)
+    end_date = forms.DateField(required=False)
+    weekdays = forms.MultipleChoiceField(
+        choices=WEEKDAY_CHOICES,
+        required=False,
+    )
+    interval = forms.IntegerField(min_value=1, max_value=52, required=False)
+    dates = forms.CharField(
+        required=False,
+        help_text="Comma-separated dates (YYYY-MM-DD) for a bulk booking",
+    )
+    purpose = forms.CharField(max_length=200, required=False)
+    notes = forms.CharField(required=False)
+
+    def clean_start_time(self):
+        val = self.cleaned_data.get('start_time')
+        try:
+            return datetime.strptime(val, '%H:%M').time()
+        except Exception:
+            raise forms.ValidationError("Invalid start time format.")
+
+    def clean_end_time(self):
+        val = self.cleaned_data.get('end_time')
+        try:
+            return datetime.strptime(val, '%H:%M').time()
+        except Exception:
+            raise forms.ValidationError("Invalid end time format.")
+
+    def clean_dates(self):
+        val = self.cleaned_data.get('dates')
+        dates = []
+        for item in (val or '').split(','):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                dates.append(datetime.strptime(item, '%Y-%m-%d').date())
+            except ValueError:
+                raise forms.ValidationError(f"Invalid date: {item}.")
+        return dates
+
+    def clean(self):
+        """
+        Check the time slot and expand the request into
+        cleaned_data['occurrences']: the listed dates and the dates of the
+        recurrence, at most MAX_OCCURRENCES in all.
+        """
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        if start_time and end_time and end_time <= start_time:
+            self.add_error('end_time', "End time must be after start time.")
+
+        dates = list(cleaned_data.get('dates') or [])
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        if start_date or end_date:
+            if not (start_date and end_date):
+                raise forms.ValidationError(
+                    "A recurrence needs both a start date and an end date."
+                )
+            if end_date < start_date:
+                self.add_error(
+                    'end_date', "End date must be after start date."
+                )
+                return cleaned_data
+            dates.extend(expand_recurrence(
+                start_date,
+                end_date,
+                weekdays=cleaned_data.get('weekdays'),
+                interval=cleaned_data.get('interval') or 1,
+            ))
+
+        if not dates and not self.errors:
+            raise forms.ValidationError(
+                "Provide a list of dates or a recurrence rule."
+            )
+        dates = sorted(set(dates))
+        if len(dates) > MAX_OCCURRENCES:
+            raise forms.ValidationError(
+                f"No more than {MAX_OCCURRENCES} dates can be booked at once."
+            )
+        cleaned_data['occurrences'] = dates
+        return cleaned_data
+
+
+class WorkspaceStatusForm(forms.Form):
+    """
+    Form for changing the status of many workspaces at once: the listed
+    workspaces, every workspace of a floor, or both.
+    """
+    workspaces = forms.ModelMultipleChoiceField(
+        queryset=WorkSpace.objects.all(),
+        required=False,
+    )
+    floor = forms.ModelChoiceField(
+        queryset=Floor.objects.all(),
+        required=False,
+    )
+    status = forms.ChoiceField(choices=WorkSpace.STATUS_CHOICES)
+    bookings = forms.ChoiceField(
+        choices=BOOKING_ACTION_CHOICES,
+        required=False,
+        help_text="What to do with bookings of workspaces taken out of "
+                  "service (default: cancel)",
+    )
+
+    def clean_bookings(self):
+        return self.cleaned_data.get('bookings') or CANCEL
+
+    def clean(self):
+        """
+        Collect the chosen workspaces into cleaned_data['workspace_ids'].
+        """
+        cleaned_data = super().clean()
+        workspace_ids = {
+            workspace.pk for workspace in cleaned_data.get('workspaces', ())
+        }
+        floor = cleaned_data.get('floor')
+        if floor:
+            workspace_ids.update(
+                floor.workspaces.values_list('pk', flat=True)
+            )
+        if not workspace_ids and not self.errors:
+            raise forms.ValidationError("Choose workspaces or a floor.")
+        cleaned_data['workspace_ids'] = workspace_ids
+        return cleaned_data
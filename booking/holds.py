@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import events
+from .models import Booking, SlotHold, ACTIVE_BOOKING_STATUSES
+
+
+# ============================================================================
+# SLOT HOLDS
+# ============================================================================
+# Clicking a workspace on the floor plan holds its slot for
+# BOOKING_HOLD_SECONDS while the user fills in the booking form. Others
+# see it as held and are told at once if they click it, instead of losing
+# the race for it after submitting the form.
+#
+# Holds live outside the cached availability snapshots; they are overlaid
+# per request with one indexed query (see availability.availability_map).
+# ============================================================================
+
+
+def hold_seconds():
+    return getattr(settings, 'BOOKING_HOLD_SECONDS', 120)
+
+
+def _serialise(workspace_id, booking_date):
+    """
+    Serialise hold placement per workspace and date for the rest of the
+    transaction, so two users cannot both pass the conflict check.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)",
+                [workspace_id, booking_date.toordinal()],
+            )
+    # SQLite serialises every write: the DELETE in place_hold() takes the
+    # database write lock before the conflict check reads anything
+
+
+def place_hold(user, workspace_id, booking_date, start_time, end_time):
+    """
+    Hold a workspace and time slot for the user, replacing the user's
+    previous hold (a user holds one slot at a time).
+
+    Returns:
+        SlotHold: the new hold, or None if the slot overlaps an active
+        booking or another user's unexpired hold
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        _serialise(workspace_id, booking_date)
+        SlotHold.objects.filter(user=user).delete()
+
+        booked = Booking.objects.filter(
+            workspace_id=workspace_id,
+            booking_date=booking_date,
+            status__in=ACTIVE_BOOKING_STATUSES,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        ).exists()
+        held = SlotHold.objects.active(now).overlapping(
+            booking_date, start_time, end_time,
+        ).filter(workspace_id=workspace_id).exists()
+        if booked or held:
+            return None
+
+        hold = SlotHold.objects.create(
+            workspace_id=workspace_id,
+            user=user,
+            booking_date=booking_date,
+            start_time=start_time,
+            end_time=end_time,
+            expires_at=now + timedelta(seconds=hold_seconds()),
+        )
+        transaction.on_commit(
+            lambda: events.publish_booking(events.HELD, hold)
+        )
+    return hold
+
+
+def release_holds(user):
+    """
+    Release the user's holds, e.g. when the booking form is closed or the
+    booking is made.
+
+    Returns:
+        int: number of holds released
+    """
+    released = list(SlotHold.objects.filter(user=user))
+    if not released:
+        return 0
+    SlotHold.objects.filter(pk__in=[hold.pk for hold in released]).delete()
+
+    def on_commit():
+        for hold in released:
+            events.publish_booking(events.RELEASED, hold)
+
+    transaction.on_commit(on_commit)
+    return len(released)
+
+
+def active_holds(booking_date, start_time, end_time, floor_id=None):
+    """
+    Unexpired holds overlapping a window.
+
+    Returns:
+        list: (workspace_id, user_id, hold_id) tuples
+    """
+    holds = SlotHold.objects.active().overlapping(
+        booking_date, start_time, end_time,
+    )
+    if floor_id is not None:
+        holds = holds.filter(workspace__floor_id=floor_id)
+    return list(
+        holds.order_by('pk').values_list('workspace_id', 'user_id', 'pk')
+    )
+
+
+def sweep_expired(now=None):
+    """
+    Delete expired holds in one statement. They already count as released
+    everywhere; open floor plans of the affected dates are told to refetch
+    so they stop showing them as held.
+
+    Returns:
+        int: number of holds deleted
+    """
+    expired = SlotHold.objects.filter(expires_at__lte=now or timezone.now())
+    dates = list(
+        expired.order_by().values_list('booking_date', flat=True).distinct()
+    )
+    if not dates:
+        return 0
+    deleted, _ = expired.delete()
+
+    def on_commit():
+        for booking_date in dates:
+            events.publish_resync(booking_date)
+
+    transaction.on_commit(on_commit)
+    return deleted
@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import notifications, signals, tasks, usage
+from .models import WorkSpace, Booking, ACTIVE_BOOKING_STATUSES
+
+
+# ============================================================================
+# BULK WORKSPACE STATUS
+# ============================================================================
+# Takes many workspaces in or out of service at once (e.g. a floor going
+# into maintenance): one UPDATE for the workspaces, one query for their
+# active future bookings, batched UPDATEs to cancel those, and the users
+# notified from the task queue.
+# ============================================================================
+
+# What happens to active future bookings of workspaces taken out of service
+CANCEL = 'cancel'
+NOTIFY = 'notify'
+BOOKING_ACTION_CHOICES = [
+    (CANCEL, 'Cancel them and notify their users'),
+    (NOTIFY, 'Keep them and notify their users'),
+]
+
+
+def set_workspace_status(workspace_ids, status, bookings=CANCEL,
+                         batch_size=500):
+    """
+    Set the status of many workspaces. Unless the new status is
+    'available', their pending and confirmed bookings that have not ended
+    yet are cancelled (or kept, with bookings=NOTIFY) and their users
+    emailed.
+
+    Returns:
+        dict: numbers of workspaces changed, bookings affected and
+        bookings cancelled
+
+    Raises:
+        ValueError: for an unknown status or bookings action
+    """
+    if status not in dict(WorkSpace.STATUS_CHOICES):
+        raise ValueError(f"Unknown workspace status {status!r}")
+    if bookings not in dict(BOOKING_ACTION_CHOICES):
+        raise ValueError(f"Unknown bookings action {bookings!r}")
+    workspace_ids = list(workspace_ids)
+    now = timezone.now()
+
+    with transaction.atomic():
+        # update() skips auto_now, which the details ETag relies on
+        changed = WorkSpace.objects.filter(
+            pk__in=workspace_ids,
+        ).exclude(status=status).update(status=status, updated_at=now)
+
+        affected = []
+        if status != 'available':
+            affected = list(
+                Booking.objects.filter(
+                    workspace_id__in=workspace_ids,
+                    status__in=ACTIVE_BOOKING_STATUSES,
+                ).upcoming(now).order_by('pk').values(
+                    'pk', 'user_id', 'workspace_id', 'workspace__name',
+                    'booking_date', 'start_time', 'end_time',
+                )
+            )
+
+        cancelled = 0
+        if bookings == CANCEL:
+            for start in range(0, len(affected), batch_size):
+                batch = affected[start:start + batch_size]
+                # The status filter skips bookings cancelled meanwhile
+                cancelled += Booking.objects.filter(
+                    pk__in=[booking['pk'] for booking in batch],
+                    status__in=ACTIVE_BOOKING_STATUSES,
+                ).update(
+                    status='cancelled',
+                    updated_at=now,
+                    # Edits started before this must not undo it
+                    version=F('version') + 1,
+                )
+
+        # update() sends no signals
+        transaction.on_commit(signals.workspaces_changed)
+        if cancelled:
+            usage.queue_refresh(
+                (booking['workspace_id'], booking['booking_date'])
+                for booking in affected
+            )
+        if affected:
+            tasks.enqueue(
+                notifications.send_workspace_status_notices,
+                [notifications.booking_notice(row) for row in affected],
+                status,
+                bookings == CANCEL,
+            )
+
+    return {
+        'workspaces': changed,
+        'bookings': len(affected),
+        'cancelled': cancelled,
+    }
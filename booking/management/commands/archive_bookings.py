@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import ArchivedBooking, Booking, FINAL_BOOKING_STATUSES
+from booking.signals import muted
+
+
+class Command(BaseCommand):
+    help = (
+        "Move cancelled and completed bookings older than the archive "
+        "horizon from the Booking table to ArchivedBooking, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=getattr(settings, 'BOOKING_ARCHIVE_DAYS', 365),
+            help=(
+                "Archive bookings dated more than this many days ago "
+                "(default: BOOKING_ARCHIVE_DAYS)"
+            ),
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Bookings moved per transaction (default: 1000)",
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only count the bookings that would be archived",
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError("--days must be at least 1")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        cutoff = timezone.localdate() - timedelta(days=options['days'])
+        candidates = Booking.objects.filter(
+            booking_date__lt=cutoff,
+            status__in=FINAL_BOOKING_STATUSES,
+        )
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"Would archive {candidates.count()} bookings dated "
+                f"before {cutoff}."
+            )
+            return
+
+        archived = 0
+        while True:
+            moved = self.archive_batch(candidates, options['batch_size'])
+            if not moved:
+                break
+            archived += moved
+            self.stdout.write(f"  {archived} archived")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} bookings dated before {cutoff}."
+        ))
+
+    def archive_batch(self, candidates, batch_size):
+        """
+        Copy one batch to the archive and delete it, in one transaction.
+
+        Usage rollups count archived bookings and the dates are past the
+        availability cache's reach, so the booking signal handlers are
+        muted rather than run once per row.
+
+        Returns:
+            int: number of bookings moved
+        """
+        with transaction.atomic():
+            batch = list(
+                candidates.order_by('pk').select_for_update()[:batch_size]
+            )
+            if not batch:
+                return 0
+            ArchivedBooking.objects.bulk_create(
+                [ArchivedBooking.from_booking(booking) for booking in batch]
+            )
+            with muted():
+                Booking.objects.filter(
+                    pk__in=[booking.pk for booking in batch]
+                ).delete()
+        return len(batch)
@@ -0,0 +1,381 @@
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta, time as time_of_day
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+
+from booking.models import WorkSpace, Booking
+from config.storage import UNHASHED_STORAGES
+from config.svg_parser import synthetic_shapes, shapes_to_workspace_fixtures
+
+
+# Hourly slots bookable within business hours (8:00 - 22:00)
+SLOT_HOURS = range(8, 22)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the booking hot paths against a throwaway test database "
+        "filled with a synthetic floor, and optionally compare the results "
+        "with a baseline JSON file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workspaces', type=int, default=1500,
+            help="Number of synthetic workspaces (default: 1500)",
+        )
+        parser.add_argument(
+            '--bookings', type=int, default=500,
+            help="Bookings per day (default: 500)",
+        )
+        parser.add_argument(
+            '--days', type=int, default=5,
+            help="Number of days with bookings, from tomorrow (default: 5)",
+        )
+        parser.add_argument(
+            '--users', type=int, default=50,
+            help="Number of users owning the bookings (default: 50)",
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help="Timed iterations per benchmark (default: 20)",
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help="Random seed for the synthetic data (default: 1)",
+        )
+        parser.add_argument(
+            '--output', default='bench_output.json',
+            help="Where to write the results (default: bench_output.json)",
+        )
+        parser.add_argument(
+            '--baseline',
+            help="Results file of a previous run to compare against",
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help=(
+                "Allowed slowdown of the median against the baseline "
+                "before it counts as a regression (default: 0.25 = 25%%)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write(self.style.WARNING(
+                f"Benchmarking against {connection.vendor}; baselines are "
+                f"only comparable between runs on the same database."
+            ))
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            rng = random.Random(options['seed'])
+            first_day = date.today() + timedelta(days=1)
+            self.stdout.write("Generating synthetic floor...")
+            user = self.populate(rng, first_day, options)
+            self.stdout.write("Running benchmarks...")
+            with override_settings(STORAGES=UNHASHED_STORAGES):
+                results = self.run_benchmarks(
+                    rng, user, first_day, options
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'workspaces': options['workspaces'],
+                'bookings_per_day': options['bookings'],
+                'days': options['days'],
+                'repeat': options['repeat'],
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.print_results(results)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    # ------------------------------------------------------------------------
+    # SYNTHETIC DATA
+    # ------------------------------------------------------------------------
+
+    def populate(self, rng, first_day, options):
+        shapes = synthetic_shapes(options['workspaces'])
+        WorkSpace.objects.bulk_create(
+            WorkSpace(**{
+                key: value
+                for key, value in fixture['fields'].items()
+                if key not in ('created_at', 'updated_at')
+            })
+            for fixture in shapes_to_workspace_fixtures(shapes)
+        )
+        workspace_ids = list(WorkSpace.objects.values_list('id', flat=True))
+
+        User.objects.bulk_create(
+            User(username=f"bench-user-{i}")
+            for i in range(options['users'])
+        )
+        user_ids = list(User.objects.filter(
+            username__startswith='bench-user-'
+        ).values_list('id', flat=True))
+
+        capacity = len(workspace_ids) * len(SLOT_HOURS)
+        per_day = min(options['bookings'], capacity)
+        bookings = []
+        for offset in range(options['days']):
+            booking_date = first_day + timedelta(days=offset)
+            taken = set()
+            while len(taken) < per_day:
+                slot = (rng.choice(workspace_ids), rng.choice(SLOT_HOURS))
+                if slot in taken:
+                    continue
+                taken.add(slot)
+                workspace_id, hour = slot
+                bookings.append(Booking(
+                    user_id=rng.choice(user_ids),
+                    workspace_id=workspace_id,
+                    booking_date=booking_date,
+                    start_time=time_of_day(hour),
+                    end_time=time_of_day(hour + 1),
+                    status='confirmed',
+                ))
+        Booking.objects.bulk_create(bookings, batch_size=500)
+        return User.objects.get(username='bench-user-0')
+
+    def free_slots(self, rng, booking_date, count):
+        """
+        Pick `count` distinct free (workspace_id, hour) slots on a date.
+        """
+        taken = {
+            (workspace_id, start.hour)
+            for workspace_id, start in Booking.objects.filter(
+                booking_date=booking_date
+            ).values_list('workspace_id', 'start_time')
+        }
+        workspace_ids = list(WorkSpace.objects.values_list('id', flat=True))
+        slots = set()
+        while len(slots) < count:
+            slot = (rng.choice(workspace_ids), rng.choice(SLOT_HOURS))
+            if slot not in taken:
+                slots.add(slot)
+        return list(slots)
+
+    # ------------------------------------------------------------------------
+    # BENCHMARKS
+    # ------------------------------------------------------------------------
+
+    def run_benchmarks(self, rng, user, first_day, options):
+        repeat = options['repeat']
+        client = Client()
+        client.force_login(user)
+        cache = caches['default']
+        cache.clear()
+
+        window = {
+            'date': first_day.isoformat(),
+            'start_time': '09:00',
+            'end_time': '10:00',
+        }
+        workspace_ids = list(WorkSpace.objects.values_list('id', flat=True))
+        results = {}
+
+        def get(url, data=None):
+            def call():
+                response = client.get(url, data)
+                assert response.status_code == 200, response.status_code
+            return call
+
+        results['book_workspace'] = self.measure(
+            get(reverse('book_workspace'), window), repeat
+        )
+        results['book_workspace_cold_cache'] = self.measure(
+            get(reverse('book_workspace'), window), repeat, setup=cache.clear
+        )
+        results['availability_json'] = self.measure(
+            get(reverse('availability_json'), window), repeat,
+            setup=cache.clear,
+        )
+        results['get_workspace_details'] = self.measure(
+            lambda: get(reverse(
+                'workspace_details',
+                args=[rng.choice(workspace_ids)],
+            ))(),
+            repeat,
+        )
+
+        # Writes use distinct free slots so every iteration succeeds
+        create_day = first_day + timedelta(days=1)
+        create_slots = iter(self.free_slots(rng, create_day, repeat + 1))
+
+        def create():
+            workspace_id, hour = next(create_slots)
+            response = client.post(reverse('create_booking'), {
+                'workspace': workspace_id,
+                'booking_date': create_day.isoformat(),
+                'start_time': f"{hour:02d}:00",
+                'end_time': f"{hour + 1:02d}:00",
+            })
+            assert response.status_code == 302, response.status_code
+
+        results['create_booking'] = self.measure(create, repeat)
+        # create_booking also redirects when the booking is rejected;
+        # counted after timing so the check adds no query to the results
+        created = Booking.objects.filter(
+            user=user, booking_date=create_day
+        ).count()
+        if created != repeat + 1:
+            raise CommandError(
+                f"create_booking made {created} of {repeat + 1} bookings"
+            )
+
+        own_booking = Booking.objects.filter(
+            user=user, booking_date=create_day
+        ).first()
+        update_slots = iter(self.free_slots(rng, create_day, repeat + 1))
+
+        def update():
+            workspace_id, hour = next(update_slots)
+            response = client.post(
+                reverse('update_booking', args=[own_booking.pk]),
+                {
+                    'workspace': workspace_id,
+                    'booking_date': create_day.isoformat(),
+                    'start_time': f"{hour:02d}:00",
+                    'end_time': f"{hour + 1:02d}:00",
+                },
+            )
+            assert response.status_code == 200, response.content
+
+        results['update_booking'] = self.measure(update, repeat)
+
+        results['my_bookings'] = self.measure(
+            get(reverse('my_bookings')), repeat
+        )
+
+        busiest = Booking.objects.filter(booking_date=first_day).first()
+        candidate = Booking(
+            user=user,
+            workspace=busiest.workspace,
+            booking_date=first_day,
+            start_time=time_of_day(8),
+            end_time=time_of_day(22),
+        )
+        results['booking_clean'] = self.measure(
+            lambda: self.expect_invalid(candidate), repeat
+        )
+        return results
+
+    def expect_invalid(self, booking):
+        try:
+            booking.clean()
+        except ValidationError:
+            return
+        raise AssertionError("Booking.clean() accepted an overlapping slot")
+
+    def measure(self, func, repeat, setup=None):
+        """
+        Run func once to warm up, then `repeat` timed iterations.
+
+        Returns:
+            dict: median/p95/min wall time in ms and the median query count
+        """
+        if setup:
+            setup()
+        func()
+        durations = []
+        query_counts = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func()
+                durations.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries.captured_queries))
+        durations.sort()
+        return {
+            'median_ms': round(statistics.median(durations), 3),
+            'p95_ms': round(
+                durations[max(0, round(0.95 * len(durations)) - 1)], 3
+            ),
+            'min_ms': round(durations[0], 3),
+            'queries': int(statistics.median(query_counts)),
+        }
+
+    # ------------------------------------------------------------------------
+    # REPORTING
+    # ------------------------------------------------------------------------
+
+    def print_results(self, results):
+        header = (
+            f"{'benchmark':<28} {'median ms':>10} {'p95 ms':>10} "
+            f"{'min ms':>10} {'queries':>8}"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<28} {result['median_ms']:>10} "
+                f"{result['p95_ms']:>10} {result['min_ms']:>10} "
+                f"{result['queries']:>8}"
+            )
+
+    def compare(self, results, baseline_path, tolerance):
+        with open(baseline_path) as f:
+            baseline = json.load(f)['results']
+
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            limit = previous['median_ms'] * (1 + tolerance)
+            if result['median_ms'] > limit:
+                regressions.append(
+                    f"{name}: median {result['median_ms']} ms > "
+                    f"{previous['median_ms']} ms baseline"
+                )
+            if result['queries'] > previous['queries']:
+                regressions.append(
+                    f"{name}: {result['queries']} queries > "
+                    f"{previous['queries']} baseline"
+                )
+
+        if regressions:
+            raise CommandError(
+                "Performance regressions against baseline:\n  "
+                + "\n  ".join(regressions)
+            )
+        self.stdout.write(
+            self.style.SUCCESS("No regressions against baseline.")
+        )
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from booking import cache
+from booking.models import Booking
+
+
+def invalidate_dates(dates):
+    for booking_date in dates:
+        cache.invalidate_date(booking_date)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark confirmed bookings whose end time has passed as completed, "
+        "with one UPDATE per batch. Safe to run repeatedly (e.g. from cron "
+        "every few minutes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Bookings updated per statement (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        now = timezone.now()
+        expired = Booking.objects.filter(status='confirmed').past(now)
+
+        completed = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    expired.order_by('pk').values_list(
+                        'pk', 'booking_date'
+                    )[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                # The status filter makes a concurrent run a no-op
+                completed += Booking.objects.filter(
+                    pk__in=[pk for pk, _ in batch],
+                    status='confirmed',
+                ).update(
+                    status='completed',
+                    updated_at=now,
+                    version=F('version') + 1,
+                )
+
+                # Completed bookings no longer occupy their slot;
+                # update() sends no signals
+                dates = {booking_date for _, booking_date in batch}
+                transaction.on_commit(
+                    lambda dates=dates: invalidate_dates(dates)
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Marked {completed} past bookings as completed."
+        ))
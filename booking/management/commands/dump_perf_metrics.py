@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from booking import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the per-URL-name request timings (p50/p95/p99) recorded by "
+        "PerformanceMetricsMiddleware. Requires a cache shared with the "
+        "web processes (set CACHE_DIR)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help="Output the aggregate as JSON",
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help="Delete the recorded samples after printing them",
+        )
+
+    def handle(self, *args, **options):
+        summary = metrics.aggregate()
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2, sort_keys=True))
+        elif not summary:
+            self.stdout.write("No request metrics recorded.")
+        else:
+            header = (
+                f"{'url name':<40} {'count':>6} "
+                f"{'wall p50':>9} {'p95':>9} {'p99':>9} "
+                f"{'db p95':>9} {'queries p95':>12} {'tpl p95':>9}"
+            )
+            self.stdout.write(header)
+            self.stdout.write('-' * len(header))
+            for url_name, entry in sorted(summary.items()):
+                self.stdout.write(
+                    f"{url_name:<40} {entry['count']:>6} "
+                    f"{entry['wall_ms']['p50']:>9} "
+                    f"{entry['wall_ms']['p95']:>9} "
+                    f"{entry['wall_ms']['p99']:>9} "
+                    f"{entry['db_ms']['p95']:>9} "
+                    f"{entry['queries']['p95']:>12} "
+                    f"{entry['template_ms']['p95']:>9}"
+                )
+
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS("Metrics reset."))
@@ -0,0 +1,191 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import Floor, WorkSpace
+from booking.signals import workspaces_changed
+from config.svg_parser import iter_shapes, shape_to_workspace_fields
+
+
+# Fields taken from the SVG; everything else is left as edited in admin
+GEOMETRY_FIELDS = (
+    'svg_shape',
+    'svg_x_coord',
+    'svg_y_coord',
+    'svg_width',
+    'svg_height',
+)
+
+# Fields set only when a workspace is created by the import
+CREATE_FIELDS = GEOMETRY_FIELDS + (
+    'name',
+    'svg_id',
+    'status',
+    'location',
+    'capacity',
+    'workspace_type',
+    'description',
+    'amenities',
+    'hourly_rate',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import workspaces from an SVG floor plan. The SVG is streamed in "
+        "one pass and diffed against existing workspaces by svg_id; only "
+        "new and moved shapes are written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('svg_file', help="Path to the SVG floor plan")
+        parser.add_argument(
+            '--location', default='Auto-imported',
+            help="Location of newly created workspaces",
+        )
+        parser.add_argument(
+            '--floor', type=int,
+            help=(
+                "Id of the floor the SVG belongs to. Only workspaces on "
+                "that floor are diffed, and new ones are placed on it. "
+                "Required once any floor exists"
+            ),
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Rows per bulk_create/bulk_update statement",
+        )
+        parser.add_argument(
+            '--deactivate-missing',
+            action='store_true',
+            help=(
+                "Mark workspaces whose svg_id is not in the file as "
+                "unavailable (they are never deleted)"
+            ),
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report the changes without writing them",
+        )
+
+    def handle(self, *args, **options):
+        floor = None
+        if options['floor'] is not None:
+            try:
+                floor = Floor.objects.get(pk=options['floor'])
+            except Floor.DoesNotExist:
+                raise CommandError(f"Floor {options['floor']} does not exist")
+        elif Floor.objects.exists():
+            # Workspaces without a floor are left off every floor view
+            floors = ', '.join(
+                f"{floor.pk} ({floor})" for floor in Floor.objects.all()
+            )
+            raise CommandError(f"--floor is required; floors: {floors}")
+
+        shapes = self.read_shapes(options['svg_file'])
+
+        workspaces = WorkSpace.objects.only(
+            'id', 'name', 'svg_id', 'updated_at', *GEOMETRY_FIELDS
+        )
+        if floor is not None:
+            workspaces = workspaces.filter(floor=floor)
+        existing = {workspace.svg_id: workspace for workspace in workspaces}
+        # Names are unique across all floors
+        taken_names = set(WorkSpace.objects.values_list('name', flat=True))
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        unchanged = 0
+        for position, (svg_id, shape) in enumerate(shapes.items(), start=1):
+            fields = shape_to_workspace_fields(shape, position)
+            if any(fields[field] < 0 for field in GEOMETRY_FIELDS[1:]):
+                self.stderr.write(self.style.WARNING(
+                    f"Skipping {svg_id}: negative coordinates or size."
+                ))
+                continue
+
+            workspace = existing.get(svg_id)
+            if workspace is None:
+                fields['location'] = options['location']
+                if fields['name'] in taken_names:
+                    fields['name'] = f"{fields['name']} ({svg_id})"
+                taken_names.add(fields['name'])
+                to_create.append(WorkSpace(floor=floor, **{
+                    field: fields[field] for field in CREATE_FIELDS
+                }))
+                continue
+
+            changed = False
+            for field in GEOMETRY_FIELDS:
+                if getattr(workspace, field) != fields[field]:
+                    setattr(workspace, field, fields[field])
+                    changed = True
+            if changed:
+                # bulk_update() does not apply auto_now
+                workspace.updated_at = now
+                to_update.append(workspace)
+            else:
+                unchanged += 1
+
+        missing = [
+            workspace.pk
+            for svg_id, workspace in existing.items()
+            if svg_id not in shapes
+        ]
+
+        with transaction.atomic():
+            WorkSpace.objects.bulk_create(
+                to_create, batch_size=options['batch_size']
+            )
+            WorkSpace.objects.bulk_update(
+                to_update,
+                fields=list(GEOMETRY_FIELDS) + ['updated_at'],
+                batch_size=options['batch_size'],
+            )
+            deactivated = 0
+            if options['deactivate_missing'] and missing:
+                deactivated = WorkSpace.objects.filter(
+                    pk__in=missing
+                ).exclude(status='unavailable').update(
+                    status='unavailable', updated_at=now,
+                )
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+            elif to_create or to_update or deactivated:
+                # Bulk writes send no model signals
+                transaction.on_commit(workspaces_changed)
+
+        prefix = "Would import" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {len(shapes)} shapes: {len(to_create)} created, "
+            f"{len(to_update)} updated, {unchanged} unchanged, "
+            f"{len(missing)} not in file"
+            + (f" ({deactivated} deactivated)." if deactivated else ".")
+        ))
+
+    def read_shapes(self, svg_file):
+        """
+        Stream the SVG into {svg_id: shape}; later duplicates win.
+        """
+        shapes = {}
+        duplicates = 0
+        try:
+            for shape in iter_shapes(svg_file):
+                svg_id = shape.get('svg_id')
+                if not svg_id:
+                    continue
+                if svg_id in shapes:
+                    duplicates += 1
+                shapes[str(svg_id)] = shape
+        except (OSError, SyntaxError) as e:
+            # ElementTree.ParseError subclasses SyntaxError
+            raise CommandError(f"Could not read {svg_file}: {e}")
+        if duplicates:
+            self.stderr.write(self.style.WARNING(
+                f"{duplicates} shapes had a duplicate svg_id; "
+                f"the last one was used."
+            ))
+        return shapes
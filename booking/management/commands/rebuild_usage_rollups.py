@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from booking.availability import parse_date
+from booking.models import ArchivedBooking, Booking, DailyWorkspaceUsage
+from booking.usage import booked_slots, save_usage, usage_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily workspace usage rollups from booking history "
+        "(live and archived bookings), a chunk of days at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start', help="First date to rebuild (default: first booking)"
+        )
+        parser.add_argument(
+            '--end', help="Last date to rebuild (default: last booking)"
+        )
+        parser.add_argument(
+            '--chunk-days', type=int, default=31,
+            help="Days rebuilt per transaction (default: 31)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = parse_date(options['start']) if options['start'] else None
+            end = parse_date(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        if options['chunk_days'] < 1:
+            raise CommandError("--chunk-days must be at least 1")
+
+        if start is None or end is None:
+            bounds = [
+                model.objects.aggregate(
+                    first=Min('booking_date'), last=Max('booking_date')
+                )
+                for model in (Booking, ArchivedBooking)
+            ]
+            firsts = [b['first'] for b in bounds if b['first'] is not None]
+            if not firsts:
+                self.stdout.write("No bookings to roll up.")
+                return
+            start = start or min(firsts)
+            end = end or max(b['last'] for b in bounds if b['last'])
+
+        chunk = timedelta(days=options['chunk_days'])
+        chunk_start = start
+        cells = 0
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + chunk - timedelta(days=1), end)
+            cells += self.rebuild(chunk_start, chunk_end)
+            self.stdout.write(f"  {chunk_start} - {chunk_end}")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt usage rollups from {start} to {end}: {cells} rows."
+        ))
+
+    def rebuild(self, first_day, last_day):
+        """
+        Replace the rollups of one date range.
+
+        Returns:
+            int: number of rollup rows written
+        """
+        totals = usage_rows(
+            booked_slots(booking_date__range=(first_day, last_day))
+        )
+        with transaction.atomic():
+            DailyWorkspaceUsage.objects.filter(
+                date__range=(first_day, last_day)
+            ).delete()
+            save_usage(totals)
+        return len(totals)
@@ -0,0 +1,127 @@
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from booking import tasks
+
+
+def run_task(claimed):
+    try:
+        return tasks.run(claimed)
+    finally:
+        # Each pool thread has its own database connections
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background tasks (see booking.tasks) until stopped. "
+        "Several workers can run at once, on one or more machines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue', action='append', dest='queues',
+            help="Only run tasks of this queue (repeatable; default: all)",
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=2,
+            help="Tasks run at the same time by this worker (default: 2)",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help="Seconds to wait when no task is due (default: 1)",
+        )
+        parser.add_argument(
+            '--lock-timeout', type=int, default=tasks.LOCK_TIMEOUT_SECONDS,
+            help=(
+                "Seconds after which a running task is assumed lost and "
+                "queued again (default: %(default)s)"
+            ),
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Exit once no task is due instead of polling",
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError("--concurrency must be at least 1")
+        if options['poll_interval'] <= 0:
+            raise CommandError("--poll-interval must be positive")
+
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f"Worker {worker} started.")
+
+        self.succeeded = self.failed = 0
+        running = set()
+        next_stale_check = 0
+        with ThreadPoolExecutor(
+            max_workers=options['concurrency'],
+            thread_name_prefix='task',
+        ) as pool:
+            while not self.stopping:
+                if time.monotonic() >= next_stale_check:
+                    requeued = tasks.requeue_stale(options['lock_timeout'])
+                    if requeued:
+                        self.stdout.write(f"  {requeued} lost tasks requeued")
+                    next_stale_check = time.monotonic() + 60
+
+                # Only claim what this worker can start straight away
+                free = options['concurrency'] - len(running)
+                claimed = tasks.claim(worker, options['queues'], free)
+                for task in claimed:
+                    running.add(pool.submit(run_task, task))
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                # Block while every slot is busy; otherwise claim more
+                # straight away if there was work, or poll again later
+                if len(running) >= options['concurrency']:
+                    timeout = None
+                elif claimed:
+                    timeout = 0
+                else:
+                    timeout = options['poll_interval']
+                done, running = wait(
+                    running, timeout=timeout, return_when=FIRST_COMPLETED
+                )
+                self.record(done)
+
+            # Finish the tasks already claimed before exiting
+            self.record(wait(running).done)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker {worker} stopped: {self.succeeded} tasks succeeded, "
+            f"{self.failed} failed or will be retried."
+        ))
+
+    def record(self, futures):
+        for future in futures:
+            try:
+                succeeded = future.result()
+            except Exception as e:
+                # The task ran but its outcome could not be saved; it is
+                # queued again once its lock times out
+                self.stderr.write(f"  Task bookkeeping failed: {e}")
+                succeeded = False
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from booking import holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired workspace slot holds. Expired holds are already "
+        "ignored, so this only keeps the table small; safe to run "
+        "repeatedly (e.g. from cron every few minutes)."
+    )
+
+    def handle(self, *args, **options):
+        deleted = holds.sweep_expired()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} expired slot holds."
+        ))
@@ -0,0 +1,143 @@
+import math
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# ============================================================================
+# REQUEST METRICS
+# ============================================================================
+# Per-URL-name aggregate of request timings recorded by
+# booking.middleware.PerformanceMetricsMiddleware.
+#
+# Samples are buffered in-process and flushed to the Django cache every
+# few requests, so the dump_perf_metrics command (a separate process) can
+# read them. Use a shared backend (CACHE_DIR) for that to work across
+# processes; each URL name keeps its most recent PERF_METRICS_SAMPLES.
+# ============================================================================
+
+KEY_PREFIX = 'perf'
+INDEX_KEY = f'{KEY_PREFIX}:url_names'
+
+# Measurements recorded for every request
+FIELDS = ('wall_ms', 'db_ms', 'queries', 'template_ms')
+
+_buffer = {}
+_buffered = 0
+_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'PERF_METRICS_CACHE', 'default')]
+
+
+def _samples_key(url_name):
+    return f'{KEY_PREFIX}:samples:{url_name}'
+
+
+def record(url_name, sample):
+    """
+    Buffer one request's measurements, flushing every
+    PERF_METRICS_FLUSH_EVERY requests.
+
+    Args:
+        url_name: resolved view name (e.g. 'book_workspace')
+        sample: tuple of values in FIELDS order
+    """
+    global _buffered
+    flush_every = getattr(settings, 'PERF_METRICS_FLUSH_EVERY', 20)
+    with _lock:
+        _buffer.setdefault(url_name, []).append(sample)
+        _buffered += 1
+        if _buffered < flush_every:
+            return
+        pending = dict(_buffer)
+        _buffer.clear()
+        _buffered = 0
+    _flush(pending)
+
+
+def flush():
+    """
+    Write any buffered samples to the cache now.
+    """
+    global _buffered
+    with _lock:
+        pending = dict(_buffer)
+        _buffer.clear()
+        _buffered = 0
+    _flush(pending)
+
+
+def _flush(pending):
+    if not pending:
+        return
+    cache = _cache()
+    max_samples = getattr(settings, 'PERF_METRICS_SAMPLES', 1000)
+    url_names = set(cache.get(INDEX_KEY, ()))
+    stored = cache.get_many([_samples_key(name) for name in pending])
+    updates = {}
+    for url_name, samples in pending.items():
+        key = _samples_key(url_name)
+        merged = list(stored.get(key, ())) + samples
+        updates[key] = merged[-max_samples:]
+        url_names.add(url_name)
+    updates[INDEX_KEY] = sorted(url_names)
+    cache.set_many(updates, None)
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list: the smallest value
+    with at least `fraction` of the values at or below it.
+    """
+    if not values:
+        return None
+    # Rounded first so float error (0.07 * 100 == 7.000000000000001) does
+    # not push the rank up by one
+    rank = max(1, math.ceil(round(fraction * len(values), 9)))
+    return values[min(rank, len(values)) - 1]
+
+
+def aggregate():
+    """
+    Summarise the stored samples per URL name.
+
+    Returns:
+        dict: {url_name: {'count': int,
+                          'wall_ms': {'p50', 'p95', 'p99', 'max'}, ...}}
+    """
+    cache = _cache()
+    url_names = cache.get(INDEX_KEY, ())
+    stored = cache.get_many([_samples_key(name) for name in url_names])
+    summary = {}
+    for url_name in url_names:
+        samples = stored.get(_samples_key(url_name))
+        if not samples:
+            continue
+        entry = {'count': len(samples)}
+        for position, field in enumerate(FIELDS):
+            values = sorted(sample[position] for sample in samples)
+            entry[field] = {
+                'p50': percentile(values, 0.50),
+                'p95': percentile(values, 0.95),
+                'p99': percentile(values, 0.99),
+                'max': values[-1],
+            }
+        summary[url_name] = entry
+    return summary
+
+
+def reset():
+    """
+    Delete all stored and buffered samples.
+    """
+    global _buffered
+    with _lock:
+        _buffer.clear()
+        _buffered = 0
+    cache = _cache()
+    url_names = cache.get(INDEX_KEY, ())
+    cache.delete_many([_samples_key(name) for name in url_names])
+    cache.delete(INDEX_KEY)
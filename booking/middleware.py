@@ -0,0 +1,117 @@
+import contextvars
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+from . import metrics
+
+
+# ============================================================================
+# PERFORMANCE METRICS MIDDLEWARE
+# ============================================================================
+# Opt-in (PERF_METRICS=True). For every request records:
+# - number of SQL queries and total SQL time
+# - template render time
+# - wall time
+# and reports them in a Server-Timing header and the per-URL-name
+# aggregate in booking.metrics (see the dump_perf_metrics command).
+# ============================================================================
+
+_current_request = contextvars.ContextVar('perf_request', default=None)
+
+
+class RequestTimings:
+    """
+    Measurements collected while handling one request.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def _install_template_timer():
+    """
+    Wrap Template.render once so top-level renders are timed; nested
+    renders ({% include %}) are already inside the outer measurement.
+
+    Only called when PERF_METRICS is on, so the template engine is left
+    untouched otherwise. The template_rendered signal cannot replace
+    this: Django only sends it under the test runner, and without timing.
+    """
+    if getattr(Template.render, '_perf_timed', False):
+        return
+    original_render = Template.render
+
+    def render(self, context):
+        timings = _current_request.get()
+        if timings is None or timings.template_depth:
+            return original_render(self, context)
+        timings.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            timings.template_seconds += time.perf_counter() - start
+            timings.template_depth -= 1
+
+    render._perf_timed = True
+    Template.render = render
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Records query count, SQL time, template time and wall time per view.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _install_template_timer()
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current_request.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        wall_seconds = time.perf_counter() - start
+
+        wall_ms = round(wall_seconds * 1000, 2)
+        db_ms = round(timings.db_seconds * 1000, 2)
+        template_ms = round(timings.template_seconds * 1000, 2)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms};desc="{timings.queries} queries"',
+            f'tpl;dur={template_ms}',
+            f'total;dur={wall_ms}',
+        ])
+
+        match = request.resolver_match
+        if match is not None:
+            metrics.record(
+                match.view_name,
+                (wall_ms, db_ms, timings.queries, template_ms),
+            )
+        return response
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.25 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+ACTIVE_STATUSES_SQL = "('pending', 'confirmed')"
+
+# PostgreSQL: range-based exclusion constraint. btree_gist provides the
+# GiST operator class for the workspace_id equality.
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    f"""
+    ALTER TABLE booking_booking
+    ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (
+        workspace_id WITH =,
+        tsrange(booking_date + start_time, booking_date + end_time) WITH &&
+    )
+    WHERE (status IN {ACTIVE_STATUSES_SQL})
+    """,
+]
+
+POSTGRESQL_REVERSE = [
+    "ALTER TABLE booking_booking DROP CONSTRAINT IF EXISTS booking_no_overlap",
+]
+
+# SQLite: equivalent single EXISTS probe run inside the writing statement,
+# so it is serialised with every other write to the database.
+SQLITE_OVERLAP_CONDITION = f"""
+    NEW.status IN {ACTIVE_STATUSES_SQL}
+    AND EXISTS (
+        SELECT 1 FROM booking_booking
+        WHERE workspace_id = NEW.workspace_id
+        AND booking_date = NEW.booking_date
+        AND status IN {ACTIVE_STATUSES_SQL}
+        AND start_time < NEW.end_time
+        AND end_time > NEW.start_time
+        AND id IS NOT NEW.id
+    )
+"""
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE TRIGGER booking_no_overlap_insert
+    BEFORE INSERT ON booking_booking
+    WHEN {SQLITE_OVERLAP_CONDITION}
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+    f"""
+    CREATE TRIGGER booking_no_overlap_update
+    BEFORE UPDATE OF workspace_id, booking_date, start_time, end_time, status
+    ON booking_booking
+    WHEN {SQLITE_OVERLAP_CONDITION}
+    BEGIN
+        SELECT RAISE(ABORT, 'booking_no_overlap');
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS booking_no_overlap_insert",
+    "DROP TRIGGER IF EXISTS booking_no_overlap_update",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements_by_vendor.get(vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+add_overlap_guard = _run({
+    'postgresql': POSTGRESQL_FORWARD,
+    'sqlite': SQLITE_FORWARD,
+})
+
+remove_overlap_guard = _run({
+    'postgresql': POSTGRESQL_REVERSE,
+    'sqlite': SQLITE_REVERSE,
+})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['workspace', 'booking_date', 'status', 'start_time', 'end_time'], name='booking_overlap_idx'),
+        ),
+        migrations.RunPython(add_overlap_guard, remove_overlap_guard),
+    ]
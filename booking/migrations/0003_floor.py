@@ -0,0 +1,59 @@
+# Generated by Django 4.2.25 on 2026-10-18 08:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def assign_default_floor(apps, schema_editor):
+    """
+    Put existing workspaces on a default floor so the floor plan keeps
+    showing them once it loads one floor at a time.
+    """
+    Floor = apps.get_model('booking', 'Floor')
+    WorkSpace = apps.get_model('booking', 'WorkSpace')
+    if not WorkSpace.objects.filter(floor__isnull=True).exists():
+        return
+    floor, _ = Floor.objects.get_or_create(
+        building='Main Building', name='Ground Floor', defaults={'level': 0}
+    )
+    WorkSpace.objects.filter(floor__isnull=True).update(floor=floor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_booking_overlap_guard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Floor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('building', models.CharField(help_text="Building the floor belongs to (e.g., 'Main Building')", max_length=100)),
+                ('name', models.CharField(help_text="Name of the floor (e.g., 'Ground Floor', 'Level 2')", max_length=100)),
+                ('level', models.IntegerField(default=0, help_text='Floor number used for ordering (0 = ground floor)')),
+            ],
+            options={
+                'verbose_name': 'Floor',
+                'verbose_name_plural': 'Floors',
+                'ordering': ['building', 'level', 'name'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='floor',
+            constraint=models.UniqueConstraint(fields=('building', 'name'), name='unique_floor_per_building'),
+        ),
+        migrations.AddField(
+            model_name='workspace',
+            name='floor',
+            field=models.ForeignKey(blank=True, help_text='Floor plan this workspace is shown on', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workspaces', to='booking.floor'),
+        ),
+        migrations.AddIndex(
+            model_name='workspace',
+            index=models.Index(fields=['floor', 'workspace_type', 'name'], name='workspace_floor_idx'),
+        ),
+        migrations.RunPython(
+            assign_default_floor, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_floor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'booking_date', 'start_time'], name='booking_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_booking_user_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyWorkspaceUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('booked_minutes', models.PositiveIntegerField(default=0, help_text='Minutes booked by pending, confirmed or completed bookings')),
+                ('booking_count', models.PositiveIntegerField(default=0)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='booking.workspace')),
+            ],
+            options={
+                'verbose_name': 'Daily workspace usage',
+                'verbose_name_plural': 'Daily workspace usage',
+                'ordering': ['-date', 'workspace'],
+                'indexes': [models.Index(fields=['date'], name='usage_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyworkspaceusage',
+            constraint=models.UniqueConstraint(fields=('workspace', 'date'), name='unique_usage_per_workspace_day'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('booking', '0005_daily_workspace_usage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Id the booking had in the Booking table', primary_key=True, serialize=False)),
+                ('booking_date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=20)),
+                ('purpose', models.CharField(blank=True, max_length=200)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='booking.workspace')),
+            ],
+            options={
+                'verbose_name': 'Archived booking',
+                'verbose_name_plural': 'Archived bookings',
+                'ordering': ['-booking_date', '-start_time'],
+                'indexes': [models.Index(fields=['workspace', 'booking_date'], name='archived_workspace_date_idx'), models.Index(fields=['user', 'booking_date'], name='archived_user_date_idx')],
+            },
+        ),
+    ]
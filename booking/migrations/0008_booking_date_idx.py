@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_booking_status_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['-booking_date', '-start_time'], name='archived_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-booking_date', '-start_time'], name='booking_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.25 on 2026-10-18 09:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('booking', '0010_booking_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_holds', to=settings.AUTH_USER_MODEL)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='booking.workspace')),
+            ],
+            options={
+                'verbose_name': 'Slot hold',
+                'verbose_name_plural': 'Slot holds',
+                'ordering': ['expires_at'],
+                'indexes': [models.Index(fields=['booking_date', 'workspace', 'start_time'], name='slothold_date_idx'), models.Index(fields=['expires_at'], name='slothold_expiry_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# Same trigger SQL as the guard added in 0002
+overlap_guard = import_module('booking.migrations.0002_booking_overlap_guard')
+
+
+def restore_sqlite_overlap_guard(apps, schema_editor):
+    """
+    SQLite rebuilds a table to add a column (0010 added Booking.version),
+    dropping its triggers with it. Recreate the overlap guard triggers;
+    PostgreSQL keeps its exclusion constraint across ALTER TABLE.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in overlap_guard.SQLITE_REVERSE:
+        schema_editor.execute(statement)
+    for statement in overlap_guard.SQLITE_FORWARD:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_slot_hold'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            restore_sqlite_overlap_guard, migrations.RunPython.noop
+        ),
+    ]
@@ -1,10 +1,50 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from datetime import datetime, time
 
 
+# ============================================================================
+# FLOOR MODEL
+# ============================================================================
+# Groups workspaces by building and floor so the floor plan can be loaded
+# one floor at a time
+# ============================================================================
+
+class Floor(models.Model):
+
+    building = models.CharField(
+        max_length=100,
+        help_text="Building the floor belongs to (e.g., 'Main Building')"
+    )
+
+    name = models.CharField(
+        max_length=100,
+        help_text="Name of the floor (e.g., 'Ground Floor', 'Level 2')"
+    )
+
+    level = models.IntegerField(
+        default=0,
+        help_text="Floor number used for ordering (0 = ground floor)"
+    )
+
+    class Meta:
+        ordering = ['building', 'level', 'name']
+        verbose_name = 'Floor'
+        verbose_name_plural = 'Floors'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['building', 'name'],
+                name='unique_floor_per_building'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.building} - {self.name}"
+
+
 # ============================================================================
 # WORKSPACE MODEL
 # ============================================================================
@@ -49,6 +89,15 @@ class WorkSpace(models.Model):
         )
     )
 
+    floor = models.ForeignKey(
+        Floor,
+        on_delete=models.SET_NULL,  # Keep workspaces if a floor is removed
+        null=True,
+        blank=True,
+        related_name='workspaces',  # Allows: floor.workspaces.all()
+        help_text="Floor plan this workspace is shown on"
+    )
+
     location = models.CharField(
         max_length=255,
         help_text=(
@@ -156,6 +205,14 @@ class WorkSpace(models.Model):
         verbose_name = 'Workspace'
         verbose_name_plural = 'Workspaces'
 
+        # Per-floor loading of the floor plan in default order
+        indexes = [
+            models.Index(
+                fields=['floor', 'workspace_type', 'name'],
+                name='workspace_floor_idx',
+            ),
+        ]
+
     # ========================================================================
     # STRING REPRESENTATION
     # How the model appears in admin and debugging
@@ -197,6 +254,75 @@ class WorkSpace(models.Model):
         return f"{self.name} ({self.get_workspace_type_display()})"
 
 
+# Booking statuses that occupy a workspace for their time slot
+ACTIVE_BOOKING_STATUSES = ('pending', 'confirmed')
+
+# Booking statuses that can no longer be edited or cancelled
+FINAL_BOOKING_STATUSES = ('cancelled', 'completed')
+
+# Name of the database-level guard against overlapping active bookings.
+# On SQLite it is a pair of triggers, which a migration that rebuilds
+# booking_booking (most column changes) drops: such a migration must
+# recreate them, as 0012_restore_overlap_guard does
+OVERLAP_CONSTRAINT_NAME = 'booking_no_overlap'
+
+
+# ============================================================================
+# BOOKING QUERYSET
+# ============================================================================
+# Set-based versions of Booking.is_past() / can_be_modified() so lists of
+# bookings can be split and flagged in the query instead of per row
+# ============================================================================
+
+class BookingQuerySet(models.QuerySet):
+
+    @staticmethod
+    def past_q(now=None):
+        """
+        Q matching bookings whose end time has passed (see is_past()).
+        """
+        now = timezone.localtime(now or timezone.now())
+        return models.Q(booking_date__lt=now.date()) | models.Q(
+            booking_date=now.date(),
+            end_time__lt=now.time(),
+        )
+
+    def upcoming(self, now=None):
+        return self.exclude(self.past_q(now))
+
+    def past(self, now=None):
+        return self.filter(self.past_q(now))
+
+    def with_flags(self, now=None):
+        """
+        Annotate `past` and `modifiable`, matching is_past() and
+        can_be_modified().
+        """
+        past_q = self.past_q(now)
+        return self.annotate(
+            past=models.Case(
+                models.When(past_q, then=models.Value(True)),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            ),
+            modifiable=models.Case(
+                models.When(
+                    past_q | models.Q(status__in=FINAL_BOOKING_STATUSES),
+                    then=models.Value(False),
+                ),
+                default=models.Value(True),
+                output_field=models.BooleanField(),
+            ),
+        )
+
+
+class BookingVersionConflict(ValidationError):
+    """
+    Raised by Booking.save() when the row was changed by another request
+    since the instance was loaded (its version no longer matches).
+    """
+
+
 # ============================================================================
 # BOOKING MODEL
 # ============================================================================
@@ -294,6 +420,12 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Bumped by every write; save() only updates the row if it still has
+    # the version this instance was loaded with (see _do_update)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = BookingQuerySet.as_manager()
+
     # ========================================================================
     # META CLASS
     # Configure model behavior and database constraints
@@ -305,6 +437,8 @@ class Booking(models.Model):
         verbose_name_plural = 'Bookings'
 
         # Database constraint: Ensure end_time is always after start_time
+        # Overlapping bookings are rejected by a vendor-specific
+        # constraint/trigger (see migration 0002_booking_overlap_guard)
         constraints = [
             models.CheckConstraint(
                 check=models.Q(end_time__gt=models.F('start_time')),
@@ -312,6 +446,35 @@ class Booking(models.Model):
             )
         ]
 
+        # Composite index backing the overlap check in clean()
+        indexes = [
+            models.Index(
+                fields=[
+                    'workspace',
+                    'booking_date',
+                    'status',
+                    'start_time',
+                    'end_time',
+                ],
+                name='booking_overlap_idx',
+            ),
+            # Backs status sweeps such as complete_past_bookings
+            models.Index(
+                fields=['status', 'booking_date'],
+                name='booking_status_date_idx',
+            ),
+            # Backs the keyset-paginated "My Bookings" lists
+            models.Index(
+                fields=['user', 'booking_date', 'start_time'],
+                name='booking_user_date_idx',
+            ),
+            # Backs the default ordering and the admin date drill-down
+            models.Index(
+                fields=['-booking_date', '-start_time'],
+                name='booking_date_idx',
+            ),
+        ]
+
     # ========================================================================
     # STRING REPRESENTATION
     # ========================================================================
@@ -338,6 +501,7 @@ class Booking(models.Model):
         - Times are within business hours (8 AM - 10 PM)
         - Workspace is available
         - No overlapping bookings for the same workspace
+        - No overlapping hold by another user
 
         Raises:
             ValidationError: If any validation check fails
@@ -392,25 +556,36 @@ class Booking(models.Model):
             and self.start_time
             and self.end_time
         ):
-            # Find confirmed/pending bookings for this workspace on date
-            overlapping_bookings = Booking.objects.filter(
+            # Single indexed probe for a confirmed/pending booking that
+            # overlaps: (start1 < end2) AND (end1 > start2)
+            conflict = Booking.objects.filter(
                 workspace=self.workspace,
                 booking_date=self.booking_date,
-                status__in=['pending', 'confirmed']
-            ).exclude(pk=self.pk)  # Exclude current booking (for updates)
-
-            # Check each booking for time overlap
-            for booking in overlapping_bookings:
-                # Overlap logic: (start1 < end2) AND (end1 > start2)
-                if (
-                    self.start_time < booking.end_time
-                    and self.end_time > booking.start_time
-                ):
-                    errors['start_time'] = (
-                        f"This time slot conflicts with an existing booking "
-                        f"({booking.start_time} - {booking.end_time})."
-                    )
-                    break
+                status__in=ACTIVE_BOOKING_STATUSES,
+                start_time__lt=self.end_time,
+                end_time__gt=self.start_time,
+            ).exclude(
+                pk=self.pk  # Exclude current booking (for updates)
+            ).values('start_time', 'end_time').first()
+
+            if conflict:
+                errors['start_time'] = (
+                    f"This time slot conflicts with an existing booking "
+                    f"({conflict['start_time']} - {conflict['end_time']})."
+                )
+
+            # ----------------------------------------------------------------
+            # CHECK 6: Slot not held by another user (see booking.holds)
+            # ----------------------------------------------------------------
+            elif self.user_id and SlotHold.objects.active().overlapping(
+                self.booking_date, self.start_time, self.end_time,
+            ).filter(
+                workspace=self.workspace,
+            ).exclude(user_id=self.user_id).exists():
+                errors['start_time'] = (
+                    "Someone else is booking this workspace for an "
+                    "overlapping time. Try again in a moment."
+                )
 
         # Raise all validation errors at once
         if errors:
@@ -421,13 +596,62 @@ class Booking(models.Model):
     # Ensure validation runs before every save
     # ========================================================================
 
-    def save(self, *args, **kwargs):
+    def _do_update(self, base_qs, using, pk_val, values, update_fields,
+                   forced_update):
+        """
+        Compare-and-swap: UPDATE ... WHERE id = %s AND version = %s, with
+        the version bumped in the same statement.
+
+        Raises:
+            BookingVersionConflict: if the row was changed since this
+                instance was loaded
+        """
+        expected = self.version
+        version_field = self._meta.get_field('version')
+        values = [
+            (field, model, value) for field, model, value in values
+            if field is not version_field
+        ]
+        values.append((version_field, None, expected + 1))
+        updated = super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values,
+            update_fields, forced_update,
+        )
+        if updated:
+            self.version = expected + 1
+        elif base_qs.filter(pk=pk_val).exists():
+            raise BookingVersionConflict(
+                "This booking was changed by someone else. Review the "
+                "current details and try again."
+            )
+        return updated
+
+    def save(self, *args, validated=False, **kwargs):
         """
         Override save to run validation automatically.
         This ensures clean() is always called before saving.
+
+        Pass validated=True when full_clean() has just run on this
+        instance, as it does for a valid BookingForm, to skip running the
+        same queries again.
+
+        The overlap guard in the database is the final word when two
+        requests pass clean() at the same time; its IntegrityError is
+        reported as a ValidationError like any other conflict.
         """
-        self.full_clean()  # Run all validation
-        super().save(*args, **kwargs)  # Call parent save method
+        if not validated:
+            self.full_clean()  # Run all validation
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)  # Call parent save method
+        except IntegrityError as e:
+            if OVERLAP_CONSTRAINT_NAME not in str(e):
+                raise
+            raise ValidationError({
+                'start_time': (
+                    "This time slot conflicts with an existing booking."
+                )
+            })
 
     # ========================================================================
     # HELPER METHODS
@@ -475,7 +699,7 @@ class Booking(models.Model):
         """
         return (
             not self.is_past()
-            and self.status not in ['cancelled', 'completed']
+            and self.status not in FINAL_BOOKING_STATUSES
         )
 
     def cancel(self):
@@ -490,3 +714,276 @@ class Booking(models.Model):
             self.save()
             return True
         return False
+
+
+# ============================================================================
+# ARCHIVED BOOKING MODEL
+# ============================================================================
+# Cancelled and completed bookings past the archive horizon, moved out of
+# the Booking table by the archive_bookings command so the hot table and
+# its indexes stay small. Rows keep their original booking id.
+# ============================================================================
+
+class ArchivedBooking(models.Model):
+
+    id = models.BigIntegerField(
+        primary_key=True,
+        help_text="Id the booking had in the Booking table"
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_bookings',
+    )
+
+    workspace = models.ForeignKey(
+        WorkSpace,
+        on_delete=models.CASCADE,
+        related_name='archived_bookings',
+    )
+
+    booking_date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=Booking.STATUS_CHOICES,
+    )
+
+    purpose = models.CharField(max_length=200, blank=True)
+    notes = models.TextField(blank=True)
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    # Fields copied as-is from Booking
+    COPIED_FIELDS = (
+        'id',
+        'user_id',
+        'workspace_id',
+        'booking_date',
+        'start_time',
+        'end_time',
+        'status',
+        'purpose',
+        'notes',
+        'created_at',
+        'updated_at',
+    )
+
+    class Meta:
+        ordering = ['-booking_date', '-start_time']
+        verbose_name = 'Archived booking'
+        verbose_name_plural = 'Archived bookings'
+        indexes = [
+            models.Index(
+                fields=['workspace', 'booking_date'],
+                name='archived_workspace_date_idx',
+            ),
+            models.Index(
+                fields=['user', 'booking_date'],
+                name='archived_user_date_idx',
+            ),
+            # Backs the default ordering and the admin date drill-down
+            models.Index(
+                fields=['-booking_date', '-start_time'],
+                name='archived_date_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.user.username} - {self.workspace.name} on "
+            f"{self.booking_date} (archived)"
+        )
+
+    @classmethod
+    def from_booking(cls, booking):
+        return cls(**{
+            field: getattr(booking, field) for field in cls.COPIED_FIELDS
+        })
+
+
+# ============================================================================
+# DAILY WORKSPACE USAGE MODEL
+# ============================================================================
+# Rollup of booked time per workspace and day for utilisation reports
+# Maintained by booking.usage on every booking write and rebuilt from
+# history by the rebuild_usage_rollups command
+# ============================================================================
+
+class DailyWorkspaceUsage(models.Model):
+
+    workspace = models.ForeignKey(
+        WorkSpace,
+        on_delete=models.CASCADE,
+        related_name='daily_usage',
+    )
+
+    date = models.DateField()
+
+    booked_minutes = models.PositiveIntegerField(
+        default=0,
+        help_text="Minutes booked by pending, confirmed or completed bookings"
+    )
+
+    booking_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date', 'workspace']
+        verbose_name = 'Daily workspace usage'
+        verbose_name_plural = 'Daily workspace usage'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['workspace', 'date'],
+                name='unique_usage_per_workspace_day'
+            )
+        ]
+        indexes = [
+            # Date-range scans of the utilisation report
+            models.Index(fields=['date'], name='usage_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.workspace_id} on {self.date}: {self.booked_hours}h"
+
+    @property
+    def booked_hours(self):
+        return round(self.booked_minutes / 60, 2)
+
+
+# ============================================================================
+# SLOT HOLD MODEL
+# ============================================================================
+# Short-lived soft reservation of a workspace and time slot, placed when a
+# user opens the booking form so others see the slot as held instead of
+# racing for it. Expired holds are ignored and deleted in bulk by the
+# sweep_slot_holds command (see booking.holds).
+# ============================================================================
+
+class SlotHoldQuerySet(models.QuerySet):
+
+    def active(self, now=None):
+        return self.filter(expires_at__gt=now or timezone.now())
+
+    def overlapping(self, booking_date, start_time, end_time):
+        # Overlap logic: (start1 < end2) AND (end1 > start2)
+        return self.filter(
+            booking_date=booking_date,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        )
+
+
+class SlotHold(models.Model):
+
+    workspace = models.ForeignKey(
+        WorkSpace,
+        on_delete=models.CASCADE,
+        related_name='holds',
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='slot_holds',
+    )
+
+    booking_date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    expires_at = models.DateTimeField()
+
+    objects = SlotHoldQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['expires_at']
+        verbose_name = 'Slot hold'
+        verbose_name_plural = 'Slot holds'
+        indexes = [
+            # Hold conflicts and the availability overlay
+            models.Index(
+                fields=['booking_date', 'workspace', 'start_time'],
+                name='slothold_date_idx',
+            ),
+            # Bulk sweep of expired holds
+            models.Index(fields=['expires_at'], name='slothold_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.workspace_id} held by {self.user_id} on "
+            f"{self.booking_date} until {self.expires_at}"
+        )
+
+
+# ============================================================================
+# TASK MODEL
+# ============================================================================
+# Deferred work (notifications, rollup refreshes, ...) queued in the
+# database by booking.tasks.enqueue() and run by the run_tasks command.
+# Tasks that succeed are deleted; failed ones stay for inspection.
+# ============================================================================
+
+class Task(models.Model):
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(
+        max_length=200,
+        help_text="Dotted path of the task function"
+    )
+
+    args = models.JSONField(
+        default=list,
+        encoder=DjangoJSONEncoder,
+        help_text="Positional arguments, as stored JSON"
+    )
+
+    queue = models.CharField(max_length=50, default='default')
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+    )
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Not run before this time (retries are backed off)"
+    )
+
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at', 'pk']
+        verbose_name = 'Task'
+        verbose_name_plural = 'Tasks'
+        indexes = [
+            # Backs the worker's "next due task" query
+            models.Index(
+                fields=['status', 'queue', 'run_at'],
+                name='task_claim_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
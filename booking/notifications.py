@@ -0,0 +1,83 @@
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.mail import send_mass_mail
+
+from . import tasks
+from .models import WorkSpace
+
+
+# ============================================================================
+# NOTIFICATIONS
+# ============================================================================
+# Emails telling users about changes made to their bookings by someone
+# else. They are queued as tasks (booking.tasks) so the request that
+# made the change does not wait on the mail server, and are retried if
+# sending fails.
+# ============================================================================
+
+
+def booking_notice(booking):
+    """
+    JSON-serialisable summary of a booking for the notice tasks, from a
+    Booking values() dict that includes workspace__name.
+    """
+    return {
+        'user_id': booking['user_id'],
+        'workspace': booking['workspace__name'],
+        'date': booking['booking_date'].isoformat(),
+        'start_time': booking['start_time'].strftime('%H:%M'),
+        'end_time': booking['end_time'].strftime('%H:%M'),
+    }
+
+
+@tasks.task(queue='notifications', max_attempts=5)
+def send_workspace_status_notices(notices, status, cancelled):
+    """
+    Email each user whose bookings are on workspaces that were taken out
+    of service, one message per user.
+
+    Args:
+        notices: booking_notice() dicts
+        status: the workspaces' new status
+        cancelled: whether the bookings were cancelled or kept
+    """
+    by_user = defaultdict(list)
+    for notice in notices:
+        by_user[notice['user_id']].append(notice)
+    emails = dict(
+        User.objects.filter(pk__in=by_user).exclude(email='').values_list(
+            'pk', 'email'
+        )
+    )
+
+    status = dict(WorkSpace.STATUS_CHOICES)[status].lower()
+    if cancelled:
+        subject = "Your booking has been cancelled"
+        intro = (
+            "The following bookings were cancelled because their "
+            f"workspace is now {status}:"
+        )
+    else:
+        subject = "Your booked workspace is out of service"
+        intro = (
+            f"The workspace of the following bookings is now {status}. "
+            "Your bookings were kept, but you may want to move them:"
+        )
+
+    messages = []
+    for user_id, user_notices in by_user.items():
+        if user_id not in emails:
+            continue
+        lines = [
+            f"- {notice['workspace']} on {notice['date']}, "
+            f"{notice['start_time']}-{notice['end_time']}"
+            for notice in user_notices
+        ]
+        messages.append((
+            subject,
+            '\n'.join([intro, '', *lines]),
+            None,
+            [emails[user_id]],
+        ))
+    send_mass_mail(messages, fail_silently=False)
@@ -0,0 +1,214 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction, IntegrityError
+from django.db.models import BooleanField, Value
+from django.utils import timezone
+
+from . import cache, events, usage
+from .models import (
+    WorkSpace,
+    Booking,
+    SlotHold,
+    ACTIVE_BOOKING_STATUSES,
+    OVERLAP_CONSTRAINT_NAME,
+)
+
+
+# ============================================================================
+# RECURRING / BULK BOOKINGS
+# ============================================================================
+# Expands a recurrence rule into booking dates and books every occurrence
+# of a single workspace and time slot in one transaction. Conflicts are
+# resolved with one set-based query instead of a full_clean() per booking.
+# ============================================================================
+
+# Upper bound on occurrences per request (roughly a year of daily bookings)
+MAX_OCCURRENCES = 366
+
+# Per-occurrence outcomes reported back to the client
+BOOKED = 'booked'
+CONFLICT = 'conflict'
+INVALID = 'invalid'
+
+
+def expand_recurrence(start_date, end_date, weekdays=None, interval=1):
+    """
+    List the dates matching a weekly recurrence rule.
+
+    Args:
+        start_date: first date of the rule (inclusive)
+        end_date: last date of the rule (inclusive)
+        weekdays: iterable of weekday numbers (Monday=0 ... Sunday=6);
+            defaults to the weekday of start_date
+        interval: repeat every `interval` weeks (1 = every week)
+
+    Returns:
+        list: Matching dates in ascending order
+
+    Raises:
+        ValidationError: If the rule produces more than MAX_OCCURRENCES
+    """
+    if weekdays is None or not list(weekdays):
+        weekdays = [start_date.weekday()]
+    weekdays = {int(day) for day in weekdays}
+
+    # Weeks are counted from the Monday of the first week
+    first_monday = start_date - timedelta(days=start_date.weekday())
+    dates = []
+    current = start_date
+    while current <= end_date:
+        week_number = (current - first_monday).days // 7
+        if current.weekday() in weekdays and week_number % interval == 0:
+            dates.append(current)
+            if len(dates) > MAX_OCCURRENCES:
+                raise ValidationError(
+                    f"A recurring booking cannot have more than "
+                    f"{MAX_OCCURRENCES} occurrences."
+                )
+        current += timedelta(days=1)
+    return dates
+
+
+def book_occurrences(
+    user, workspace, dates, start_time, end_time, purpose='', notes=''
+):
+    """
+    Book the same workspace and time slot on each of the given dates.
+
+    All occurrences are checked against existing bookings and other
+    users' slot holds with a single query, and the conflict-free ones are
+    inserted with bulk_create inside one transaction.
+
+    Returns:
+        list: One dict per date with 'date', 'status' ('booked',
+            'conflict' or 'invalid'), 'booking_id' and 'message'
+
+    Raises:
+        ValidationError: If the workspace cannot be booked at all
+    """
+    dates = sorted(set(dates))
+    today = timezone.now().date()
+    results = {}
+
+    for booking_date in dates:
+        if booking_date < today:
+            results[booking_date] = _outcome(
+                booking_date, INVALID,
+                message="Booking date cannot be in the past."
+            )
+    candidate_dates = [d for d in dates if d not in results]
+
+    with transaction.atomic():
+        # Lock the workspace row so concurrent bulk requests for the same
+        # workspace are serialised (no-op on SQLite, which locks on write)
+        workspace = WorkSpace.objects.select_for_update().get(
+            pk=workspace.pk
+        )
+        if not workspace.is_available():
+            raise ValidationError({
+                'workspace': (
+                    f"This workspace is currently {workspace.status}."
+                )
+            })
+
+        # Overlapping active bookings and other users' unexpired holds,
+        # in one query (bulk_create() skips the hold check in clean())
+        slot = ('booking_date', 'start_time', 'end_time', 'is_hold')
+        booked = Booking.objects.filter(
+            workspace=workspace,
+            booking_date__in=candidate_dates,
+            status__in=ACTIVE_BOOKING_STATUSES,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        ).annotate(
+            is_hold=Value(False, output_field=BooleanField())
+        ).order_by().values_list(*slot)
+        held = SlotHold.objects.active().filter(
+            workspace=workspace,
+            booking_date__in=candidate_dates,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        ).exclude(user=user).annotate(
+            is_hold=Value(True, output_field=BooleanField())
+        ).order_by().values_list(*slot)
+
+        conflicts = {}
+        for booking_date, other_start, other_end, is_hold in booked.union(
+            held, all=True
+        ):
+            # A booking is reported over a hold of the same date
+            if not is_hold or booking_date not in conflicts:
+                conflicts[booking_date] = (other_start, other_end, is_hold)
+
+        new_bookings = []
+        for booking_date in candidate_dates:
+            if booking_date in conflicts:
+                other_start, other_end, is_hold = conflicts[booking_date]
+                if is_hold:
+                    message = (
+                        "This time slot is being booked by someone else."
+                    )
+                else:
+                    message = (
+                        f"This time slot conflicts with an existing "
+                        f"booking ({other_start} - {other_end})."
+                    )
+                results[booking_date] = _outcome(
+                    booking_date, CONFLICT, message=message
+                )
+                continue
+            new_bookings.append(Booking(
+                user=user,
+                workspace=workspace,
+                booking_date=booking_date,
+                start_time=start_time,
+                end_time=end_time,
+                status='confirmed',
+                purpose=purpose,
+                notes=notes,
+            ))
+
+        try:
+            with transaction.atomic():
+                created = Booking.objects.bulk_create(new_bookings)
+        except IntegrityError as e:
+            if OVERLAP_CONSTRAINT_NAME not in str(e):
+                raise
+            # A single booking slipped in between the check and the insert
+            raise ValidationError(
+                "The workspace was booked while this request was being "
+                "processed. Please try again."
+            )
+
+        for booking in created:
+            results[booking.booking_date] = _outcome(
+                booking.booking_date, BOOKED,
+                booking_id=booking.pk,
+                message="Booking confirmed",
+            )
+
+        # bulk_create() sends no post_save signals
+        usage.queue_refresh(
+            (booking.workspace_id, booking.booking_date)
+            for booking in created
+        )
+        transaction.on_commit(lambda: _bookings_created(created))
+
+    return [results[booking_date] for booking_date in dates]
+
+
+def _bookings_created(bookings):
+    for booking_date in {booking.booking_date for booking in bookings}:
+        cache.invalidate_date(booking_date)
+    for booking in bookings:
+        events.publish_booking(events.CREATED, booking)
+
+
+def _outcome(booking_date, status, booking_id=None, message=''):
+    return {
+        'date': booking_date.isoformat(),
+        'status': status,
+        'booking_id': booking_id,
+        'message': message,
+    }
@@ -0,0 +1,163 @@
+import contextvars
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache, events, usage
+from .models import WorkSpace, Booking, ACTIVE_BOOKING_STATUSES
+
+
+# ============================================================================
+# MODEL SIGNALS
+# ============================================================================
+# Keep derived data (availability cache, usage rollups) in step with
+# model writes
+# and push booking deltas to streaming floor plan clients.
+# Work is deferred with transaction.on_commit so readers never rebuild a
+# cache entry from data that is about to be rolled back or not yet visible.
+# Rollup refreshes are queued as tasks (booking.tasks) in the same
+# transaction, so they run in a worker and only if the write commits.
+# ============================================================================
+
+_muted = contextvars.ContextVar('booking_signals_muted', default=False)
+
+
+@contextmanager
+def muted():
+    """
+    Skip the booking write handlers below, for bulk jobs that maintain
+    the derived data themselves (e.g. archive_bookings).
+    """
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+# ----------------------------------------------------------------------------
+# BOOKING
+# ----------------------------------------------------------------------------
+
+# The workspace and time slot a booking occupies. Duck-types as a booking
+# for events.publish_booking()
+BookingSlot = namedtuple(
+    'BookingSlot', 'workspace_id booking_date start_time end_time'
+)
+
+
+def _booking_slot(instance):
+    # Read from __dict__ so deferred fields are never fetched here
+    return BookingSlot(
+        *(instance.__dict__.get(field) for field in BookingSlot._fields)
+    )
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_slot(sender, instance, **kwargs):
+    instance._loaded_slot = _booking_slot(instance)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, **kwargs):
+    if _muted.get():
+        return
+    previous = instance._loaded_slot
+    instance._loaded_slot = _booking_slot(instance)
+    # Moved to another workspace, date or time: its old slot is free
+    moved = (
+        not created
+        and None not in previous
+        and previous != instance._loaded_slot
+    )
+
+    if created:
+        event_type = events.CREATED
+    elif instance.status in ACTIVE_BOOKING_STATUSES:
+        event_type = events.UPDATED
+    else:
+        event_type = events.CANCELLED
+
+    usage_cells = {(instance.workspace_id, instance.booking_date)}
+    if previous.booking_date and previous.workspace_id:
+        usage_cells.add((previous.workspace_id, previous.booking_date))
+
+    usage.queue_refresh(usage_cells)
+
+    def on_commit():
+        cache.invalidate_date(instance.booking_date)
+        events.publish_booking(event_type, instance)
+        if moved:
+            if previous.booking_date != instance.booking_date:
+                cache.invalidate_date(previous.booking_date)
+            # Clients showing the old slot only refetch for events that
+            # touch their window
+            events.publish_booking(events.CANCELLED, previous)
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    if _muted.get():
+        return
+    usage.queue_refresh([(instance.workspace_id, instance.booking_date)])
+
+    def on_commit():
+        cache.invalidate_date(instance.booking_date)
+        events.publish_booking(events.CANCELLED, instance)
+
+    transaction.on_commit(on_commit)
+
+
+# ----------------------------------------------------------------------------
+# WORKSPACE
+# ----------------------------------------------------------------------------
+
+# Workspace fields that availability snapshots and floor plan geometry
+# are built from
+FLOOR_PLAN_FIELDS = (
+    'status',
+    'floor_id',
+    'name',
+    'svg_x_coord',
+    'svg_y_coord',
+    'svg_width',
+    'svg_height',
+)
+
+
+def _floor_plan_values(instance):
+    return tuple(instance.__dict__.get(field) for field in FLOOR_PLAN_FIELDS)
+
+
+@receiver(post_init, sender=WorkSpace)
+def remember_workspace_fields(sender, instance, **kwargs):
+    instance._loaded_floor_plan = _floor_plan_values(instance)
+
+
+@receiver(post_save, sender=WorkSpace)
+def workspace_saved(sender, instance, created, **kwargs):
+    values = _floor_plan_values(instance)
+    changed = values != instance._loaded_floor_plan
+    instance._loaded_floor_plan = values
+    if created or changed:
+        transaction.on_commit(workspaces_changed)
+
+
+@receiver(post_delete, sender=WorkSpace)
+def workspace_deleted(sender, instance, **kwargs):
+    transaction.on_commit(workspaces_changed)
+
+
+def workspaces_changed():
+    """
+    Invalidate workspace-derived data (availability snapshots and floor
+    plan geometry). Also called directly after bulk workspace writes,
+    which send no signals.
+    """
+    cache.invalidate_all()
+    events.publish_resync()
@@ -0,0 +1,199 @@
+import heapq
+import math
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+
+from . import cache
+from .models import WorkSpace
+
+
+# ============================================================================
+# SPATIAL INDEX
+# ============================================================================
+# Uniform grid over the floor plan geometry (WorkSpace.svg_* fields), one
+# grid per floor, for hit-testing and nearest-workspace queries.
+#
+# The grids are built in-process on first use and rebuilt when the
+# availability cache generation changes, i.e. after any workspace change
+# (see signals.workspaces_changed), or when they are older than
+# AVAILABILITY_CACHE_TIMEOUT, so a process that misses the change (e.g.
+# with a process-local cache) catches up.
+# ============================================================================
+
+# Grid cell size in SVG units (the floor plan is 1200 x 800)
+CELL_SIZE = 100
+
+Shape = namedtuple('Shape', 'id name x0 y0 x1 y1')
+
+
+def distance_to(shape, x, y):
+    """
+    Distance from a point to the nearest edge of a shape (0 inside it).
+    """
+    dx = max(shape.x0 - x, 0, x - shape.x1)
+    dy = max(shape.y0 - y, 0, y - shape.y1)
+    return math.hypot(dx, dy)
+
+
+def center_of(shape):
+    return (shape.x0 + shape.x1) / 2, (shape.y0 + shape.y1) / 2
+
+
+class GridIndex:
+    """
+    Shapes bucketed by every grid cell their bounding box touches.
+    """
+
+    def __init__(self, shapes, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.shapes = {}
+        self.bounds = None
+        for shape in shapes:
+            self.add(shape)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add(self, shape):
+        self.shapes[shape.id] = shape
+        first = self._cell(shape.x0, shape.y0)
+        last = self._cell(shape.x1, shape.y1)
+        for cx in range(first[0], last[0] + 1):
+            for cy in range(first[1], last[1] + 1):
+                self.cells[(cx, cy)].append(shape)
+        if self.bounds is None:
+            self.bounds = [first[0], first[1], last[0], last[1]]
+        else:
+            self.bounds = [
+                min(self.bounds[0], first[0]),
+                min(self.bounds[1], first[1]),
+                max(self.bounds[2], last[0]),
+                max(self.bounds[3], last[1]),
+            ]
+
+    def at(self, x, y):
+        """
+        Shapes containing the point.
+        """
+        return [
+            shape for shape in self.cells.get(self._cell(x, y), ())
+            if shape.x0 <= x <= shape.x1 and shape.y0 <= y <= shape.y1
+        ]
+
+    def _ring(self, cx, cy, radius):
+        if radius == 0:
+            yield cx, cy
+            return
+        for dx in range(-radius, radius + 1):
+            yield cx + dx, cy - radius
+            yield cx + dx, cy + radius
+        for dy in range(-radius + 1, radius):
+            yield cx - radius, cy + dy
+            yield cx + radius, cy + dy
+
+    def nearest(self, x, y, k, accept=None):
+        """
+        Return up to k (distance, shape) pairs closest to a point, nearest
+        first, optionally only shapes for which accept(shape) is true.
+
+        Cells are visited in rings around the point; the search stops once
+        k shapes are found that no unvisited cell can beat. A point outside
+        the grid starts its rings from the nearest point on the grid's edge,
+        so they never sweep the empty cells between a far-away point and
+        the floor plan. Distances are still measured from the point itself.
+        """
+        if self.bounds is None or k < 1:
+            return []
+        qx = min(
+            max(x, self.bounds[0] * self.cell_size),
+            (self.bounds[2] + 1) * self.cell_size,
+        )
+        qy = min(
+            max(y, self.bounds[1] * self.cell_size),
+            (self.bounds[3] + 1) * self.cell_size,
+        )
+        # Every shape lies inside the grid and (qx, qy) is the point's
+        # projection onto it, so a shape at least r from (qx, qy) is at
+        # least hypot(offset, r) from the point
+        offset = math.hypot(x - qx, y - qy)
+        cx, cy = self._cell(qx, qy)
+        max_radius = max(
+            abs(cx - self.bounds[0]), abs(cx - self.bounds[2]),
+            abs(cy - self.bounds[1]), abs(cy - self.bounds[3]),
+        )
+        seen = set()
+        best = []  # max-heap of (-distance, id, shape), size <= k
+        for radius in range(max_radius + 1):
+            for cell in self._ring(cx, cy, radius):
+                for shape in self.cells.get(cell, ()):
+                    if shape.id in seen:
+                        continue
+                    seen.add(shape.id)
+                    if accept is not None and not accept(shape):
+                        continue
+                    entry = (-distance_to(shape, x, y), shape.id, shape)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            # Shapes first seen in later rings are at least this far away
+            bound = math.hypot(offset, radius * self.cell_size)
+            if len(best) == k and -best[0][0] <= bound:
+                break
+        return [
+            (-distance, shape) for distance, _, shape in sorted(
+                best, reverse=True
+            )
+        ]
+
+
+def build_indexes():
+    """
+    Build one GridIndex per floor (None for workspaces without a floor).
+    """
+    shapes = defaultdict(list)
+    for pk, name, floor_id, x, y, width, height in (
+        WorkSpace.objects.values_list(
+            'id', 'name', 'floor_id',
+            'svg_x_coord', 'svg_y_coord', 'svg_width', 'svg_height',
+        ).order_by()
+    ):
+        shapes[floor_id].append(Shape(pk, name, x, y, x + width, y + height))
+    return {
+        floor_id: GridIndex(floor_shapes)
+        for floor_id, floor_shapes in shapes.items()
+    }
+
+
+_indexes = (None, 0, {})
+_lock = threading.Lock()
+
+
+def floor_index(floor_id):
+    """
+    Return the GridIndex of a floor, rebuilding all grids if workspaces
+    changed since they were built or they expired. None if the floor has
+    no workspaces.
+    """
+    global _indexes
+    current = cache.generation()
+    max_age = getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 60)
+
+    def stale(generation, built_at):
+        return (
+            generation != current
+            or time.monotonic() - built_at > max_age
+        )
+
+    generation, built_at, indexes = _indexes
+    if stale(generation, built_at):
+        with _lock:
+            generation, built_at, indexes = _indexes
+            if stale(generation, built_at):
+                indexes = build_indexes()
+                _indexes = (current, time.monotonic(), indexes)
+    return indexes.get(floor_id)
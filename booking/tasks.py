@@ -0,0 +1,169 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+# ============================================================================
+# TASK QUEUE
+# ============================================================================
+# A small database-backed queue for work that should not hold up a
+# request. enqueue() inserts a Task row in the caller's transaction, so a
+# task only becomes visible to workers (python manage.py run_tasks) if the
+# write that queued it commits.
+#
+# Workers claim due tasks with SELECT ... FOR UPDATE SKIP LOCKED where the
+# database supports it (PostgreSQL) and with a compare-and-set UPDATE
+# otherwise (SQLite), so any number of workers can share the table.
+# Failed tasks are retried with exponential backoff up to max_attempts.
+#
+# With TASKS_EAGER=True tasks run in-process right after the commit
+# instead, for development without a worker.
+# ============================================================================
+
+# Delay before the first retry; doubled for every further attempt
+RETRY_DELAY_SECONDS = 30
+
+# Running tasks not finished after this long are assumed to belong to a
+# dead worker and are queued again
+LOCK_TIMEOUT_SECONDS = 600
+
+
+def task(queue='default', max_attempts=3):
+    """
+    Mark a function as a task that enqueue() accepts. Its arguments must
+    be JSON serialisable and it should be safe to run more than once.
+
+    Usage:
+        @task(queue='notifications')
+        def send_reminder(booking_id): ...
+    """
+    def decorator(func):
+        func.task_options = {'queue': queue, 'max_attempts': max_attempts}
+        return func
+    return decorator
+
+
+def task_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, *args, delay=None):
+    """
+    Queue func(*args) to run in a worker, after `delay` (a timedelta).
+
+    Returns:
+        Task: the queued task, or None when TASKS_EAGER is set
+
+    Raises:
+        ValueError: if func is not decorated with @task
+    """
+    options = getattr(func, 'task_options', None)
+    if options is None:
+        raise ValueError(f"{task_name(func)} is not a task")
+    # Round-trip the arguments so eager tasks see what workers would
+    args = json.loads(json.dumps(args, cls=DjangoJSONEncoder))
+
+    if getattr(settings, 'TASKS_EAGER', False):
+        transaction.on_commit(lambda: func(*args))
+        return None
+
+    return Task.objects.create(
+        name=task_name(func),
+        args=args,
+        queue=options['queue'],
+        max_attempts=options['max_attempts'],
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+
+
+def claim(worker, queues=None, limit=1):
+    """
+    Mark up to `limit` due tasks as running for this worker.
+
+    Returns:
+        list: the claimed Task objects
+    """
+    now = timezone.now()
+    due = Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+    if queues:
+        due = due.filter(queue__in=queues)
+    due = due.order_by('run_at', 'pk')
+    running = {
+        'status': Task.RUNNING,
+        'locked_by': worker,
+        'locked_at': now,
+        'attempts': F('attempts') + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            claimed = list(
+                due.select_for_update(skip_locked=True).values_list(
+                    'pk', flat=True
+                )[:limit]
+            )
+            Task.objects.filter(pk__in=claimed).update(**running)
+    else:
+        claimed = [
+            pk for pk in due.values_list('pk', flat=True)[:limit]
+            # Another worker may have claimed it since
+            if Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+                **running
+            )
+        ]
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def run(claimed):
+    """
+    Run one claimed task. It is deleted if it succeeds; otherwise it is
+    queued again with a backed-off run_at, or marked failed after its
+    last attempt.
+
+    Returns:
+        bool: whether the task succeeded
+    """
+    try:
+        func = import_string(claimed.name)
+        if not hasattr(func, 'task_options'):
+            raise ValueError(f"{claimed.name} is not a task")
+        func(*claimed.args)
+    except Exception:
+        error = traceback.format_exc()
+        if claimed.attempts < claimed.max_attempts:
+            delay = RETRY_DELAY_SECONDS * 2 ** (claimed.attempts - 1)
+            changes = {
+                'status': Task.QUEUED,
+                'run_at': timezone.now() + timedelta(seconds=delay),
+            }
+        else:
+            changes = {'status': Task.FAILED}
+        # Unless requeue_stale() gave it to another worker meanwhile
+        Task.objects.filter(
+            pk=claimed.pk, locked_by=claimed.locked_by
+        ).update(locked_by='', locked_at=None, last_error=error, **changes)
+        return False
+    Task.objects.filter(pk=claimed.pk).delete()
+    return True
+
+
+def requeue_stale(timeout=LOCK_TIMEOUT_SECONDS):
+    """
+    Queue again the tasks left running by workers that died.
+
+    Returns:
+        int: number of tasks queued again
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return Task.objects.filter(
+        status=Task.RUNNING, locked_at__lt=cutoff
+    ).update(status=Task.QUEUED, locked_by='', locked_at=None)
@@ -0,0 +1,63 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.encoding import iri_to_uri
+from django.utils.html import format_html, format_html_join
+
+from config.storage import VARIANT_FORMATS, variant_name
+
+register = template.Library()
+
+
+def _variants(path, image_format):
+    """
+    [(url, width)] of the variants collectstatic wrote for a format.
+    """
+    manifest = getattr(staticfiles_storage, 'hashed_files', {})
+    variants = []
+    for width in getattr(settings, 'RESPONSIVE_IMAGES', {}).get(path, ()):
+        name = variant_name(path, width, image_format)
+        if name in manifest:
+            # srcset is space separated, so the URL must be fully encoded
+            variants.append((iri_to_uri(static(name)), width))
+    return variants
+
+
+@register.simple_tag
+def responsive_image(path, sizes='100vw', **attrs):
+    """
+    <picture> with AVIF/WebP srcsets for an image in RESPONSIVE_IMAGES,
+    falling back to the original in <img>.
+
+    Usage: {% responsive_image 'images/hero.jpg' sizes='50vw' alt='...' %}
+    """
+    sources = []
+    for image_format in VARIANT_FORMATS:
+        variants = _variants(path, image_format)
+        if variants:
+            sources.append(format_html(
+                '<source type="image/{}" srcset="{}" sizes="{}">',
+                image_format,
+                ', '.join(f'{url} {width}w' for url, width in variants),
+                sizes,
+            ))
+    return format_html(
+        '<picture>{}<img src="{}"{}></picture>',
+        format_html_join('', '{}', ((source,) for source in sources)),
+        static(path),
+        flatatt(attrs),
+    )
+
+
+@register.simple_tag
+def static_variant(path, width, image_format='webp'):
+    """
+    URL of one variant, or of the original if it was not generated.
+    For places without srcset support such as SVG <image>.
+    """
+    name = variant_name(path, width, image_format)
+    if name in getattr(staticfiles_storage, 'hashed_files', {}):
+        return static(name)
+    return static(path)
@@ -1,3 +1,1359 @@
-from django.test import TestCase
+import asyncio
+import io
+import math
+import os
+import runpy
+import shutil
+import tempfile
+import threading
+from datetime import time, timedelta
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed, ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import (
+    cache as availability_cache, events, floorplan, holds, metrics, middleware,
+    spatial, tasks, usage,
+)
+from .availability import (
+    HELD, MINE, RESERVED, UNAVAILABLE, IntervalIndex, availability_map,
+)
+from .maintenance import NOTIFY, set_workspace_status
+from .models import (
+    ArchivedBooking, Booking, DailyWorkspaceUsage, Floor, SlotHold, Task,
+    WorkSpace,
+)
+from config.db import apply_sqlite_pragmas
+from config import storage
+from config.storage import UNHASHED_STORAGES
+from config.svg_parser import iter_shapes
+from .forms import RecurringBookingForm
+from .recurrence import (
+    BOOKED, CONFLICT, MAX_OCCURRENCES, book_occurrences, expand_recurrence,
+)
+
+
+def make_workspace(name='Desk-1', **fields):
+    values = {
+        'location': 'Ground Floor',
+        'capacity': 1,
+        'svg_id': name.lower(),
+        'svg_shape': 'rect',
+        'svg_x_coord': 0,
+        'svg_y_coord': 0,
+        'svg_width': 10,
+        'svg_height': 10,
+    }
+    values.update(fields)
+    return WorkSpace.objects.create(name=name, **values)
+
+
+def make_booking(user, workspace, start=9, end=10, days=1, **fields):
+    booking = Booking(
+        user=user,
+        workspace=workspace,
+        booking_date=timezone.localdate() + timedelta(days=days),
+        start_time=time(start),
+        end_time=time(end),
+        status='confirmed',
+        **fields
+    )
+    booking.save()
+    return booking
+
+
+class BookingTestCase(TestCase):
+    """
+    Two users and a workspace, with the local-memory caches emptied so
+    availability state cannot leak between tests.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='p')
+        self.other = User.objects.create_user('bob', password='p')
+        self.workspace = make_workspace()
+
+
+# ============================================================================
+# AVAILABILITY ENGINE
+# ============================================================================
+
+class IntervalIndexTests(TestCase):
+
+    def setUp(self):
+        self.index = IntervalIndex([
+            (time(13), time(14), 3, 1),
+            (time(8), time(18), 1, 1),
+            (time(9), time(10), 2, 2),
+        ])
+
+    def ids(self, start, end):
+        return [
+            interval[2]
+            for interval in self.index.overlapping(time(*start), time(*end))
+        ]
+
+    def test_finds_overlapping_intervals_in_start_order(self):
+        self.assertEqual(self.ids((9, 30), (13, 30)), [1, 2, 3])
+
+    def test_long_interval_found_behind_short_ones(self):
+        # Only the 8:00-18:00 booking reaches past the earlier ones
+        self.assertEqual(self.ids((16,), (17,)), [1])
+
+    def test_touching_intervals_do_not_overlap(self):
+        self.assertEqual(self.ids((18,), (19,)), [])
+        self.assertEqual(self.ids((10,), (13,)), [1])
+
+
+class AvailabilityMapTests(BookingTestCase):
+
+    def test_states(self):
+        date = timezone.localdate() + timedelta(days=1)
+        mine = make_booking(self.user, self.workspace)
+        reserved = make_workspace('Desk-2')
+        make_booking(self.other, reserved)
+        unavailable = make_workspace('Desk-3', status='maintenance')
+        free = make_workspace('Desk-4')
+
+        states = availability_map(date, time(9), time(10), self.user)
+        self.assertEqual(states[self.workspace.pk], {
+            'state': MINE, 'booking_id': mine.pk,
+        })
+        self.assertEqual(states[reserved.pk]['state'], RESERVED)
+        self.assertIsNone(states[reserved.pk]['booking_id'])
+        self.assertEqual(states[unavailable.pk]['state'], UNAVAILABLE)
+        self.assertEqual(states[free.pk]['state'], 'free')
+
+
+# ============================================================================
+# OVERLAP GUARD
+# ============================================================================
+
+class OverlapGuardTests(BookingTestCase):
+
+    def test_sqlite_triggers_survive_migrations(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite only")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            )
+            triggers = {row[0] for row in cursor.fetchall()}
+        self.assertIn('booking_no_overlap_insert', triggers)
+        self.assertIn('booking_no_overlap_update', triggers)
+
+    def test_database_rejects_overlap_that_skips_clean(self):
+        booking = make_booking(self.user, self.workspace)
+        # bulk_create skips clean(), leaving only the database guard
+        with self.assertRaisesMessage(IntegrityError, 'booking_no_overlap'):
+            with transaction.atomic():
+                Booking.objects.bulk_create([Booking(
+                    user=self.other,
+                    workspace=self.workspace,
+                    booking_date=booking.booking_date,
+                    start_time=time(9, 30),
+                    end_time=time(10, 30),
+                    status='confirmed',
+                )])
+
+    def test_cancelled_bookings_do_not_block(self):
+        booking = make_booking(self.user, self.workspace)
+        Booking.objects.filter(pk=booking.pk).update(status='cancelled')
+        make_booking(self.other, self.workspace)
+        self.assertEqual(
+            Booking.objects.filter(status='confirmed').count(), 1
+        )
+
+
+# ============================================================================
+# NEAREST WORKSPACES
+# ============================================================================
+
+class GridIndexTests(TestCase):
+
+    def setUp(self):
+        self.index = spatial.GridIndex([
+            spatial.Shape(1, 'A', 0, 0, 50, 50),
+            spatial.Shape(2, 'B', 300, 0, 350, 50),
+            spatial.Shape(3, 'C', 1100, 700, 1150, 750),
+        ])
+
+    def test_nearest_first(self):
+        nearest = self.index.nearest(290, 20, 2)
+        self.assertEqual([shape.id for _, shape in nearest], [2, 1])
+        self.assertEqual(nearest[0][0], 10)
+
+    def test_accept_filters_shapes(self):
+        nearest = self.index.nearest(
+            290, 20, 1, accept=lambda shape: shape.id != 2
+        )
+        self.assertEqual([shape.id for _, shape in nearest], [1])
+
+    def test_far_point_is_clamped_to_the_grid(self):
+        # Without clamping the ring search would visit ~10^8 cells
+        nearest = self.index.nearest(10 ** 6, 10 ** 6, 1)
+        self.assertEqual([shape.id for _, shape in nearest], [3])
+        self.assertAlmostEqual(
+            nearest[0][0], math.hypot(10 ** 6 - 1150, 10 ** 6 - 750)
+        )
+
+        index = spatial.GridIndex([
+            spatial.Shape(1, 'A', 0, 390, 10, 400),
+            spatial.Shape(2, 'B', 395, 0, 405, 10),
+        ])
+        # Both are ranked from the point, not from the clamped (0, 0)
+        nearest = index.nearest(-100, -2000, 2)
+        self.assertEqual([shape.id for _, shape in nearest], [2, 1])
+        self.assertAlmostEqual(nearest[0][0], math.hypot(495, 2000))
+        self.assertAlmostEqual(nearest[1][0], math.hypot(100, 2390))
+
+
+class NearestWorkspacesViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='p')
+        self.floor = Floor.objects.create(building='Main', name='Ground')
+        self.workspace = make_workspace(floor=self.floor)
+        self.url = reverse('nearest_workspaces')
+        self.params = {
+            'date': (timezone.localdate() + timedelta(days=1)).isoformat(),
+            'start_time': '09:00',
+            'end_time': '10:00',
+            'x': '0',
+            'y': '0',
+            'floor': self.floor.pk,
+        }
+
+    def test_requires_login(self):
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 302)
+
+    def test_returns_free_workspaces(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [w['id'] for w in response.json()['workspaces']],
+            [self.workspace.pk],
+        )
+
+    def test_rejects_non_finite_coordinates(self):
+        self.client.force_login(self.user)
+        for value in ('nan', 'inf', '-inf'):
+            response = self.client.get(self.url, {**self.params, 'x': value})
+            self.assertEqual(response.status_code, 400)
+
+
+# ============================================================================
+# AVAILABILITY
+# ============================================================================
+
+class AvailabilityJsonTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.date = timezone.localdate() + timedelta(days=1)
+        self.url = reverse('availability_json')
+        self.params = {
+            'date': self.date.isoformat(),
+            'start_time': '09:00',
+            'end_time': '10:00',
+        }
+
+    def get(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(self.url, self.params, **headers)
+
+    def test_unchanged_window_is_not_modified(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['states'], {})
+        self.assertEqual(self.get(response['ETag']).status_code, 304)
+
+    def test_booking_changes_etag_and_state(self):
+        etag = self.get()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            make_booking(self.other, self.workspace)
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['states'], {str(self.workspace.pk): 'reserved'}
+        )
+        # Other users' booking ids are not exposed
+        self.assertEqual(response.json()['bookings'], {})
+
+    def test_write_from_another_process_changes_etag(self):
+        etag = self.get()['ETag']
+        # bulk_create() sends no signals, like a write served by another
+        # worker whose local cache this process never sees
+        Booking.objects.bulk_create([Booking(
+            user=self.other,
+            workspace=self.workspace,
+            booking_date=self.date,
+            start_time=time(9),
+            end_time=time(10),
+            status='confirmed',
+        )])
+        self.assertEqual(self.get(etag).status_code, 200)
+
+    def test_own_booking_is_mine(self):
+        booking = make_booking(self.user, self.workspace)
+        data = self.get().json()
+        self.assertEqual(data['states'], {str(self.workspace.pk): 'mine'})
+        self.assertEqual(
+            data['bookings'], {str(self.workspace.pk): booking.pk}
+        )
+
+
+# ============================================================================
+# AVAILABILITY CACHE
+# ============================================================================
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+
+class SharedCacheCheckTests(TestCase):
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_warns_for_local_cache_with_several_workers(self):
+        with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '4'}):
+            warnings = availability_cache.check_shared_cache(None)
+        self.assertEqual([w.id for w in warnings], ['booking.W001'])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_single_worker_may_use_local_cache(self):
+        with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '1'}):
+            self.assertEqual(availability_cache.check_shared_cache(None), [])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/backspace-test-cache',
+    }})
+    def test_shared_cache_passes(self):
+        with mock.patch.dict('os.environ', {'WEB_CONCURRENCY': '4'}):
+            self.assertEqual(availability_cache.check_shared_cache(None), [])
+
+
+class SpatialIndexExpiryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.floor = Floor.objects.create(building='Main', name='Ground')
+
+    def test_index_catches_up_with_missed_changes(self):
+        make_workspace('Desk-1', floor=self.floor)
+        self.assertEqual(len(spatial.floor_index(self.floor.pk).shapes), 1)
+        # bulk_create() sends no signals, so the generation is unchanged
+        WorkSpace.objects.bulk_create([WorkSpace(
+            name='Desk-2', floor=self.floor, location='Ground Floor',
+            capacity=1, svg_id='desk-2', svg_shape='rect', svg_x_coord=20,
+            svg_y_coord=0, svg_width=10, svg_height=10,
+        )])
+        self.assertEqual(len(spatial.floor_index(self.floor.pk).shapes), 1)
+        with override_settings(AVAILABILITY_CACHE_TIMEOUT=0):
+            index = spatial.floor_index(self.floor.pk)
+        self.assertEqual(len(index.shapes), 2)
+
+
+# ============================================================================
+# BOOKING EVENTS
+# ============================================================================
+
+class BookingEventTests(BookingTestCase):
+
+    def save_and_collect(self, booking):
+        """
+        Save the booking and return the (type, workspace_id, date,
+        start_time, end_time) events published once it commits.
+        """
+        with mock.patch.object(events, 'get_broker') as get_broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                booking.save()
+        return [
+            (
+                call.args[1]['type'], call.args[1]['workspace_id'],
+                call.args[1]['date'], call.args[1]['start_time'],
+                call.args[1]['end_time'],
+            )
+            for call in get_broker.return_value.publish.call_args_list
+        ]
+
+    def test_moving_time_releases_old_slot(self):
+        booking = make_booking(self.user, self.workspace)
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.start_time, booking.end_time = time(14), time(15)
+        date = booking.booking_date.isoformat()
+        self.assertEqual(self.save_and_collect(booking), [
+            (events.UPDATED, self.workspace.pk, date, '14:00', '15:00'),
+            (events.CANCELLED, self.workspace.pk, date, '09:00', '10:00'),
+        ])
+
+    def test_moving_workspace_releases_old_slot(self):
+        booking = make_booking(self.user, self.workspace)
+        booking = Booking.objects.get(pk=booking.pk)
+        other_workspace = make_workspace('Desk-2')
+        booking.workspace = other_workspace
+        date = booking.booking_date.isoformat()
+        self.assertEqual(self.save_and_collect(booking), [
+            (events.UPDATED, other_workspace.pk, date, '09:00', '10:00'),
+            (events.CANCELLED, self.workspace.pk, date, '09:00', '10:00'),
+        ])
+
+    def test_unmoved_update_sends_one_event(self):
+        booking = make_booking(self.user, self.workspace)
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.purpose = 'Planning'
+        self.assertEqual(
+            [event[0] for event in self.save_and_collect(booking)],
+            [events.UPDATED],
+        )
+
+
+class InProcessBrokerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.broker = events.InProcessBroker()
+
+    async def test_publish_reaches_subscribers_of_the_channel(self):
+        today = self.broker.subscribe('2030-01-01')
+        tomorrow = self.broker.subscribe('2030-01-02')
+        # Views publish from worker threads
+        thread = threading.Thread(
+            target=self.broker.publish,
+            args=('2030-01-01', {'type': events.CREATED}),
+        )
+        thread.start()
+        thread.join()
+        self.assertEqual(await today.get(1), {'type': events.CREATED})
+        self.assertIsNone(await tomorrow.get(0.01))
+
+        self.broker.broadcast({'type': events.RESYNC})
+        self.assertEqual(await today.get(1), {'type': events.RESYNC})
+        self.assertEqual(await tomorrow.get(1), {'type': events.RESYNC})
+
+    async def test_closed_subscription_gets_nothing(self):
+        subscription = self.broker.subscribe('2030-01-01')
+        subscription.close()
+        self.broker.publish('2030-01-01', {'type': events.CREATED})
+        self.assertIsNone(await subscription.get(0.01))
+        self.assertEqual(self.broker._subscriptions, {})
+
+    async def test_slow_client_is_told_to_resync(self):
+        subscription = self.broker.subscribe('2030-01-01')
+        subscription.queue = asyncio.Queue(maxsize=2)
+        for _ in range(3):
+            self.broker.publish('2030-01-01', {'type': events.CREATED})
+        self.assertEqual(await subscription.get(1), {'type': events.RESYNC})
+        self.assertIsNone(await subscription.get(0.01))
+
+
+# ============================================================================
+# SLOT HOLDS
+# ============================================================================
+
+class SlotHoldTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.date = timezone.localdate() + timedelta(days=1)
+
+    def hold(self, user, start=9, end=10):
+        return holds.place_hold(
+            user, self.workspace.pk, self.date, time(start), time(end)
+        )
+
+    def test_hold_blocks_other_users(self):
+        self.assertIsNotNone(self.hold(self.user))
+        self.assertIsNone(self.hold(self.other, 9, 11))
+        # A user's new hold replaces their previous one
+        self.assertIsNotNone(self.hold(self.user, 12, 13))
+        self.assertIsNotNone(self.hold(self.other))
+
+    def test_booking_rejects_slot_held_by_another_user(self):
+        self.hold(self.user)
+        with self.assertRaises(ValidationError):
+            make_booking(self.other, self.workspace)
+        make_booking(self.user, self.workspace)
+
+    def test_recurring_booking_skips_held_dates(self):
+        self.hold(self.user)
+        later = self.date + timedelta(days=7)
+        outcomes = book_occurrences(
+            self.other, self.workspace, [self.date, later],
+            time(9, 30), time(10, 30),
+        )
+        self.assertEqual(
+            [outcome['status'] for outcome in outcomes], [CONFLICT, BOOKED]
+        )
+        self.assertFalse(
+            Booking.objects.filter(booking_date=self.date).exists()
+        )
+
+    def test_sweep_deletes_expired_holds_only(self):
+        self.hold(self.user)
+        self.hold(self.other, 12, 13)
+        SlotHold.objects.filter(user=self.user).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        with mock.patch.object(events, 'get_broker') as get_broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(holds.sweep_expired(), 1)
+        self.assertEqual(
+            list(SlotHold.objects.values_list('user', flat=True)),
+            [self.other.pk],
+        )
+        get_broker.return_value.publish.assert_called_once_with(
+            self.date.isoformat(), {'type': events.RESYNC}
+        )
+
+    def test_expired_hold_no_longer_blocks(self):
+        self.hold(self.user)
+        SlotHold.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(
+            holds.active_holds(self.date, time(9), time(10)), []
+        )
+        # Expired holds count as released before the sweep deletes them
+        self.assertIsNotNone(self.hold(self.other))
+
+    def test_availability_shows_other_users_holds(self):
+        self.hold(self.other)
+        states = availability_map(self.date, time(9), time(10), self.user)
+        self.assertEqual(states[self.workspace.pk]['state'], HELD)
+        # The holder sees their own hold as free
+        states = availability_map(self.date, time(9), time(10), self.other)
+        self.assertEqual(states[self.workspace.pk]['state'], 'free')
+
+    def test_create_booking_checks_the_users_holds_once(self):
+        self.client.force_login(self.user)
+        data = {
+            'workspace': self.workspace.pk,
+            'booking_date': self.date.isoformat(),
+            'start_time': '09:00',
+            'end_time': '10:00',
+        }
+        self.hold(self.other)
+        self.client.post(reverse('create_booking'), data)
+        self.assertFalse(Booking.objects.exists())
+
+        SlotHold.objects.all().delete()
+        with mock.patch.object(
+            Booking, 'full_clean', autospec=True,
+            side_effect=Booking.full_clean,
+        ) as full_clean:
+            self.client.post(reverse('create_booking'), data)
+        self.assertEqual(Booking.objects.get().user, self.user)
+        # The form's validation is not repeated by Booking.save
+        self.assertEqual(full_clean.call_count, 1)
+
+    def test_own_hold_does_not_block_recurring_booking(self):
+        self.hold(self.user)
+        outcomes = book_occurrences(
+            self.user, self.workspace, [self.date], time(9), time(10),
+        )
+        self.assertEqual(outcomes[0]['status'], BOOKED)
+
+
+class HoldSlotViewTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('hold_slot')
+        self.data = {
+            'workspace': self.workspace.pk,
+            'date': (timezone.localdate() + timedelta(days=1)).isoformat(),
+            'start_time': '09:00',
+            'end_time': '10:00',
+        }
+
+    def test_holds_slot(self):
+        response = self.client.post(self.url, self.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('expires_at', response.json())
+
+    def test_conflicting_hold_is_409(self):
+        holds.place_hold(
+            self.other, self.workspace.pk,
+            timezone.localdate() + timedelta(days=1), time(9), time(10),
+        )
+        response = self.client.post(self.url, self.data)
+        self.assertEqual(response.status_code, 409)
+
+    def test_rejects_past_date(self):
+        response = self.client.post(self.url, {
+            **self.data,
+            'date': (timezone.localdate() - timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SlotHold.objects.exists())
+
+    def test_rejects_empty_window(self):
+        response = self.client.post(self.url, {
+            **self.data, 'end_time': '09:00',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SlotHold.objects.exists())
+
+
+# ============================================================================
+# SETTINGS
+# ============================================================================
+
+class ConnectionSettingsTests(TestCase):
+
+    def database(self, **environ):
+        path = os.path.join(settings.BASE_DIR, 'config', 'settings.py')
+        with mock.patch.dict('os.environ', environ):
+            os.environ.pop('DB_CONN_MAX_AGE', None)
+            namespace = runpy.run_path(path)
+        return namespace['DATABASES']['default']
+
+    def test_persistent_connections_under_wsgi(self):
+        database = self.database(SERVER_MODE='wsgi')
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+
+    def test_no_persistent_connections_under_asgi(self):
+        database = self.database(SERVER_MODE='asgi')
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+    def test_transaction_pooling_disables_server_side_cursors(self):
+        database = self.database(DB_TRANSACTION_POOLING='true')
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        database = self.database(DB_TRANSACTION_POOLING='false')
+        self.assertFalse(database['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_sqlite_pragmas_are_applied(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite only")
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0],
+                int(settings.SQLITE_PRAGMAS['busy_timeout']),
+            )
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': '1; DROP TABLE x'})
+    def test_sqlite_pragma_values_are_checked(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite only")
+        with self.assertRaises(ValueError):
+            apply_sqlite_pragmas(None, connection)
+
+
+# ============================================================================
+# RECURRING BOOKINGS
+# ============================================================================
+
+class RecurringBookingFormTests(BookingTestCase):
+
+    def form(self, **data):
+        return RecurringBookingForm(data={
+            'workspace': self.workspace.pk,
+            'start_time': '09:00',
+            'end_time': '10:00',
+            **data
+        })
+
+    def test_expands_weekly_rule(self):
+        start = timezone.localdate() + timedelta(days=1)
+        dates = expand_recurrence(start, start + timedelta(days=27))
+        self.assertEqual(
+            dates, [start + timedelta(weeks=week) for week in range(4)]
+        )
+        dates = expand_recurrence(
+            start, start + timedelta(days=27), interval=2
+        )
+        self.assertEqual(dates, [start, start + timedelta(weeks=2)])
+
+    def test_merges_duplicate_dates(self):
+        start = timezone.localdate() + timedelta(days=1)
+        form = self.form(
+            dates=f"{start},{start}",
+            start_date=start, end_date=start,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['occurrences'], [start])
+
+    def test_caps_dates_and_recurrence_together(self):
+        start = timezone.localdate() + timedelta(days=1)
+        # Each part is under the cap on its own
+        listed = [start + timedelta(days=day) for day in range(300)]
+        form = self.form(
+            dates=','.join(str(day) for day in listed),
+            start_date=start + timedelta(days=300),
+            end_date=start + timedelta(days=599),
+            weekdays=[str(day) for day in range(7)],
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn(
+            f"No more than {MAX_OCCURRENCES} dates",
+            ' '.join(form.non_field_errors()),
+        )
+
+
+# ============================================================================
+# FLOOR PLAN IMPORT
+# ============================================================================
+
+FLOOR_PLAN_SVG = """<svg xmlns="http://www.w3.org/2000/svg">
+  <g id="layer">
+    <rect id="desk-1" x="10" y="20" width="30" height="40" />
+    <g id="room">
+      <circle id="table-2" cx="100" cy="100" r="15" />
+      <polygon id="booth-3" points="200,10 260,30 230,80" />
+    </g>
+  </g>
+</svg>
+"""
+
+
+class FloorPlanImportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.svg_file = os.path.join(directory.name, 'floor.svg')
+        with open(self.svg_file, 'w') as f:
+            f.write(FLOOR_PLAN_SVG)
+
+    def test_streams_nested_shapes(self):
+        self.assertEqual(
+            [shape['svg_id'] for shape in iter_shapes(self.svg_file)],
+            ['desk-1', 'table-2', 'booth-3'],
+        )
+
+    def test_imports_bounding_boxes_onto_floor(self):
+        floor = Floor.objects.create(building='Main', name='Ground')
+        call_command(
+            'import_floorplan', self.svg_file, floor=floor.pk,
+            stdout=io.StringIO(),
+        )
+        boxes = {
+            workspace.svg_id: (
+                workspace.svg_shape, workspace.svg_x_coord,
+                workspace.svg_y_coord, workspace.svg_width,
+                workspace.svg_height, workspace.floor_id,
+            )
+            for workspace in WorkSpace.objects.all()
+        }
+        self.assertEqual(boxes, {
+            'desk-1': ('rect', 10, 20, 30, 40, floor.pk),
+            'table-2': ('rect', 85, 85, 30, 30, floor.pk),
+            'booth-3': ('rect', 200, 10, 60, 70, floor.pk),
+        })
+        for workspace in WorkSpace.objects.all():
+            workspace.full_clean()
+
+    def test_requires_floor_once_floors_exist(self):
+        Floor.objects.create(building='Main', name='Ground')
+        with self.assertRaisesMessage(CommandError, '--floor is required'):
+            call_command('import_floorplan', self.svg_file)
+        self.assertFalse(WorkSpace.objects.exists())
+
+
+# ============================================================================
+# OPTIMISTIC CONCURRENCY
+# ============================================================================
+
+class UpdateBookingTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.booking = make_booking(self.user, self.workspace)
+        self.url = reverse('update_booking', args=[self.booking.pk])
+
+    def post(self, start, version):
+        return self.client.post(self.url, {
+            'workspace': self.workspace.pk,
+            'booking_date': self.booking.booking_date.isoformat(),
+            'start_time': start,
+            'end_time': '17:00',
+            'version': version,
+        })
+
+    def test_update_bumps_version(self):
+        response = self.post('15:00', self.booking.version)
+        self.assertEqual(response.status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.start_time, time(15))
+        self.assertEqual(self.booking.version, 2)
+
+    def test_update_validates_once(self):
+        with mock.patch.object(
+            Booking, 'full_clean', autospec=True,
+            side_effect=Booking.full_clean,
+        ) as full_clean:
+            self.assertEqual(self.post('15:00', 1).status_code, 200)
+        self.assertEqual(full_clean.call_count, 1)
+
+    def test_stale_version_is_409(self):
+        self.assertEqual(self.post('15:00', 1).status_code, 200)
+        response = self.post('16:00', 1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 2)
+        self.assertEqual(response.json()['booking']['start_time'], '15:00')
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.start_time, time(15))
+
+    def test_slot_taken_after_validation_is_409(self):
+        Booking.objects.bulk_create([Booking(
+            user=self.other,
+            workspace=self.workspace,
+            booking_date=self.booking.booking_date,
+            start_time=time(16),
+            end_time=time(17),
+            status='confirmed',
+        )])
+        # Both requests passed validation before either was saved; the
+        # database overlap guard rejects the second
+        with mock.patch.object(Booking, 'clean'):
+            response = self.post('15:00', self.booking.version)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['version'], 1)
+        self.assertEqual(response.json()['booking']['start_time'], '09:00')
+
+    def test_update_keeps_status(self):
+        Booking.objects.filter(pk=self.booking.pk).update(status='pending')
+        self.assertEqual(self.post('15:00', 1).status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'pending')
+
+    def test_cancelled_booking_cannot_be_revived(self):
+        self.assertTrue(self.booking.cancel())
+        response = self.post('15:00', self.booking.version)
+        self.assertEqual(response.status_code, 404)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'cancelled')
+        self.assertEqual(self.booking.start_time, time(9))
+
+
+# ============================================================================
+# MY BOOKINGS
+# ============================================================================
+
+@override_settings(STORAGES=UNHASHED_STORAGES)
+class MyBookingsTests(BookingTestCase):
+
+    def test_keyset_pages_cover_every_booking_once(self):
+        self.client.force_login(self.user)
+        for days in (2, 1):
+            for hour in (14, 9):
+                make_booking(self.user, self.workspace, hour, hour + 1, days)
+        make_booking(self.other, make_workspace('Desk-2'))
+        # Upcoming bookings are listed soonest first
+        expected = list(Booking.objects.filter(user=self.user).order_by(
+            'booking_date', 'start_time'
+        ).values_list('pk', flat=True))
+        seen = []
+        params = {}
+        with mock.patch('booking.views.MY_BOOKINGS_PAGE_SIZE', 3):
+            while True:
+                response = self.client.get(reverse('my_bookings'), params)
+                seen.extend(b.pk for b in response.context['bookings'])
+                if not response.context['next_cursor']:
+                    break
+                params = {'cursor': response.context['next_cursor']}
+        self.assertEqual(seen, expected)
+
+
+# ============================================================================
+# TASK QUEUE
+# ============================================================================
+
+@tasks.task(max_attempts=2)
+def flaky_task(fail):
+    if fail:
+        raise RuntimeError("Task failed")
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTests(TestCase):
+
+    def run_next(self):
+        claimed = tasks.claim('test-worker')
+        self.assertEqual(len(claimed), 1)
+        return tasks.run(claimed[0])
+
+    def test_successful_task_is_deleted(self):
+        tasks.enqueue(flaky_task, False)
+        self.assertTrue(self.run_next())
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        task = tasks.enqueue(flaky_task, True)
+        self.assertFalse(self.run_next())
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertEqual(task.attempts, 1)
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertEqual(tasks.claim('test-worker'), [])
+
+        Task.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        self.assertFalse(self.run_next())
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertIn("Task failed", task.last_error)
+
+    def test_enqueue_rejects_plain_functions(self):
+        with self.assertRaises(ValueError):
+            tasks.enqueue(print, 'not a task')
+
+
+# ============================================================================
+# BULK WORKSPACE STATUS
+# ============================================================================
+
+@override_settings(TASKS_EAGER=False)
+class WorkspaceStatusTests(BookingTestCase):
+
+    def test_cancels_active_bookings_and_notifies(self):
+        booking = make_booking(self.user, self.workspace)
+        result = set_workspace_status([self.workspace.pk], 'maintenance')
+        self.assertEqual(
+            result, {'workspaces': 1, 'bookings': 1, 'cancelled': 1}
+        )
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'cancelled')
+        # Edits started before the cancellation cannot undo it
+        self.assertEqual(booking.version, 2)
+        self.assertTrue(Task.objects.filter(
+            name__endswith='send_workspace_status_notices'
+        ).exists())
+
+    def test_notify_keeps_bookings(self):
+        booking = make_booking(self.user, self.workspace)
+        result = set_workspace_status(
+            [self.workspace.pk], 'unavailable', bookings=NOTIFY
+        )
+        self.assertEqual(result['cancelled'], 0)
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'confirmed')
+
+    def test_making_available_touches_no_bookings(self):
+        WorkSpace.objects.filter(pk=self.workspace.pk).update(
+            status='maintenance'
+        )
+        result = set_workspace_status([self.workspace.pk], 'available')
+        self.assertEqual(
+            result, {'workspaces': 1, 'bookings': 0, 'cancelled': 0}
+        )
+
+    def test_rejects_unknown_status(self):
+        with self.assertRaises(ValueError):
+            set_workspace_status([self.workspace.pk], 'closed')
+
+
+# ============================================================================
+# PERFORMANCE METRICS
+# ============================================================================
+
+class PerformanceMetricsTests(TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 11))
+        self.assertEqual(metrics.percentile(values, 0.45), 5)
+        self.assertEqual(metrics.percentile(values, 0.95), 10)
+        self.assertEqual(metrics.percentile(list(range(1, 101)), 0.07), 7)
+        self.assertIsNone(metrics.percentile([], 0.5))
+
+    @override_settings(PERF_METRICS=False)
+    def test_disabled_middleware_leaves_templates_alone(self):
+        with mock.patch.object(
+            middleware, '_install_template_timer'
+        ) as install:
+            with self.assertRaises(MiddlewareNotUsed):
+                middleware.PerformanceMetricsMiddleware(lambda request: None)
+        install.assert_not_called()
+
+    @override_settings(
+        PERF_METRICS=True,
+        PERF_METRICS_FLUSH_EVERY=1,
+        STORAGES=UNHASHED_STORAGES,
+    )
+    def test_records_request_timings(self):
+        user = User.objects.create_user('alice', password='p')
+        self.client.force_login(user)
+        response = self.client.get(reverse('my_bookings'))
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        entry = metrics.aggregate()['my_bookings']
+        self.assertEqual(entry['count'], 1)
+        self.assertGreater(entry['queries']['max'], 0)
+        self.assertGreater(entry['template_ms']['max'], 0)
+
+
+# ============================================================================
+# WORKSPACE AND BOOKING DETAILS
+# ============================================================================
+
+class DetailsJsonTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.mine = make_booking(self.user, self.workspace)
+        self.theirs = make_booking(
+            self.other, make_workspace('Desk-2'), 11, 12
+        )
+        self.params = {
+            'workspaces': f'{self.workspace.pk},{self.theirs.workspace_id}',
+            'bookings': f'{self.mine.pk},{self.theirs.pk}',
+        }
+
+    def get(self, **headers):
+        return self.client.get(
+            reverse('details_json'), self.params, **headers
+        )
+
+    def test_returns_workspaces_and_own_bookings_only(self):
+        data = self.get().json()
+        self.assertEqual(
+            set(data['workspaces']),
+            {str(self.workspace.pk), str(self.theirs.workspace_id)},
+        )
+        self.assertEqual(list(data['bookings']), [str(self.mine.pk)])
+
+    def test_unchanged_details_are_304(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.mine.purpose = 'Planning'
+        self.mine.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()['bookings'][str(self.mine.pk)]['purpose'],
+            'Planning',
+        )
+
+    def test_rejects_too_many_ids(self):
+        self.params = {
+            'workspaces': ','.join(map(str, range(1, 502))),
+        }
+        self.assertEqual(self.get().status_code, 400)
+
+
+# ============================================================================
+# USAGE ROLLUPS
+# ============================================================================
+
+@override_settings(TASKS_EAGER=True)
+class UsageRollupTests(BookingTestCase):
+
+    def rollups(self):
+        return set(DailyWorkspaceUsage.objects.values_list(
+            'workspace', 'date', 'booked_minutes', 'booking_count'
+        ))
+
+    def test_rollups_follow_booking_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = make_booking(self.user, self.workspace, 9, 11)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_booking(self.other, self.workspace, 14, 15)
+        day = booking.booking_date
+        self.assertEqual(
+            self.rollups(), {(self.workspace.pk, day, 180, 2)}
+        )
+
+        # Moving a booking refreshes the day it left as well
+        booking.booking_date = day + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(self.rollups(), {
+            (self.workspace.pk, day, 60, 1),
+            (self.workspace.pk, booking.booking_date, 120, 1),
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.cancel()
+        self.assertEqual(
+            self.rollups(), {(self.workspace.pk, day, 60, 1)}
+        )
+
+    def test_rebuild_command_and_report(self):
+        day = timezone.localdate() - timedelta(days=3)
+        # Past bookings, written without signals like imported history
+        Booking.objects.bulk_create([
+            Booking(
+                user=self.user, workspace=self.workspace, booking_date=day,
+                start_time=time(start), end_time=time(start + 1),
+                status=status,
+            )
+            for start, status in (
+                (9, 'completed'), (11, 'completed'), (13, 'cancelled'),
+            )
+        ])
+        call_command('rebuild_usage_rollups', stdout=io.StringIO())
+        self.assertEqual(
+            self.rollups(), {(self.workspace.pk, day, 120, 2)}
+        )
+
+        report = usage.utilisation_report(day, day)
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['booked_hours'], 2)
+        self.assertEqual(report[0]['booking_count'], 2)
+        # 2 of the 14 bookable hours of the only workspace
+        self.assertEqual(report[0]['utilisation'], 14.3)
+
+
+# ============================================================================
+# BOOKING ARCHIVE
+# ============================================================================
+
+class ArchiveBookingsTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        old = today - timedelta(days=400)
+        recent = today - timedelta(days=10)
+        self.cancelled, self.completed, self.confirmed, self.recent = (
+            Booking.objects.bulk_create([
+                Booking(
+                    user=self.user, workspace=self.workspace,
+                    booking_date=booking_date, start_time=time(start),
+                    end_time=time(start + 1), status=status,
+                )
+                for booking_date, start, status in (
+                    (old, 9, 'cancelled'),
+                    (old, 10, 'completed'),
+                    (old, 11, 'confirmed'),
+                    (recent, 9, 'cancelled'),
+                )
+            ])
+        )
+
+    def archive(self, *args):
+        call_command(
+            'archive_bookings', '--days', '365', *args,
+            stdout=io.StringIO(),
+        )
+
+    def test_moves_old_final_bookings_in_batches(self):
+        self.archive('--batch-size', '1')
+        self.assertEqual(
+            set(ArchivedBooking.objects.values_list('pk', 'status')),
+            {(self.cancelled.pk, 'cancelled'),
+             (self.completed.pk, 'completed')},
+        )
+        self.assertEqual(
+            set(Booking.objects.values_list('pk', flat=True)),
+            {self.confirmed.pk, self.recent.pk},
+        )
+        # Archived bookings keep counting, so no rollup refresh is queued
+        self.assertFalse(Task.objects.exists())
+
+    def test_dry_run_moves_nothing(self):
+        self.archive('--dry-run')
+        self.assertFalse(ArchivedBooking.objects.exists())
+        self.assertEqual(Booking.objects.count(), 4)
+
+
+# ============================================================================
+# COMPLETING PAST BOOKINGS
+# ============================================================================
+
+class CompletePastBookingsTests(BookingTestCase):
+
+    def test_completes_confirmed_past_bookings_only(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        past, pending = Booking.objects.bulk_create([
+            Booking(
+                user=self.user, workspace=self.workspace,
+                booking_date=yesterday, start_time=time(start),
+                end_time=time(start + 1), status=status,
+            )
+            for start, status in ((9, 'confirmed'), (11, 'pending'))
+        ])
+        upcoming = make_booking(self.user, self.workspace)
+
+        with mock.patch.object(
+            availability_cache, 'invalidate_date'
+        ) as invalidate_date:
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command(
+                    'complete_past_bookings', '--batch-size', '1',
+                    stdout=io.StringIO(),
+                )
+        invalidate_date.assert_called_once_with(yesterday)
+
+        past.refresh_from_db()
+        self.assertEqual(past.status, 'completed')
+        # Edits started before completion cannot undo it
+        self.assertEqual(past.version, 2)
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, 'pending')
+        upcoming.refresh_from_db()
+        self.assertEqual(upcoming.status, 'confirmed')
+
+        # Running again finds nothing left to do
+        out = io.StringIO()
+        call_command('complete_past_bookings', stdout=out)
+        self.assertIn("Marked 0 past bookings", out.getvalue())
+
+
+# ============================================================================
+# RESPONSIVE IMAGES
+# ============================================================================
+
+@override_settings(
+    STORAGES=UNHASHED_STORAGES,
+    RESPONSIVE_IMAGES={'images/hero.jpg': (480, 2000)},
+)
+class ResponsiveImageTests(TestCase):
+
+    def render(self):
+        return Template(
+            "{% load responsive_images %}"
+            "{% responsive_image 'images/hero.jpg' sizes='50vw' alt='Hero' %}"
+        ).render(Context())
+
+    def test_falls_back_to_the_original(self):
+        html = self.render()
+        self.assertNotIn('<source', html)
+        self.assertIn('<img src="/static/images/hero.jpg" alt="Hero">', html)
+
+    def test_lists_generated_variants(self):
+        manifest = {
+            'images/hero-480w.webp': 'images/hero-480w.0123.webp',
+        }
+        with mock.patch.object(
+            staticfiles_storage, 'hashed_files', manifest, create=True
+        ):
+            html = self.render()
+        self.assertIn(
+            '<source type="image/webp" '
+            'srcset="/static/images/hero-480w.webp 480w" sizes="50vw">',
+            html,
+        )
+        self.assertNotIn('image/avif', html)
+
+    @skipIf(storage.Image is None, "Pillow is not installed")
+    def test_collectstatic_writes_variants(self):
+        source = tempfile.mkdtemp()
+        target = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, target)
+        os.mkdir(os.path.join(source, 'images'))
+        storage.Image.new('RGB', (1000, 500)).save(
+            os.path.join(source, 'images', 'hero.jpg')
+        )
+
+        written = storage.ResponsiveStaticFilesStorage(
+            location=target
+        ).write_variants({
+            'images/hero.jpg': (
+                FileSystemStorage(location=source), 'images/hero.jpg'
+            ),
+        })
+        # Widths larger than the original are skipped
+        self.assertEqual(written, [
+            storage.variant_name('images/hero.jpg', 480, image_format)
+            for image_format in storage.supported_formats()
+        ])
+        for name in written:
+            with storage.Image.open(os.path.join(target, name)) as image:
+                self.assertEqual(image.size, (480, 240))
+
+
+# ============================================================================
+# FLOOR PLAN RENDERER
+# ============================================================================
+
+class FloorPlanRendererTests(BookingTestCase):
+
+    def test_renders_states_and_escapes_names(self):
+        other = make_workspace('<Desk & 2>')
+        html = floorplan.render_floor({
+            self.workspace.pk: {'state': MINE, 'booking_id': 7},
+            other.pk: {'state': HELD, 'booking_id': None},
+        })
+        self.assertIn(
+            '<rect class="workspace reserved editable"'
+            ' data-booking-id="7" x="0" y="0"',
+            html,
+        )
+        self.assertIn('<rect class="workspace reserved held" x=', html)
+        self.assertIn('&lt;Desk &amp; 2&gt;</text>', html)
+        self.assertEqual(html.count('<g class="workspace-group"'), 2)
+
+    def test_geometry_is_cached_until_a_workspace_changes(self):
+        floorplan.render_floor({})
+        with self.assertNumQueries(0):
+            html = floorplan.render_floor({})
+        self.assertIn('class="workspace"', html)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workspace.name = 'Desk-9'
+            self.workspace.save()
+        self.assertIn('>Desk-9</text>', floorplan.render_floor({}))
+
+
+# ============================================================================
+# ADMIN CHANGELISTS
+# ============================================================================
+
+@override_settings(STORAGES=UNHASHED_STORAGES)
+class BookingAdminTests(BookingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        admin_user = User.objects.create_superuser('admin', password='p')
+        self.client.force_login(admin_user)
+        self.url = reverse('admin:booking_booking_changelist')
+
+    def changelist(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_username_filter(self):
+        mine = make_booking(self.user, self.workspace)
+        make_booking(self.other, self.workspace, 11, 12)
+        response = self.changelist(username=' alice ')
+        self.assertEqual(
+            [booking.pk for booking in response.context['cl'].result_list],
+            [mine.pk],
+        )
+        self.assertContains(response, 'name="username"')
+
+    def test_query_count_does_not_grow_with_rows(self):
+        make_booking(self.user, self.workspace)
+        with CaptureQueriesContext(connection) as one:
+            self.changelist()
+        for hour in range(10, 15):
+            make_booking(
+                self.other, make_workspace(f'Desk-{hour}'), hour, hour + 1
+            )
+        with CaptureQueriesContext(connection) as six:
+            self.changelist()
+        self.assertEqual(len(six), len(one))
@@ -4,6 +4,17 @@ from . import views
 urlpatterns = [
     path('workspaces/', views.workspace_list, name='workspace_list'),
     path('booking/create/', views.create_booking, name='create_booking'),
+    path('booking/hold/', views.hold_slot, name='hold_slot'),
+    path(
+        'booking/hold/release/',
+        views.release_slot,
+        name='release_slot',
+    ),
+    path(
+        'booking/recurring/',
+        views.create_recurring_booking,
+        name='create_recurring_booking',
+    ),
     path(
         'booking/<int:booking_id>/update/',
         views.update_booking,
@@ -26,10 +37,50 @@ urlpatterns = [
         views.get_booking_details,
         name='booking_details',
     ),
+    path(
+        'booking/details/',
+        views.details_json,
+        name='details_json',
+    ),
     path(
         'booking/<int:booking_id>/edit-form/',
         views.edit_booking_form,
         name='edit_booking_form',
     ),
+    path(
+        'booking/floor-plan/',
+        views.floor_plan_fragment,
+        name='floor_plan_fragment',
+    ),
+    path(
+        'booking/availability/',
+        views.availability_json,
+        name='availability_json',
+    ),
+    path(
+        'booking/nearest/',
+        views.nearest_workspaces,
+        name='nearest_workspaces',
+    ),
+    path(
+        'booking/availability/stream/',
+        views.availability_stream,
+        name='availability_stream',
+    ),
+    path(
+        'booking/availability/cache-stats/',
+        views.availability_cache_stats,
+        name='availability_cache_stats',
+    ),
+    path(
+        'booking/workspaces/status/',
+        views.update_workspaces_status,
+        name='update_workspaces_status',
+    ),
+    path(
+        'booking/reports/usage/',
+        views.usage_report,
+        name='usage_report',
+    ),
     path('', views.home, name='home'),
 ]
@@ -0,0 +1,225 @@
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from . import tasks
+from .models import (
+    ArchivedBooking, Booking, DailyWorkspaceUsage, Floor, WorkSpace
+)
+
+
+# ============================================================================
+# USAGE ROLLUPS
+# ============================================================================
+# Keeps DailyWorkspaceUsage (booked minutes and booking count per
+# workspace and day) in step with bookings, so utilisation reports never
+# scan the Booking table.
+#
+# Cells are recomputed from their bookings rather than adjusted by
+# deltas, which keeps them correct however a booking changed. Archived
+# bookings keep counting, so archiving never changes the rollups.
+# ============================================================================
+
+# Booking statuses that count as occupied time
+USAGE_STATUSES = ('pending', 'confirmed', 'completed')
+
+
+def booking_minutes(start_time, end_time):
+    """
+    Length of a booking slot in whole minutes.
+    """
+    start = datetime.combine(datetime.min, start_time)
+    end = datetime.combine(datetime.min, end_time)
+    return int((end - start).total_seconds() // 60)
+
+
+def booked_slots(*args, **kwargs):
+    """
+    (workspace_id, booking_date, start_time, end_time) of the live and
+    archived bookings matching the filter that count as occupied time.
+    """
+    return chain.from_iterable(
+        model.objects.filter(
+            *args, status__in=USAGE_STATUSES, **kwargs
+        ).values_list(
+            'workspace_id', 'booking_date', 'start_time', 'end_time'
+        ).order_by().iterator(chunk_size=2000)
+        for model in (Booking, ArchivedBooking)
+    )
+
+
+def usage_rows(bookings):
+    """
+    Aggregate (workspace_id, booking_date, start_time, end_time) tuples.
+
+    Returns:
+        dict: {(workspace_id, date): (booked_minutes, booking_count)}
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for workspace_id, booking_date, start_time, end_time in bookings:
+        cell = totals[(workspace_id, booking_date)]
+        cell[0] += booking_minutes(start_time, end_time)
+        cell[1] += 1
+    return {key: tuple(value) for key, value in totals.items()}
+
+
+def save_usage(totals):
+    """
+    Upsert rollup rows from usage_rows() output.
+    """
+    DailyWorkspaceUsage.objects.bulk_create(
+        [
+            DailyWorkspaceUsage(
+                workspace_id=workspace_id,
+                date=usage_date,
+                booked_minutes=minutes,
+                booking_count=count,
+            )
+            for (workspace_id, usage_date), (minutes, count)
+            in totals.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['workspace', 'date'],
+        update_fields=['booked_minutes', 'booking_count'],
+    )
+
+
+def refresh_usage(cells):
+    """
+    Recompute the rollup of the given (workspace_id, date) cells from
+    their bookings; cells left without bookings are deleted.
+    """
+    cells = set(cells)
+    if not cells:
+        return
+    dates_by_workspace = defaultdict(set)
+    for workspace_id, usage_date in cells:
+        dates_by_workspace[workspace_id].add(usage_date)
+    match = Q()
+    for workspace_id, dates in dates_by_workspace.items():
+        match |= Q(workspace_id=workspace_id, booking_date__in=dates)
+
+    totals = usage_rows(booked_slots(match))
+    save_usage(totals)
+
+    empty = defaultdict(set)
+    for workspace_id, usage_date in cells - set(totals):
+        empty[workspace_id].add(usage_date)
+    if empty:
+        match = Q()
+        for workspace_id, dates in empty.items():
+            match |= Q(workspace_id=workspace_id, date__in=dates)
+        DailyWorkspaceUsage.objects.filter(match).delete()
+
+
+@tasks.task(queue='rollups')
+def refresh_usage_task(cells):
+    """
+    refresh_usage() run from the task queue, with cells as
+    [workspace_id, 'YYYY-MM-DD'] pairs.
+
+    The workspace rows are locked first (PostgreSQL), so two refreshes of
+    the same cells cannot save an older count over a newer one. On SQLite
+    the loser of that race fails to write and is retried.
+    """
+    cells = {
+        (workspace_id, date.fromisoformat(usage_date))
+        for workspace_id, usage_date in cells
+    }
+    with transaction.atomic():
+        list(
+            WorkSpace.objects.select_for_update(no_key=True).filter(
+                pk__in={workspace_id for workspace_id, _ in cells}
+            ).order_by('pk').values_list('pk', flat=True)
+        )
+        refresh_usage(cells)
+
+
+def queue_refresh(cells):
+    """
+    Refresh the rollup of (workspace_id, date) cells in the background,
+    once the current transaction commits.
+    """
+    cells = sorted(set(cells))
+    if cells:
+        tasks.enqueue(refresh_usage_task, cells)
+
+
+# ----------------------------------------------------------------------------
+# REPORTING
+# ----------------------------------------------------------------------------
+
+# Bookable hours per workspace and day (8:00 - 22:00)
+BUSINESS_HOURS_PER_DAY = 14
+
+# Report groupings: {name: (rollup field, workspace field)}
+REPORT_GROUPS = {
+    'day': ('date', None),
+    'floor': ('workspace__floor', 'floor'),
+    'type': ('workspace__workspace_type', 'workspace_type'),
+}
+
+
+def utilisation_report(start, end, group_by='day'):
+    """
+    Booked hours and utilisation between two dates, read from the rollups.
+
+    Utilisation is booked hours over the bookable hours of every
+    workspace in the group for the whole period (or the day, when grouped
+    by day).
+
+    Returns:
+        list: [{'key', 'label', 'booked_hours', 'booking_count',
+                'utilisation'}, ...]
+    """
+    usage_field, workspace_field = REPORT_GROUPS[group_by]
+    rows = DailyWorkspaceUsage.objects.filter(
+        date__range=(start, end)
+    ).values(usage_field).annotate(
+        minutes=Sum('booked_minutes'),
+        bookings=Sum('booking_count'),
+    ).order_by(usage_field)
+
+    if workspace_field is None:
+        workspaces = {None: WorkSpace.objects.count()}
+        days = 1
+    else:
+        workspaces = dict(
+            WorkSpace.objects.values(workspace_field).annotate(
+                total=Count('id')
+            ).values_list(workspace_field, 'total').order_by()
+        )
+        days = (end - start).days + 1
+    labels = _group_labels(group_by)
+
+    report = []
+    for row in rows:
+        key = row[usage_field]
+        capacity = (
+            workspaces.get(None if workspace_field is None else key, 0)
+            * days * BUSINESS_HOURS_PER_DAY
+        )
+        booked_hours = row['minutes'] / 60
+        report.append({
+            'key': key,
+            'label': labels.get(key, key),
+            'booked_hours': round(booked_hours, 2),
+            'booking_count': row['bookings'],
+            'utilisation': (
+                round(100 * booked_hours / capacity, 1) if capacity else None
+            ),
+        })
+    return report
+
+
+def _group_labels(group_by):
+    if group_by == 'floor':
+        labels = {floor.pk: str(floor) for floor in Floor.objects.all()}
+        labels[None] = 'No floor'
+        return labels
+    if group_by == 'type':
+        return dict(WorkSpace.WORKSPACE_TYPES)
+    return {}
@@ -1,12 +1,33 @@
+import asyncio
+import json
+import math
 from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, redirect
 from django.urls import reverse
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.core.exceptions import ValidationError
 
-from .models import WorkSpace, Booking
-from .forms import BookingForm, CheckBookingsForm
+from .models import ACTIVE_BOOKING_STATUSES, WorkSpace, Booking, Floor
+from .forms import (
+    BookingForm, CheckBookingsForm, RecurringBookingForm, WorkspaceStatusForm
+)
+from . import cache, events, holds, spatial, usage
+from .maintenance import set_workspace_status
+from .availability import availability_map, parse_date, parse_time, FREE
+from .floorplan import render_floor
+from .recurrence import book_occurrences, BOOKED
 
 
 def home(request):
@@ -23,6 +44,46 @@ def home(request):
     )
 
 
+def _requested_window(request):
+    """
+    Read the date/start_time/end_time window from the query string.
+    Falls back to the next hour from now if missing or invalid.
+    """
+    try:
+        return (
+            parse_date(request.GET['date']),
+            parse_time(request.GET['start_time']),
+            parse_time(request.GET['end_time']),
+        )
+    except (KeyError, ValueError):
+        now = datetime.now()
+        return (
+            now.date(),
+            now.time().replace(second=0, microsecond=0),
+            (now + timedelta(hours=1)).time().replace(
+                second=0, microsecond=0
+            ),
+        )
+
+
+def _requested_floor(request):
+    """
+    Read the floor from the query string.
+    An empty value selects all floors (None); a missing or unknown one
+    falls back to the first floor so large sites never render every
+    workspace by default.
+    """
+    floor_id = request.GET.get('floor')
+    if floor_id == '':
+        return None
+    if floor_id:
+        try:
+            return Floor.objects.get(pk=floor_id)
+        except (Floor.DoesNotExist, ValueError):
+            pass
+    return Floor.objects.first()
+
+
 def book_workspace(request):
     """
     """
@@ -33,64 +94,35 @@ def book_workspace(request):
             date = check_bookings_form.cleaned_data['date']
             start_time = check_bookings_form.cleaned_data['start_time']
             end_time = check_bookings_form.cleaned_data['end_time']
+            floor = check_bookings_form.cleaned_data['floor']
 
             url = (
                 reverse('home')
                 + f"?date={date}&start_time={start_time}&end_time={end_time}"
+                + f"&floor={floor.pk if floor else ''}"
             )
             return redirect(url)
         else:
             return redirect('home')
 
-    if (
-        request.GET.get('date')
-        and request.GET.get('start_time')
-        and request.GET.get('end_time')
-    ):
-        date = request.GET.get('date')
-        start_time = request.GET.get('start_time')
-        end_time = request.GET.get('end_time')
-    else:
-        now = datetime.now()
-        date = now.date().isoformat()
-        start_time = now.strftime('%H:%M')
-        end_time = (now + timedelta(hours=1)).strftime('%H:%M')
+    date, start_time, end_time = _requested_window(request)
+    floor = _requested_floor(request)
+    floor_id = floor.pk if floor else None
 
     check_bookings_form = CheckBookingsForm(initial={
         'date': date,
-        'start_time': start_time,
-        'end_time': end_time,
+        'start_time': start_time.strftime('%H:%M'),
+        'end_time': end_time.strftime('%H:%M'),
+        'floor': floor_id,
     })
 
-    # Exclude workspaces with overlapping bookings
-    available_workspaces = WorkSpace.objects.exclude(
-        bookings__booking_date=date,
-        bookings__start_time__lt=end_time,
-        bookings__end_time__gt=start_time,
-    )
-
     booking_form = BookingForm()
 
-    workspaces = WorkSpace.objects.all()
-
-    user_editable_workspaces = WorkSpace.objects.filter(
-        bookings__user=request.user,
-        bookings__booking_date=date,
-        bookings__start_time__lt=end_time,
-        bookings__end_time__gt=start_time,
-    ).distinct()
-
-    user_bookings = Booking.objects.filter(
-        user=request.user,
-        workspace__in=[ws.id for ws in workspaces],
-        booking_date=date,
-        start_time__lt=end_time,
-        end_time__gt=start_time,
+    availability = availability_map(
+        date, start_time, end_time, request.user, floor_id
     )
-    workspace_to_user_booking_id = {
-        b.workspace_id: b.id
-        for b in user_bookings
-    }
+    # Cached workspace geometry with this window's state classes
+    floor_svg = render_floor(availability, floor_id)
 
     return render(
         request=request,
@@ -98,15 +130,262 @@ def book_workspace(request):
         context={
             "booking_form": booking_form,
             "check_bookings_form": check_bookings_form,
-            "workspaces": workspaces,
-            "available_workspaces": available_workspaces,
-            "user_editable_workspaces": user_editable_workspaces,
-            "workspace_to_booking_id": workspace_to_user_booking_id,
+            "floor_svg": floor_svg,
+            "floor": floor,
         },
         template_name="booking/interactive_floorplan.html",
     )
 
 
+def floor_plan_fragment(request):
+    """
+    Returns the workspace shapes of one floor (or all floors if floor is
+    empty) with their state for the requested window, as an SVG fragment
+    the floor plan swaps in when the user changes floor
+    """
+    date, start_time, end_time = _requested_window(request)
+    floor = _requested_floor(request)
+    floor_id = floor.pk if floor else None
+
+    availability = availability_map(
+        date, start_time, end_time, request.user, floor_id
+    )
+    response = HttpResponse(render_floor(availability, floor_id))
+    response['X-Floor-Id'] = floor_id or ''
+    return response
+
+
+def _last_change(queryset):
+    """
+    Version string from the last change and count of a queryset's rows.
+    Changes when a row is added, removed or saved, as every write sets
+    updated_at (update() calls set it explicitly).
+    """
+    latest = queryset.aggregate(updated=Max('updated_at'), count=Count('pk'))
+    updated = latest['updated']
+    return f"{updated.timestamp() if updated else 0}-{latest['count']}"
+
+
+def _availability_etag(request, date, start_time, end_time, floor_id,
+                       slot_holds):
+    """
+    ETag for availability_json: changes whenever a booking on the date or
+    a workspace changes, or a hold in the window is placed, released or
+    expires, without building the availability map.
+
+    Read from the database rather than the availability cache versions,
+    which only see the writes of this process when the cache is local.
+    """
+    bookings = Booking.objects.filter(booking_date=date)
+    workspaces = WorkSpace.objects.all()
+    if floor_id is not None:
+        bookings = bookings.filter(workspace__floor_id=floor_id)
+        workspaces = workspaces.filter(floor_id=floor_id)
+    held = '.'.join(str(hold_id) for _, _, hold_id in slot_holds)
+    return (
+        f"{_last_change(bookings)}-{_last_change(workspaces)}-"
+        f"{date}-{start_time}-{end_time}-{floor_id or 'all'}-"
+        f"{request.user.pk}-h{held}"
+    )
+
+
+async def _request_user(request):
+    """
+    The authenticated user or None. request.user is lazy and its first
+    access queries the session and user tables, so it is resolved off the
+    event loop.
+    """
+    def resolve():
+        return request.user if request.user.is_authenticated else None
+    return await sync_to_async(resolve)()
+
+
+async def availability_json(request):
+    """
+    Returns compact JSON with the floor plan state of each workspace for a
+    date/start_time/end_time window, optionally limited to one floor.
+    Free workspaces are omitted.
+    Supports conditional GET (ETag / If-None-Match)
+    """
+    try:
+        date = parse_date(request.GET['date'])
+        start_time = parse_time(request.GET['start_time'])
+        end_time = parse_time(request.GET['end_time'])
+        floor = request.GET.get('floor')
+        floor_id = int(floor) if floor else None
+    except (KeyError, ValueError):
+        return JsonResponse({
+            "success": False,
+            "error": "date, start_time and end_time are required"
+        }, status=400)
+
+    # Loaded once for both the ETag and the map
+    slot_holds = await sync_to_async(holds.active_holds)(
+        date, start_time, end_time, floor_id
+    )
+    # The ETag resolves request.user, so availability_map can reuse it
+    etag = quote_etag(await sync_to_async(_availability_etag)(
+        request, date, start_time, end_time, floor_id, slot_holds
+    ))
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+        return response
+
+    availability = await sync_to_async(availability_map)(
+        date, start_time, end_time, request.user, floor_id, slot_holds
+    )
+    states = {}
+    bookings = {}
+    for workspace_id, slot in availability.items():
+        if slot['state'] != FREE:
+            states[workspace_id] = slot['state']
+        if slot['booking_id']:
+            bookings[workspace_id] = slot['booking_id']
+
+    response = JsonResponse({
+        "success": True,
+        "date": date.isoformat(),
+        "start_time": start_time.strftime('%H:%M'),
+        "end_time": end_time.strftime('%H:%M'),
+        "states": states,
+        "bookings": bookings,
+    })
+    response['ETag'] = etag
+    # Per-user data: browsers may keep it but must revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# Most workspaces nearest_workspaces returns
+MAX_NEAREST = 50
+
+
+@login_required
+def nearest_workspaces(request):
+    """
+    Returns JSON with the k nearest free workspaces for a time window,
+    measured from a point (x, y and floor) or from another workspace
+    (e.g. a teammate's desk), nearest first.
+    """
+    try:
+        date = parse_date(request.GET['date'])
+        start_time = parse_time(request.GET['start_time'])
+        end_time = parse_time(request.GET['end_time'])
+        k = min(int(request.GET.get('k', 5)), MAX_NEAREST)
+        if 'workspace' in request.GET:
+            origin_id = int(request.GET['workspace'])
+            x = y = None
+        else:
+            origin_id = None
+            x = float(request.GET['x'])
+            y = float(request.GET['y'])
+            if not (math.isfinite(x) and math.isfinite(y)):
+                raise ValueError("x and y must be finite")
+            floor_id = int(request.GET['floor'])
+    except (KeyError, ValueError):
+        return JsonResponse({
+            "success": False,
+            "error": (
+                "date, start_time, end_time and either workspace or "
+                "x, y and floor are required"
+            )
+        }, status=400)
+
+    if origin_id is not None:
+        try:
+            floor_id = WorkSpace.objects.values_list(
+                'floor_id', flat=True
+            ).get(pk=origin_id)
+        except WorkSpace.DoesNotExist:
+            return JsonResponse({
+                "success": False,
+                "error": "Workspace not found"
+            }, status=404)
+
+    index = spatial.floor_index(floor_id)
+    if index is None:
+        return JsonResponse({"success": True, "workspaces": []})
+    if origin_id is not None:
+        x, y = spatial.center_of(index.shapes[origin_id])
+
+    availability = availability_map(
+        date, start_time, end_time, request.user, floor_id
+    )
+    nearest = index.nearest(
+        x, y, k,
+        accept=lambda shape: (
+            shape.id != origin_id
+            and availability.get(shape.id, {}).get('state') == FREE
+        ),
+    )
+    return JsonResponse({
+        "success": True,
+        "workspaces": [
+            {
+                "id": shape.id,
+                "name": shape.name,
+                "distance": round(distance, 1),
+                "x": shape.x0,
+                "y": shape.y0,
+            }
+            for distance, shape in nearest
+        ],
+    })
+
+
+async def availability_stream(request):
+    """
+    Server-Sent Events stream of booking deltas for one date.
+    Each event carries the workspace and time slot that changed, so the
+    floor plan only refetches availability when its window is affected.
+    Requires the app to be served under ASGI
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            "success": False,
+            "error": "Streaming requires an ASGI server"
+        }, status=501)
+    try:
+        date = parse_date(request.GET['date'])
+    except (KeyError, ValueError):
+        return JsonResponse({
+            "success": False,
+            "error": "date is required"
+        }, status=400)
+
+    keepalive = getattr(settings, 'BOOKING_EVENTS_KEEPALIVE', 15)
+    lifetime = getattr(settings, 'BOOKING_EVENTS_STREAM_SECONDS', 300)
+
+    async def event_stream():
+        subscription = events.get_broker().subscribe(date.isoformat())
+        loop = asyncio.get_running_loop()
+        # Streams are closed periodically and the browser reconnects, so
+        # subscriptions of vanished clients never outlive `lifetime`
+        deadline = loop.time() + lifetime
+        try:
+            yield "retry: 3000\n\n"
+            while loop.time() < deadline:
+                event = await subscription.get(timeout=keepalive)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield (
+                    f"event: {event['type']}\n"
+                    f"data: {json.dumps(event)}\n\n"
+                )
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(
+        event_stream(),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 def workspace_list(request):
     workspaces = WorkSpace.objects.all()
     return render(
@@ -122,17 +401,33 @@ def create_booking(request):
     Create a new booking related to :model:`Booking`
     """
     if request.method == "POST":
-        booking_form = BookingForm(data=request.POST)
+        # The user is set before validation so the form checks their
+        # holds, and the validated booking can be saved without a recheck
+        booking_form = BookingForm(
+            data=request.POST,
+            instance=Booking(user=request.user, status="confirmed"),
+        )
 
         if booking_form.is_valid():
             booking = booking_form.save(commit=False)
-            booking.user = request.user
-            booking.status = "confirmed"
-            booking.save()
+            try:
+                booking.save(validated=True)
+            except ValidationError:
+                # Lost a race for the slot to a concurrent booking
+                messages.add_message(
+                    request,
+                    messages.ERROR,
+                    "Booking could not be made. Select a different slot",
+                )
+                return redirect('book_workspace')
+
+            # The slot is booked now; no need to keep others off it
+            holds.release_holds(request.user)
 
             date = booking_form.cleaned_data['booking_date']
             start_time = booking_form.cleaned_data['start_time']
             end_time = booking_form.cleaned_data['end_time']
+            floor_id = booking.workspace.floor_id
 
             messages.add_message(
                 request,
@@ -142,6 +437,7 @@ def create_booking(request):
             url = (
                 reverse('book_workspace')
                 + f"?date={date}&start_time={start_time}&end_time={end_time}"
+                + f"&floor={floor_id or ''}"
             )
             return redirect(url)
         else:
@@ -153,6 +449,151 @@ def create_booking(request):
     return redirect('book_workspace')
 
 
+@login_required
+def hold_slot(request):
+    """
+    Hold a workspace and time slot for the user while they fill in the
+    booking form (see booking.holds).
+    Supports AJAX POST requests
+    Return JSON response with the hold's expiry, or 409 if the slot was
+    taken or is held by someone else
+    """
+    if request.method != "POST":
+        return JsonResponse(
+            {
+                'success': False,
+                'message': 'Unsupported request.'
+            },
+            status=405
+        )
+
+    try:
+        workspace_id = int(request.POST['workspace'])
+        date = parse_date(request.POST['date'])
+        start_time = parse_time(request.POST['start_time'])
+        end_time = parse_time(request.POST['end_time'])
+    except (KeyError, ValueError):
+        return JsonResponse({
+            "success": False,
+            "message": "workspace, date, start_time and end_time are required"
+        }, status=400)
+    if date < timezone.localdate():
+        return JsonResponse({
+            "success": False,
+            "message": "Booking date cannot be in the past",
+        }, status=400)
+    if end_time <= start_time:
+        return JsonResponse({
+            "success": False,
+            "message": "End time must be after start time",
+        }, status=400)
+    if not WorkSpace.objects.filter(
+        pk=workspace_id, status='available'
+    ).exists():
+        return JsonResponse({
+            "success": False,
+            "message": "Workspace not available",
+        }, status=404)
+
+    hold = holds.place_hold(
+        request.user, workspace_id, date, start_time, end_time
+    )
+    if hold is None:
+        return JsonResponse({
+            "success": False,
+            "message": (
+                "This workspace has just been booked or is being booked "
+                "by someone else. Select a different slot"
+            ),
+        }, status=409)
+    return JsonResponse({
+        "success": True,
+        "expires_at": hold.expires_at.isoformat(),
+    })
+
+
+@login_required
+def release_slot(request):
+    """
+    Release the user's slot hold, e.g. when the booking form is closed.
+    Supports AJAX POST requests
+    Return JSON response
+    """
+    if request.method != "POST":
+        return JsonResponse(
+            {
+                'success': False,
+                'message': 'Unsupported request.'
+            },
+            status=405
+        )
+    return JsonResponse({
+        'success': True,
+        'released': holds.release_holds(request.user),
+    })
+
+
+@login_required
+def create_recurring_booking(request):
+    """
+    Create many bookings related to :model:`Booking` for one workspace
+    and time slot, from a recurrence rule or an explicit list of dates.
+    Supports AJAX POST requests
+    Return JSON response with the outcome of every occurrence
+    """
+    if request.method != "POST":
+        return JsonResponse(
+            {
+                'success': False,
+                'message': 'Unsupported request.'
+            },
+            status=405
+        )
+
+    form = RecurringBookingForm(data=request.POST)
+    if not form.is_valid():
+        json_errors = {}
+        errors_json = form.errors.get_json_data()
+        for field, err_list in errors_json.items():
+            json_errors[field] = [e.get('message') for e in err_list]
+        return JsonResponse(
+            {
+                'success': False,
+                'message': 'Not booked - booking form has errors',
+                'errors': json_errors,
+            },
+            status=400
+        )
+
+    try:
+        occurrences = book_occurrences(
+            user=request.user,
+            workspace=form.cleaned_data['workspace'],
+            dates=form.cleaned_data['occurrences'],
+            start_time=form.cleaned_data['start_time'],
+            end_time=form.cleaned_data['end_time'],
+            purpose=form.cleaned_data['purpose'],
+            notes=form.cleaned_data['notes'],
+        )
+    except ValidationError as e:
+        return JsonResponse(
+            {
+                'success': False,
+                'message': ' '.join(e.messages),
+            },
+            status=409
+        )
+
+    created = sum(1 for o in occurrences if o['status'] == BOOKED)
+    return JsonResponse({
+        'success': created > 0,
+        'message': f'{created} of {len(occurrences)} bookings confirmed.',
+        'created': created,
+        'failed': len(occurrences) - created,
+        'occurrences': occurrences,
+    })
+
+
 @login_required
 def update_booking(request, booking_id):
     """
@@ -162,9 +603,12 @@ def update_booking(request, booking_id):
     """
     if request.method == "POST":
         try:
+            # Cancelled and completed bookings are final; editing one must
+            # not bring it back
             booking = Booking.objects.get(
                 pk=booking_id,
                 user=request.user,
+                status__in=ACTIVE_BOOKING_STATUSES,
             )
             booking_form = BookingForm(
                 data=request.POST,
@@ -173,8 +617,7 @@ def update_booking(request, booking_id):
 
             if booking_form.is_valid():
                 booking = booking_form.save(commit=False)
-                booking.status = "confirmed"
-                booking.save()
+                booking.save(validated=True)
                 return JsonResponse({
                     'success': True,
                     'message': 'Booking updated.'
@@ -200,6 +643,31 @@ def update_booking(request, booking_id):
                     },
                     status=400
                 )
+        except Booking.DoesNotExist:
+            return JsonResponse(
+                {
+                    'success': False,
+                    'message': 'Booking not found or can no longer be '
+                               'changed.'
+                },
+                status=404
+            )
+        except ValidationError as e:
+            # A lost update (BookingVersionConflict) or a slot taken by a
+            # booking saved since the form was validated: send the current
+            # state so the client can show it and let the user decide
+            current = Booking.objects.select_related('workspace').get(
+                pk=booking_id
+            )
+            return JsonResponse(
+                {
+                    'success': False,
+                    'message': ' '.join(e.messages),
+                    'booking': _booking_data(current),
+                    'version': current.version,
+                },
+                status=409
+            )
         except Exception as e:
             return JsonResponse(
                 {
@@ -257,10 +725,78 @@ def cancel_booking(request, booking_id):
         return redirect('my_bookings')
 
 
+# Bookings shown per page of "My Bookings"
+MY_BOOKINGS_PAGE_SIZE = 24
+
+
+def _parse_cursor(cursor):
+    """
+    Decode a "My Bookings" cursor "<date>_<start_time>_<id>".
+
+    Returns:
+        tuple: (booking_date, start_time, id), or None if missing/invalid
+    """
+    try:
+        booking_date, start_time, pk = cursor.split('_')
+        return parse_date(booking_date), parse_time(start_time), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _cursor_for(booking):
+    return (
+        f"{booking.booking_date.isoformat()}_"
+        f"{booking.start_time.isoformat()}_{booking.pk}"
+    )
+
+
 @login_required
 def my_bookings(request):
-    bookings = Booking.objects.filter(user=request.user)
-    return render(request, 'booking/my_bookings.html', {'bookings': bookings})
+    """
+    Lists the user's upcoming (soonest first) or past (latest first)
+    bookings, one page at a time.
+    Pages are keyset-paginated on (booking_date, start_time, id), so
+    every page costs the same however many bookings a user has.
+    """
+    tab = 'past' if request.GET.get('tab') == 'past' else 'upcoming'
+    now = timezone.now()
+
+    bookings = Booking.objects.filter(
+        user=request.user
+    ).select_related('workspace').with_flags(now)
+    if tab == 'past':
+        bookings = bookings.past(now)
+        order = ('-booking_date', '-start_time', '-id')
+        lookup = 'lt'
+    else:
+        bookings = bookings.upcoming(now)
+        order = ('booking_date', 'start_time', 'id')
+        lookup = 'gt'
+
+    cursor = _parse_cursor(request.GET.get('cursor'))
+    if cursor:
+        booking_date, start_time, pk = cursor
+        bookings = bookings.filter(
+            Q(**{f'booking_date__{lookup}': booking_date})
+            | Q(booking_date=booking_date,
+                **{f'start_time__{lookup}': start_time})
+            | Q(booking_date=booking_date, start_time=start_time,
+                **{f'id__{lookup}': pk})
+        )
+
+    # One extra row tells whether there is a next page
+    page = list(bookings.order_by(*order)[:MY_BOOKINGS_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(page) > MY_BOOKINGS_PAGE_SIZE:
+        page = page[:MY_BOOKINGS_PAGE_SIZE]
+        next_cursor = _cursor_for(page[-1])
+
+    return render(request, 'booking/my_bookings.html', {
+        'bookings': page,
+        'tab': tab,
+        'is_first_page': cursor is None,
+        'next_cursor': next_cursor,
+    })
 
 
 @login_required
@@ -277,25 +813,42 @@ def edit_booking_form(request, booking_id):
     )
 
 
-def get_workspace_details(request, workspace_id):
+def _workspace_data(workspace):
+    return {
+        "id": workspace.id,
+        "name": workspace.name,
+        "location": workspace.location,
+        "capacity": workspace.capacity,
+        "workspace_type": workspace.get_workspace_type_display(),
+        "description": workspace.description,
+        "amenities": workspace.get_amenities_list(),
+        "status": workspace.status,
+    }
+
+
+def _booking_data(booking):
+    return {
+        "id": booking.id,
+        "workspace_id": booking.workspace.id,
+        "workspace_name": booking.workspace.name,
+        "booking_date": booking.booking_date.isoformat(),
+        "start_time": booking.start_time.strftime('%H:%M'),
+        "end_time": booking.end_time.strftime('%H:%M'),
+        "status": booking.status,
+        "purpose": booking.purpose,
+        "notes": booking.notes,
+    }
+
+
+async def get_workspace_details(request, workspace_id):
     """
     Returns JSON response related to :model:`Workspace`
     """
     try:
-        workspace = WorkSpace.objects.get(pk=workspace_id)
-        data = {
-            "id": workspace.id,
-            "name": workspace.name,
-            "location": workspace.location,
-            "capacity": workspace.capacity,
-            "workspace_type": workspace.get_workspace_type_display(),
-            "description": workspace.description,
-            "amenities": workspace.get_amenities_list(),
-            "status": workspace.status,
-        }
+        workspace = await WorkSpace.objects.aget(pk=workspace_id)
         return JsonResponse({
             "success": True,
-            "workspace": data
+            "workspace": _workspace_data(workspace)
         })
     except WorkSpace.DoesNotExist:
         return JsonResponse({
@@ -304,35 +857,202 @@ def get_workspace_details(request, workspace_id):
         }, status=404)
 
 
-@login_required
-def get_booking_details(request, booking_id):
+async def get_booking_details(request, booking_id):
     """
     Returns JSON response related to :model:`Booking`
     """
+    # login_required does not support async views in Django 4.2
+    user = await _request_user(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path())
     try:
-        booking = Booking.objects.select_related(
+        booking = await Booking.objects.select_related(
             'workspace', 'user'
-        ).get(
+        ).aget(
             pk=booking_id,
-            user=request.user
+            user=user
         )
-        data = {
-            "id": booking.id,
-            "workspace_id": booking.workspace.id,
-            "workspace_name": booking.workspace.name,
-            "booking_date": booking.booking_date.isoformat(),
-            "start_time": booking.start_time.strftime('%H:%M'),
-            "end_time": booking.end_time.strftime('%H:%M'),
-            "status": booking.status,
-            "purpose": booking.purpose,
-            "notes": booking.notes,
-        }
         return JsonResponse({
             "success": True,
-            "booking": data
+            "booking": _booking_data(booking)
         })
     except Booking.DoesNotExist:
         return JsonResponse({
             "success": False,
             "error": "Booking not found"
         }, status=404)
+
+
+# Most ids of each kind one details request may ask for
+MAX_DETAIL_IDS = 500
+
+
+def _requested_ids(request, name):
+    """
+    Parse a comma separated list of ids, e.g. ?workspaces=1,2,3
+
+    Raises:
+        ValueError: if an id is not an integer or there are too many
+    """
+    values = request.GET.get(name, '').split(',')
+    ids = {int(value) for value in values if value}
+    if len(ids) > MAX_DETAIL_IDS:
+        raise ValueError(f"at most {MAX_DETAIL_IDS} {name} per request")
+    return ids
+
+
+def _owned_bookings(request, booking_ids):
+    """
+    The requested bookings the user may see: only their own.
+    """
+    if not booking_ids or not request.user.is_authenticated:
+        return Booking.objects.none()
+    return Booking.objects.filter(pk__in=booking_ids, user=request.user)
+
+
+def _details_etag(request):
+    """
+    ETag for details_json from the last change and count of the requested
+    rows, so an unchanged set costs two aggregate queries and a 304.
+    """
+    try:
+        workspace_ids = _requested_ids(request, 'workspaces')
+        booking_ids = _requested_ids(request, 'bookings')
+    except ValueError:
+        return None
+    return (
+        f"{_last_change(WorkSpace.objects.filter(pk__in=workspace_ids))}-"
+        f"{_last_change(_owned_bookings(request, booking_ids))}-"
+        f"{request.user.pk}"
+    )
+
+
+@condition(etag_func=_details_etag)
+def details_json(request):
+    """
+    Returns the details of many workspaces and bookings in one response,
+    keyed by id, e.g. ?workspaces=1,2,3&bookings=7,8. Bookings of other
+    users and unknown ids are left out.
+    The floor plan prefetches the details of the workspaces shown, so
+    opening one needs no request of its own.
+    Supports conditional GET (ETag / If-None-Match)
+    """
+    try:
+        workspace_ids = _requested_ids(request, 'workspaces')
+        booking_ids = _requested_ids(request, 'bookings')
+    except ValueError as e:
+        return JsonResponse({
+            "success": False,
+            "error": str(e)
+        }, status=400)
+
+    workspaces = WorkSpace.objects.in_bulk(workspace_ids)
+    bookings = _owned_bookings(request, booking_ids).select_related(
+        'workspace'
+    ).in_bulk()
+
+    response = JsonResponse({
+        "success": True,
+        "workspaces": {
+            pk: _workspace_data(workspace)
+            for pk, workspace in workspaces.items()
+        },
+        "bookings": {
+            pk: _booking_data(booking) for pk, booking in bookings.items()
+        },
+    })
+    # Per-user data: browsers may keep it but must revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@staff_member_required
+def update_workspaces_status(request):
+    """
+    Change the status of many :model:`WorkSpace` at once (the listed
+    workspaces and/or every workspace of a floor) and cancel or keep
+    their future bookings. Users are notified in the background.
+    Supports POST requests
+    Return JSON response with the numbers of workspaces and bookings
+    affected
+    """
+    if request.method != "POST":
+        return JsonResponse(
+            {
+                'success': False,
+                'message': 'Unsupported request.'
+            },
+            status=405
+        )
+
+    form = WorkspaceStatusForm(data=request.POST)
+    if not form.is_valid():
+        json_errors = {}
+        errors_json = form.errors.get_json_data()
+        for field, err_list in errors_json.items():
+            json_errors[field] = [e.get('message') for e in err_list]
+        return JsonResponse(
+            {
+                'success': False,
+                'message': 'Not updated - form has errors',
+                'errors': json_errors,
+            },
+            status=400
+        )
+
+    result = set_workspace_status(
+        form.cleaned_data['workspace_ids'],
+        form.cleaned_data['status'],
+        bookings=form.cleaned_data['bookings'],
+    )
+    return JsonResponse({
+        'success': True,
+        'message': (
+            f"{result['workspaces']} workspaces set to "
+            f"{form.cleaned_data['status']}; {result['cancelled']} of "
+            f"{result['bookings']} future bookings cancelled."
+        ),
+        **result,
+    })
+
+
+@staff_member_required
+def availability_cache_stats(request):
+    """
+    Returns JSON hit/miss counters of the floor plan availability cache
+    """
+    return JsonResponse({
+        "success": True,
+        "cache": cache.stats(),
+    })
+
+
+@staff_member_required
+def usage_report(request):
+    """
+    Utilisation report for facilities, grouped by day, floor or workspace
+    type. Reads only the daily usage rollups (see booking.usage)
+    """
+    group_by = request.GET.get('group')
+    if group_by not in usage.REPORT_GROUPS:
+        group_by = 'day'
+    today = timezone.localdate()
+    try:
+        start = parse_date(request.GET['start'])
+        end = parse_date(request.GET['end'])
+    except (KeyError, ValueError):
+        start, end = today - timedelta(days=30), today
+    if end < start:
+        start, end = end, start
+
+    rows = usage.utilisation_report(start, end, group_by)
+    return render(request, 'booking/usage_report.html', {
+        'title': 'Workspace utilisation',
+        'rows': rows,
+        'group_by': group_by,
+        'groups': list(usage.REPORT_GROUPS),
+        'start': start,
+        'end': end,
+        'total_hours': round(sum(row['booked_hours'] for row in rows), 2),
+        'total_bookings': sum(row['booking_count'] for row in rows),
+    })
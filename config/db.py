@@ -0,0 +1,30 @@
+import re
+
+from django.conf import settings
+
+
+# ============================================================================
+# DATABASE CONNECTION SETUP
+# ============================================================================
+# Receivers for django.db.backends.signals.connection_created, connected
+# in booking.apps.BookingConfig.ready().
+# ============================================================================
+
+# PRAGMA values are interpolated, so only plain words and numbers pass
+_PRAGMA_VALUE = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Apply settings.SQLITE_PRAGMAS to a new SQLite connection.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not value:
+                continue
+            if not _PRAGMA_VALUE.match(str(value)):
+                raise ValueError(f"Invalid value for SQLite PRAGMA {name}")
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,27 @@
+import os
+
+
+# ============================================================================
+# GUNICORN SETTINGS
+# ============================================================================
+# Used by the Procfile (gunicorn -c config/gunicorn.py).
+#
+# SERVER_MODE=asgi serves config.asgi with uvicorn workers: async views
+# and the availability event stream then wait on the event loop instead
+# of holding a worker each. The default, wsgi, serves config.wsgi with
+# gunicorn's sync workers.
+#
+# WEB_CONCURRENCY (set by Heroku per dyno size) is read by gunicorn itself.
+# ============================================================================
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi').lower()
+if SERVER_MODE not in ('wsgi', 'asgi'):
+    raise ValueError(
+        f"SERVER_MODE must be 'wsgi' or 'asgi', not {SERVER_MODE!r}"
+    )
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'config.workers.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
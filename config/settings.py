@@ -71,6 +71,7 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 MIDDLEWARE = [
+    'booking.middleware.PerformanceMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -118,6 +119,108 @@ else:
         }
     }
 
+# Connection reuse. Every setting can be changed by environment variable:
+# - DB_CONN_MAX_AGE: seconds a connection is kept open between requests
+#   (0 opens a new connection for every request). Defaults to 0 under
+#   SERVER_MODE=asgi (see config/gunicorn.py): async views run their
+#   queries in thread pools whose connections are not closed reliably
+#   between requests, so persistent connections would leak
+# - DB_CONN_HEALTH_CHECKS: check a reused connection before the request
+#   uses it, so a server restart does not fail the next request
+# - DB_TRANSACTION_POOLING: DATABASE_URL points at a pooler in transaction
+#   pooling mode (e.g. PgBouncer pool_mode=transaction). Server-side
+#   cursors do not survive it, so they are disabled. This is only a
+#   compatibility flag: the pooler does the pooling, and Django may still
+#   keep its connection to the pooler open (DB_CONN_MAX_AGE)
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi').lower()
+DATABASES['default']['CONN_MAX_AGE'] = int(
+    os.environ.get('DB_CONN_MAX_AGE', 0 if SERVER_MODE == 'asgi' else 60)
+)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = (
+    os.environ.get('DB_CONN_HEALTH_CHECKS').capitalize() == 'True'
+    if 'DB_CONN_HEALTH_CHECKS' in os.environ else True
+)
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = (
+    os.environ.get('DB_TRANSACTION_POOLING').capitalize() == 'True'
+    if 'DB_TRANSACTION_POOLING' in os.environ else False
+)
+
+# PRAGMAs applied to every new SQLite connection (see config/db.py).
+# WAL lets readers run alongside a writer, synchronous=NORMAL is safe
+# with WAL, and busy_timeout (ms) makes writers wait for the lock
+# instead of failing with "database is locked". Empty values are skipped.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': os.environ.get('SQLITE_BUSY_TIMEOUT', '5000'),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory by default; set CACHE_DIR to share the cache between
+# worker processes through the file system. A shared cache is required
+# for availability invalidations to reach every process when more than
+# one serves requests (WEB_CONCURRENCY > 1); see booking.cache.
+
+if 'CACHE_DIR' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'backspace',
+        }
+    }
+
+# Seconds a floor plan availability snapshot stays cached
+AVAILABILITY_CACHE_TIMEOUT = int(
+    os.environ.get('AVAILABILITY_CACHE_TIMEOUT', 60)
+)
+
+
+# Booking events (Server-Sent Events for the floor plan)
+# Dotted path to the broker class; the default fans out in-process
+BOOKING_EVENTS_BROKER = os.environ.get(
+    'BOOKING_EVENTS_BROKER', 'booking.events.InProcessBroker'
+)
+# Seconds between keepalive comments / before a stream is recycled
+BOOKING_EVENTS_KEEPALIVE = 15
+BOOKING_EVENTS_STREAM_SECONDS = 300
+
+
+# Request metrics (query count, SQL/template/wall time per view)
+# Opt-in: adds Server-Timing headers and a per-URL-name aggregate
+# readable with `python manage.py dump_perf_metrics`
+PERF_METRICS = (
+    os.environ.get('PERF_METRICS').capitalize() == 'True'
+    if 'PERF_METRICS' in os.environ else False
+)
+PERF_METRICS_CACHE = 'default'
+PERF_METRICS_SAMPLES = 1000
+PERF_METRICS_FLUSH_EVERY = 20
+
+# Cancelled/completed bookings older than this many days are moved to
+# the archive table by `python manage.py archive_bookings`
+BOOKING_ARCHIVE_DAYS = int(os.environ.get('BOOKING_ARCHIVE_DAYS', 365))
+
+# Seconds a workspace slot stays held for a user filling in the booking
+# form; expired holds are deleted by `python manage.py sweep_slot_holds`
+BOOKING_HOLD_SECONDS = int(os.environ.get('BOOKING_HOLD_SECONDS', 120))
+
+# Background tasks (booking.tasks) are run by `python manage.py run_tasks`.
+# TASKS_EAGER=True runs them in-process after each commit instead, for
+# development without a worker
+TASKS_EAGER = (
+    os.environ.get('TASKS_EAGER').capitalize() == 'True'
+    if 'TASKS_EAGER' in os.environ else False
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -168,6 +271,29 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# collectstatic writes hashed file names (served with far-future cache
+# headers by WhiteNoise), gzip/brotli copies and the image variants below
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'config.storage.ResponsiveStaticFilesStorage',
+    },
+}
+
+# Already-compressed formats WhiteNoise should not gzip/brotli again
+WHITENOISE_SKIP_COMPRESS_EXTENSIONS = (
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'ico', 'zip', 'gz', 'tgz',
+    'bz2', 'tbz', 'xz', 'br', 'swf', 'flv', 'woff', 'woff2',
+)
+
+# Images given resized WebP/AVIF copies by collectstatic: {path: widths}
+RESPONSIVE_IMAGES = {
+    'assets/images/Hero Image.jpg': (480, 960, 1600),
+    'assets/images/floor-plan.jpg': (600, 1000),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
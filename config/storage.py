@@ -0,0 +1,118 @@
+import io
+import os
+import warnings
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; variants are skipped without it
+    Image = None
+
+
+# ============================================================================
+# STATIC FILES STORAGE
+# ============================================================================
+# WhiteNoise's hashed + precompressed (gzip, and brotli when the Brotli
+# package is installed) storage, which also writes resized WebP/AVIF
+# copies of the images listed in settings.RESPONSIVE_IMAGES during
+# collectstatic. Variants are hashed and served like any other file; the
+# responsive_image template tag picks them up from the manifest.
+# ============================================================================
+
+# Plain static storage, so pages render without a collectstatic manifest
+# (tests and the booking benchmark swap it in with override_settings)
+UNHASHED_STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Variant formats, best first: {format: Pillow save options}
+VARIANT_FORMATS = {
+    'avif': {'quality': 55},
+    'webp': {'quality': 80, 'method': 6},
+}
+
+
+def variant_name(name, width, image_format):
+    """
+    Static path of a resized copy, e.g. 'images/hero-960w.webp'.
+    """
+    return f"{os.path.splitext(name)[0]}-{width}w.{image_format}"
+
+
+def supported_formats():
+    if Image is None:
+        return []
+    return [
+        image_format for image_format in VARIANT_FORMATS
+        if features.check(image_format)
+    ]
+
+
+class ResponsiveStaticFilesStorage(CompressedManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in self.write_variants(paths):
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def write_variants(self, paths):
+        """
+        Write the resized copies of RESPONSIVE_IMAGES found in `paths`.
+
+        Returns:
+            list: static paths of the written variants
+        """
+        images = getattr(settings, 'RESPONSIVE_IMAGES', {})
+        if not images:
+            return []
+        formats = supported_formats()
+        if not formats:
+            warnings.warn(
+                "Pillow (with WebP/AVIF support) is not installed; "
+                "responsive image variants were not generated."
+            )
+            return []
+
+        written = []
+        for name, widths in images.items():
+            if name not in paths:
+                continue
+            storage, path = paths[name]
+            with storage.open(path) as f:
+                image = Image.open(f)
+                # JPEG can decode straight at a reduced scale
+                largest = max(widths)
+                image.draft('RGB', (
+                    largest, round(image.height * largest / image.width)
+                ))
+                image = image.convert('RGB')
+                image.load()
+
+            for width in widths:
+                if width > image.width:
+                    continue
+                height = round(image.height * width / image.width)
+                resized = image.resize((width, height), Image.LANCZOS)
+                for image_format in formats:
+                    buffer = io.BytesIO()
+                    resized.save(
+                        buffer,
+                        format=image_format.upper(),
+                        **VARIANT_FORMATS[image_format],
+                    )
+                    variant = variant_name(name, width, image_format)
+                    if self.exists(variant):
+                        self.delete(variant)
+                    self.save(variant, ContentFile(buffer.getvalue()))
+                    written.append(variant)
+        return written
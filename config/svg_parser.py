@@ -6,72 +6,134 @@ from datetime import datetime, timezone
 
 now = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
 
-def parse_svg(file_path):
-    ns = {'svg': 'http://www.w3.org/2000/svg'}
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    shapes = []
-    for rect in root.findall('.//{http://www.w3.org/2000/svg}rect'):
-        data_id = rect.attrib.get('data-table-id') or rect.attrib.get('id')
-        shapes.append({
-            'table_id': int(data_id) if data_id and str(data_id).isdigit() else data_id,
+SVG_NS = '{http://www.w3.org/2000/svg}'
+
+def _table_id(elem):
+    data_id = elem.attrib.get('data-table-id') or elem.attrib.get('id')
+    return int(data_id) if data_id and str(data_id).isdigit() else data_id, data_id
+
+def _shape_from_element(elem):
+    """Return the shape dict for a rect/circle/polygon element, else None."""
+    tag = elem.tag
+    if tag == SVG_NS + 'rect':
+        table_id, data_id = _table_id(elem)
+        return {
+            'table_id': table_id,
             'type': 'rect',
-            'x': float(rect.attrib.get('x',0)),
-            'y': float(rect.attrib.get('y',0)),
-            'w': float(rect.attrib.get('width',0)),
-            'h': float(rect.attrib.get('height',0)),
-            'rx': float(rect.attrib.get('rx',0)) if 'rx' in rect.attrib else 0,
-            'svg_id': rect.attrib.get('id', data_id),
-        })
-    for circ in root.findall('.//{http://www.w3.org/2000/svg}circle'):
-        data_id = circ.attrib.get('data-table-id') or circ.attrib.get('id')
-        shapes.append({
-            'table_id': int(data_id) if data_id and str(data_id).isdigit() else data_id,
+            'x': float(elem.attrib.get('x',0)),
+            'y': float(elem.attrib.get('y',0)),
+            'w': float(elem.attrib.get('width',0)),
+            'h': float(elem.attrib.get('height',0)),
+            'rx': float(elem.attrib.get('rx',0)) if 'rx' in elem.attrib else 0,
+            'svg_id': elem.attrib.get('id', data_id),
+        }
+    if tag == SVG_NS + 'circle':
+        table_id, data_id = _table_id(elem)
+        return {
+            'table_id': table_id,
             'type':'circle',
-            'cx': float(circ.attrib.get('cx',0)),
-            'cy': float(circ.attrib.get('cy',0)),
-            'r': float(circ.attrib.get('r',0)),
-            'svg_id': circ.attrib.get('id', data_id),
-        })
-    for poly in root.findall('.//{http://www.w3.org/2000/svg}polygon'):
-        data_id = poly.attrib.get('data-table-id') or poly.attrib.get('id')
-        pts = poly.attrib.get('points','').strip()
+            'cx': float(elem.attrib.get('cx',0)),
+            'cy': float(elem.attrib.get('cy',0)),
+            'r': float(elem.attrib.get('r',0)),
+            'svg_id': elem.attrib.get('id', data_id),
+        }
+    if tag == SVG_NS + 'polygon':
+        table_id, data_id = _table_id(elem)
+        pts = elem.attrib.get('points','').strip()
         pts_list = []
         for p in pts.split():
             if ',' in p:
                 x,y = p.split(',')
                 pts_list.append([float(x), float(y)])
-        shapes.append({'table_id': int(data_id) if data_id and str(data_id).isdigit() else data_id,
-                       'type':'polygon','points': pts_list,
-                       'svg_id': poly.attrib.get('id', data_id)})
+        return {'table_id': table_id,
+                'type':'polygon','points': pts_list,
+                'svg_id': elem.attrib.get('id', data_id)}
+    return None
+
+def iter_shapes(file_path):
+    """Stream shapes from an SVG in a single pass, in document order.
+
+    Elements are cleared and detached from their parent as soon as they
+    have been read, so memory stays bounded by the nesting depth rather
+    than the size of large multi-floor CAD exports."""
+    open_elements = []
+    for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+        open_elements.pop()
+        shape = _shape_from_element(elem)
+        if shape is not None:
+            yield shape
+        elem.clear()
+        if open_elements:
+            # Earlier siblings are already gone, so this is a cheap remove
+            open_elements[-1].remove(elem)
+
+def parse_svg(file_path):
+    return list(iter_shapes(file_path))
+
+def synthetic_shapes(count, columns=50, width=20, height=12, gap=4):
+    """Generate `count` rect shapes laid out on a grid, as parse_svg would
+    return them for a large floor. Used by the benchmark command."""
+    shapes = []
+    for i in range(1, count + 1):
+        row, col = divmod(i - 1, columns)
+        shapes.append({
+            'table_id': i,
+            'type': 'rect',
+            'x': float(gap + col * (width + gap)),
+            'y': float(gap + row * (height + gap)),
+            'w': float(width),
+            'h': float(height),
+            'rx': 0,
+            'svg_id': f"ws-{i}",
+        })
     return shapes
 
-def shapes_to_workspace_fixtures(shapes):
+def bounding_box(shape):
+    """Return the (x, y, width, height) box enclosing a parsed shape."""
+    if shape['type'] == 'circle':
+        r = shape['r']
+        return shape['cx'] - r, shape['cy'] - r, 2 * r, 2 * r
+    if shape['type'] == 'polygon':
+        if not shape['points']:
+            return 0, 0, 0, 0
+        xs = [x for x, _ in shape['points']]
+        ys = [y for _, y in shape['points']]
+        return min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+    return shape['x'], shape['y'], shape['w'], shape['h']
+
+def shape_to_workspace_fields(shape, i):
+    # Adjust these fields as per your WorkSpace model
+    x, y, w, h = bounding_box(shape)
+    return {
+        "name": f"Workspace {shape.get('table_id', i)}",
+        "svg_id": shape.get('svg_id', f"ws-{i}"),
+        # The floor plan draws every workspace as its bounding box
+        "svg_shape": "rect",
+        "svg_x_coord": int(x),
+        "svg_y_coord": int(y),
+        "svg_width": int(w),
+        "svg_height": int(h),
+        "status": "available",
+        "location": "Auto-imported",
+        "capacity": 4,
+        "workspace_type": "desk",
+        "description": "",
+        "amenities": "",
+        "hourly_rate": "0.00",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def shapes_to_workspace_fixtures(shapes, start_pk=1):
     fixtures = []
-    for i, shape in enumerate(shapes, start=1):
-        # Adjust these fields as per your WorkSpace model
-        fields = {
-            "name": f"Workspace {shape.get('table_id', i)}",
-            "svg_id": shape.get('svg_id', f"ws-{i}"),
-            "svg_shape": shape['type'],
-            "svg_x_coord": int(shape.get('x', shape.get('cx', 0))),
-            "svg_y_coord": int(shape.get('y', shape.get('cy', 0))),
-            "svg_width": int(shape.get('w', shape.get('r', 0)*2 if shape['type']=='circle' else 0)),
-            "svg_height": int(shape.get('h', shape.get('r', 0)*2 if shape['type']=='circle' else 0)),
-            "status": "available",
-            "location": "Auto-imported",
-            "capacity": 4,
-            "workspace_type": "desk",
-            "description": "",
-            "amenities": "",
-            "hourly_rate": "0.00",
-            "created_at": now,
-            "updated_at": now,
-        }
+    for i, shape in enumerate(shapes, start=start_pk):
         fixtures.append({
             "model": "booking.workspace",
             "pk": i,
-            "fields": fields
+            "fields": shape_to_workspace_fields(shape, i)
         })
     return fixtures
 
@@ -0,0 +1,14 @@
+from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+
+
+# ============================================================================
+# GUNICORN WORKERS
+# ============================================================================
+# Gunicorn worker class serving config.asgi with uvicorn (see
+# config/gunicorn.py). Django does not implement the ASGI lifespan
+# protocol, so it is turned off instead of probed on every boot.
+# ============================================================================
+
+
+class UvicornWorker(BaseUvicornWorker):
+    CONFIG_KWARGS = {**BaseUvicornWorker.CONFIG_KWARGS, 'lifespan': 'off'}
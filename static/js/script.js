@@ -12,8 +12,46 @@ document.addEventListener("DOMContentLoaded", function () {
     cancelModal = new bootstrap.Modal(cancelModalEl);
   }
 
-  document.querySelectorAll(".workspace").forEach((el) => {
-    el.addEventListener("click", async (e) => {
+  // Re-check availability without re-rendering the whole floor plan
+  const checkBookingsForm = document.querySelector("#check-bookings form");
+  if (checkBookingsForm && document.querySelector("#floor-plan")) {
+    checkBookingsForm.addEventListener("submit", async (e) => {
+      e.preventDefault();
+      const params = new URLSearchParams(new FormData(checkBookingsForm));
+      params.delete("csrfmiddlewaretoken");
+      const layer = document.querySelector("#workspace-layer");
+      const floorChanged =
+        layer && layer.dataset.floorId !== (params.get("floor") || "");
+      const updated = floorChanged
+        ? await loadFloor(params)
+        : await refreshAvailability(params);
+      if (updated) {
+        history.replaceState(null, "", `?${params.toString()}`);
+        subscribeToAvailability();
+      }
+    });
+    // Switching floor loads it straight away
+    const floorSelect = checkBookingsForm.querySelector('[name="floor"]');
+    if (floorSelect) {
+      floorSelect.addEventListener("change", () =>
+        checkBookingsForm.requestSubmit()
+      );
+    }
+    subscribeToAvailability();
+  }
+
+  // Closing the booking form frees the slot for others straight away
+  if (bookingModalEl) {
+    bookingModalEl.addEventListener("hidden.bs.modal", releaseSlot);
+  }
+
+  // One delegated handler, so workspaces of floors loaded later respond too
+  const floorPlanEl = document.querySelector("#floor-plan");
+  if (floorPlanEl) {
+    prefetchDetails();
+    floorPlanEl.addEventListener("click", async (e) => {
+      const el = e.target.closest(".workspace");
+      if (!el) return;
       const workspaceId = el.getAttribute("data-workspace-id");
       const workspaceTitle = el.id;
 
@@ -36,27 +74,29 @@ document.addEventListener("DOMContentLoaded", function () {
           ).value;
           const endTime = checkForm.querySelector('[name="end_time"]').value;
 
-          // Fetch workspace details via AJAX
+          // Keep others off the slot while the form is open
+          if (!(await holdSlot(workspaceId, date, startTime, endTime))) {
+            return;
+          }
+
+          // Workspace details, usually prefetched with the floor
           let workspaceDetails = null;
           try {
-            const resp = await fetch(`/booking/workspace/${workspaceId}`);
-            const data = await resp.json();
-            if (data.success) {
+            const workspace = await getDetails("workspaces", workspaceId);
+            if (workspace) {
               // Display workspace details in modal
               workspaceDetails = `
                       <div class='workspace'>
-                        <h3><span>${data.workspace.name}</span></h3>
-                        <p>Location: <span>${data.workspace.location}</span></p>
-                        <p>Capacity: <span>${data.workspace.capacity}</span></p>
-                        <p>Type: <span>${
-                          data.workspace.workspace_type
-                        }</span></p>
-                        <p>Status: <span>${data.workspace.status}</span></p>
-                        <p>Amenities: <span>${data.workspace.amenities.join(
+                        <h3><span>${workspace.name}</span></h3>
+                        <p>Location: <span>${workspace.location}</span></p>
+                        <p>Capacity: <span>${workspace.capacity}</span></p>
+                        <p>Type: <span>${workspace.workspace_type}</span></p>
+                        <p>Status: <span>${workspace.status}</span></p>
+                        <p>Amenities: <span>${workspace.amenities.join(
                           ", "
                         )}</span></p>
                         <p>Description: <span>${
-                          data.workspace.description
+                          workspace.description
                         }</span></p>
                       </div>
                     `;
@@ -97,20 +137,19 @@ document.addEventListener("DOMContentLoaded", function () {
             "action",
             `/booking/${bookingId}/cancel?from=workspace`
           );
-          // Fetch booking details via AJAX
+          // Booking details, usually prefetched with the floor
           try {
-            const resp = await fetch(`/booking/booking/${bookingId}`);
-            const data = await resp.json();
-            if (data.success) {
+            const booking = await getDetails("bookings", bookingId);
+            if (booking) {
               cancelModalEl.querySelector(".booking-details").innerHTML = `
                         <div class='booking-details'>
                           <h3>Booking details:</h3>
-                          <p>Workspace: <span>${data.booking.workspace_name}</span></p>
-                          <p>Date: <span>${data.booking.booking_date}</span></p>
-                          <p>Time: <span>${data.booking.start_time} - ${data.booking.end_time}</span></p>
-                          <p>Status: <span>${data.booking.status}</span></p>
-                          <p>Purpose: <span>${data.booking.purpose}</span></p>
-                          <p>Notes: <span>${data.booking.notes}</span></p>
+                          <p>Workspace: <span>${booking.workspace_name}</span></p>
+                          <p>Date: <span>${booking.booking_date}</span></p>
+                          <p>Time: <span>${booking.start_time} - ${booking.end_time}</span></p>
+                          <p>Status: <span>${booking.status}</span></p>
+                          <p>Purpose: <span>${booking.purpose}</span></p>
+                          <p>Notes: <span>${booking.notes}</span></p>
                         </div>
                       `;
             } else {
@@ -157,9 +196,228 @@ document.addEventListener("DOMContentLoaded", function () {
           nonFieldErrors;
       }
     }
-  });
+  }
 });
 
+// ===============================
+// FLOOR PLAN AVAILABILITY
+// ===============================
+
+/* Fetch workspace states for a date/time window and patch the rects.
+   The browser revalidates with If-None-Match, so an unchanged window
+   costs a 304. Returns true if the floor plan was updated. */
+async function refreshAvailability(params) {
+  if (!params) {
+    const checkForm = document.querySelector("#check-bookings form");
+    if (!checkForm) return false;
+    params = new URLSearchParams(new FormData(checkForm));
+    params.delete("csrfmiddlewaretoken");
+  }
+  try {
+    const resp = await fetch(`/booking/availability/?${params.toString()}`, {
+      headers: { Accept: "application/json" },
+    });
+    if (!resp.ok) return false;
+    const data = await resp.json();
+    if (!data.success) return false;
+    applyAvailability(data.states, data.bookings);
+    prefetchDetails();
+    return true;
+  } catch (err) {
+    return false;
+  }
+}
+
+/* Swap in the workspaces of another floor, with their states for the
+   window, without reloading the page. Returns true on success. */
+async function loadFloor(params) {
+  const layer = document.querySelector("#workspace-layer");
+  if (!layer) return false;
+  try {
+    const resp = await fetch(`/booking/floor-plan/?${params.toString()}`);
+    if (!resp.ok) return false;
+    layer.innerHTML = await resp.text();
+    layer.dataset.floorId = resp.headers.get("X-Floor-Id") || "";
+    prefetchDetails();
+    return true;
+  } catch (err) {
+    return false;
+  }
+}
+
+/* Listen for booking changes on the selected date (Server-Sent Events)
+   and refetch availability when one touches the selected time window. */
+let availabilityEvents = null;
+let availabilityEventsDate = null;
+
+function subscribeToAvailability() {
+  const checkForm = document.querySelector("#check-bookings form");
+  if (!checkForm || !window.EventSource) return;
+  const date = checkForm.querySelector('[name="date"]').value;
+  if (availabilityEvents && availabilityEventsDate === date) return;
+  if (availabilityEvents) availabilityEvents.close();
+
+  availabilityEventsDate = date;
+  availabilityEvents = new EventSource(
+    `/booking/availability/stream/?date=${encodeURIComponent(date)}`
+  );
+  const onBookingChange = (e) => {
+    const change = JSON.parse(e.data);
+    // Changes on other floors do not affect the workspaces shown
+    const shown = document.querySelector(
+      `.workspace[data-workspace-id="${change.workspace_id}"]`
+    );
+    if (!shown) return;
+    if (change.type !== "held" && change.type !== "released") {
+      forgetDetails(change.workspace_id);
+    }
+    const startTime = checkForm.querySelector('[name="start_time"]').value;
+    const endTime = checkForm.querySelector('[name="end_time"]').value;
+    // Overlap logic: (start1 < end2) AND (end1 > start2)
+    if (change.start_time < endTime && change.end_time > startTime) {
+      refreshAvailability();
+    }
+  };
+  ["created", "updated", "cancelled", "held", "released"].forEach((type) =>
+    availabilityEvents.addEventListener(type, onBookingChange)
+  );
+  availabilityEvents.addEventListener("resync", () => {
+    forgetDetails();
+    refreshAvailability();
+  });
+}
+
+/* Apply a {workspace_id: state} map; workspaces not listed are free. */
+function applyAvailability(states, bookings) {
+  document.querySelectorAll(".workspace").forEach((el) => {
+    const workspaceId = el.getAttribute("data-workspace-id");
+    const state = states[workspaceId] || "free";
+    el.classList.toggle("reserved", state !== "free");
+    el.classList.toggle("editable", state === "mine");
+    el.classList.toggle("held", state === "held");
+    if (bookings && bookings[workspaceId]) {
+      el.setAttribute("data-booking-id", bookings[workspaceId]);
+    } else {
+      el.removeAttribute("data-booking-id");
+    }
+  });
+}
+
+// ===============================
+// SLOT HOLDS
+// ===============================
+
+function csrfToken() {
+  const csrfInput = document.querySelector('input[name="csrfmiddlewaretoken"]');
+  return csrfInput ? csrfInput.value : null;
+}
+
+/* Hold the slot for the user while they fill in the booking form.
+   Returns false if someone else has just taken or is holding it. */
+async function holdSlot(workspaceId, date, startTime, endTime) {
+  const formData = new FormData();
+  formData.append("workspace", workspaceId);
+  formData.append("date", date);
+  formData.append("start_time", startTime);
+  formData.append("end_time", endTime);
+  try {
+    const resp = await fetch("/booking/hold/", {
+      method: "POST",
+      body: formData,
+      headers: { "X-CSRFToken": csrfToken() },
+    });
+    if (resp.status === 409) {
+      const data = await resp.json();
+      alert(data.message);
+      refreshAvailability();
+      return false;
+    }
+  } catch (err) {
+    // Holding is best effort; the booking itself is still checked
+  }
+  return true;
+}
+
+/* Release the user's hold; keepalive lets it finish during navigation. */
+function releaseSlot() {
+  fetch("/booking/hold/release/", {
+    method: "POST",
+    headers: { "X-CSRFToken": csrfToken() },
+    keepalive: true,
+  }).catch(() => {});
+}
+
+// ===============================
+// WORKSPACE AND BOOKING DETAILS
+// ===============================
+
+/* Details of the workspaces and bookings shown on the floor plan, keyed
+   by id, so opening a modal needs no request of its own. */
+const detailsCache = { workspaces: {}, bookings: {} };
+
+/* Fetch the details of every workspace (and booking) shown in one
+   request. The response is revalidated with If-None-Match, so refetching
+   unchanged details costs a 304. */
+async function prefetchDetails() {
+  const workspaceIds = [];
+  const bookingIds = [];
+  document.querySelectorAll(".workspace").forEach((el) => {
+    workspaceIds.push(el.getAttribute("data-workspace-id"));
+    if (el.hasAttribute("data-booking-id")) {
+      bookingIds.push(el.getAttribute("data-booking-id"));
+    }
+  });
+  if (!workspaceIds.length) return;
+  const params = new URLSearchParams({
+    workspaces: workspaceIds.join(","),
+    bookings: bookingIds.join(","),
+  });
+  try {
+    const resp = await fetch(`/booking/details/?${params.toString()}`, {
+      headers: { Accept: "application/json" },
+    });
+    if (!resp.ok) return;
+    const data = await resp.json();
+    if (!data.success) return;
+    Object.assign(detailsCache.workspaces, data.workspaces);
+    Object.assign(detailsCache.bookings, data.bookings);
+  } catch (err) {
+    // Details are fetched one at a time on click instead
+  }
+}
+
+/* Drop the cached details of a workspace and the booking shown on it
+   after a change to them, or everything when no workspace is given. They
+   are fetched again by the next prefetch or click. */
+function forgetDetails(workspaceId) {
+  if (workspaceId === undefined) {
+    detailsCache.workspaces = {};
+    detailsCache.bookings = {};
+    return;
+  }
+  delete detailsCache.workspaces[workspaceId];
+  const el = document.querySelector(
+    `.workspace[data-workspace-id="${workspaceId}"]`
+  );
+  const bookingId = el && el.getAttribute("data-booking-id");
+  if (bookingId) delete detailsCache.bookings[bookingId];
+}
+
+/* Details of one workspace or booking (kind "workspaces" or "bookings"),
+   prefetched or else fetched on their own. Null if not found. */
+async function getDetails(kind, id) {
+  if (detailsCache[kind][id]) return detailsCache[kind][id];
+  const url =
+    kind === "workspaces"
+      ? `/booking/workspace/${id}/`
+      : `/booking/booking/${id}/`;
+  const resp = await fetch(url, { headers: { Accept: "application/json" } });
+  const data = await resp.json();
+  const details = data.success ? data.workspace || data.booking : null;
+  if (details) detailsCache[kind][id] = details;
+  return details;
+}
+
 // ===============================
 // JS FOR MY BOOKINGS PAGE TEMPLATE
 // ===============================
@@ -179,11 +437,18 @@ function openEditModal(bookingId) {
           body: formData,
           headers: { "X-CSRFToken": formData.get("csrfmiddlewaretoken") },
         })
-          .then((response) => response.json())
-          .then((data) => {
+          .then((response) =>
+            response.json().then((data) => ({ status: response.status, data }))
+          )
+          .then(({ status, data }) => {
             if (data.success) {
               alert("Booking updated!");
               location.reload();
+            } else if (status === 409) {
+              // Changed elsewhere since the form was opened: show the
+              // current details so the edit can be redone on top of them
+              alert(data.message);
+              openEditModal(bookingId);
             } else {
               alert(data.message);
             }